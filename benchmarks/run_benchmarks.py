@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the switchgear selection pipeline
+Times select_best_contactor, select_overload_relay and /calculate over synthetic catalogs of growing size,
+in-memory index vs SQL, then load-tests a local gunicorn; compares the results with a stored baseline
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # 1k and 10k catalogs, compare with baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --update-baseline
+    python benchmarks/run_benchmarks.py --no-gunicorn --output results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import event
+
+from benchmarks.synthetic_catalog import CURRENT_RATINGS, MANUFACTURERS, VOLTAGE_RATINGS, cached_catalog_database
+from src.main import create_app
+from src.models.user import db
+from src.routes.switchgear import select_best_contactor, select_overload_relay
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STARTING_METHODS = ['DOL', 'Star-Delta', 'Soft Starter', 'VFD', 'Autotransformer']
+MOTOR_POWERS_HP = [0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 25, 30, 40, 50, 75, 100, 150, 200, 300]
+
+
+class QueryCounter:
+    """Counts SQL statements executed on the app's engines"""
+
+    def __init__(self, app):
+        self.count = 0
+        with app.app_context():
+            engines = [db.engine, app.extensions.get('catalog_read_engine')]
+        for engine in filter(None, engines):
+            event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    position = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[position]
+
+
+def summarize(name, latencies, elapsed, queries=None):
+    latencies = sorted(latencies)
+    return {
+        'name': name,
+        'ops': len(latencies),
+        'ops_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'queries_per_op': round(queries / len(latencies), 3) if queries is not None else None,
+    }
+
+
+def measure(name, function, inputs, counter):
+    """Call function(*args) for each input tuple, timing every call"""
+    latencies = []
+    queries_before = counter.count
+    started = time.perf_counter()
+    for args in inputs:
+        call_started = time.perf_counter()
+        function(*args)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(name, latencies, time.perf_counter() - started, counter.count - queries_before)
+
+
+def motor_requests(count, rng):
+    return [
+        {
+            'motor_power_hp': rng.choice(MOTOR_POWERS_HP),
+            'voltage': rng.choice([230, 400, 415, 690]),
+            'starting_method': rng.choice(STARTING_METHODS),
+        }
+        for _ in range(count)
+    ]
+
+
+def run_in_process(database, mode, iterations, seed):
+    """Micro-benchmarks of the selection functions and /calculate through the Flask test client"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'CATALOG_INDEX_ENABLED': mode == 'index',
+        # Measure the pipeline itself, not the recommendation cache; the catalog never changes during a run
+        'RECOMMENDATION_CACHE_SIZE': 0,
+        'CATALOG_VERSION_TTL': 3600.0,
+    })
+    counter = QueryCounter(app)
+    rng = random.Random(seed)
+    frames = [f'{prefix}{rating}' for _, prefix in MANUFACTURERS for rating in CURRENT_RATINGS]
+    contactor_inputs = [(rng.choice(CURRENT_RATINGS) * rng.uniform(0.5, 1.1), rng.choice(VOLTAGE_RATINGS))
+                        for _ in range(iterations)]
+    relay_inputs = [(rng.uniform(0.5, 700), rng.choice(frames)) for _ in range(iterations)]
+    motors = motor_requests(iterations, rng)
+
+    results = []
+    with app.app_context():
+        # Build the indexes (or warm SQLite's page cache) outside the timed loops
+        select_best_contactor(*contactor_inputs[0])
+        select_overload_relay(*relay_inputs[0])
+        results.append(measure('select_best_contactor', select_best_contactor, contactor_inputs, counter))
+        results.append(measure('select_overload_relay', select_overload_relay, relay_inputs, counter))
+
+    client = app.test_client()
+    client.post('/api/switchgear/calculate', json=motors[0])
+    results.append(measure('calculate (test client)',
+                           lambda motor: client.post('/api/switchgear/calculate', json=motor),
+                           [(motor,) for motor in motors], counter))
+    with app.app_context():
+        db.engine.dispose()
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+
+
+def run_gunicorn(database, mode, requests, concurrency, workers, seed):
+    """Load-test /calculate on a local gunicorn serving the given catalog"""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', RECOMMENDATION_CACHE_SIZE='0',
+               CATALOG_VERSION_TTL='3600', CATALOG_INDEX_ENABLED='1' if mode == 'index' else '0')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'src.wsgi:app'],
+        cwd=ROOT, env=env
+    )
+    base_url = f'http://127.0.0.1:{port}/api/switchgear'
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f'{base_url}/health').read()
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.1)
+
+        motors = motor_requests(requests, random.Random(seed))
+        for motor in motors[:workers * 4]:
+            # Let every worker build its indexes before timing
+            _post(f'{base_url}/calculate', motor)
+
+        def timed(motor):
+            started = time.perf_counter()
+            _post(f'{base_url}/calculate', motor)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(timed, motors))
+        return summarize(f'calculate (gunicorn -w {workers}, {concurrency} clients)',
+                         latencies, time.perf_counter() - started)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Return a message for each benchmark that regressed against the baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result['p50_ms'] > base['p50_ms'] * (1 + tolerance) and result['p50_ms'] - base['p50_ms'] > min_delta_ms:
+            regressions.append(f"{key}: p50 {result['p50_ms']} ms vs baseline {base['p50_ms']} ms")
+        if result['queries_per_op'] is not None and base.get('queries_per_op') is not None \
+                and result['queries_per_op'] > base['queries_per_op']:
+            regressions.append(f"{key}: {result['queries_per_op']} queries/op vs baseline {base['queries_per_op']}")
+    return regressions
+
+
+def main():
+    """Parse arguments, run the benchmarks and compare them with the baseline"""
+    parser = argparse.ArgumentParser(description='Benchmark the switchgear selection pipeline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='catalog sizes (contactors and overload relays each)')
+    parser.add_argument('--modes', nargs='+', choices=['index', 'sql'], default=['index', 'sql'])
+    parser.add_argument('--iterations', type=int, default=1000, help='calls per micro-benchmark')
+    parser.add_argument('--requests', type=int, default=2000, help='requests per gunicorn load test')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent gunicorn clients')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--no-gunicorn', action='store_true', help='skip the gunicorn load test')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'switchgear-benchmarks'),
+                        help='where generated catalog databases are cached')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='allowed relative p50 slowdown')
+    parser.add_argument('--min-delta-ms', type=float, default=0.005, help='ignore p50 slowdowns smaller than this')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<60} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'queries/op':>10}")
+    for size in args.sizes:
+        database = cached_catalog_database(size, args.data_dir, args.seed)
+        for mode in args.modes:
+            runs = run_in_process(database, mode, args.iterations, args.seed)
+            if not args.no_gunicorn:
+                runs.append(run_gunicorn(database, mode, args.requests, args.concurrency, args.workers, args.seed))
+            for result in runs:
+                key = f"{size}/{mode}/{result['name']}"
+                results[key] = result
+                queries = '-' if result['queries_per_op'] is None else result['queries_per_op']
+                print(f"{key:<60} {result['ops_per_second']:>10} {result['p50_ms']:>10} "
+                      f"{result['p99_ms']:>10} {queries:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as stream:
+                baseline = json.load(stream)
+        baseline.update(results)
+        with open(args.baseline, 'w') as stream:
+            json.dump(baseline, stream, indent=2, sort_keys=True)
+            stream.write('\n')
+        print(f"\n✓ Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\n⚠️  No baseline to compare with; run with --update-baseline to store one")
+        return 0
+    with open(args.baseline) as stream:
+        regressions = compare(results, json.load(stream), args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("\n❌ Regressions against the baseline:")
+        for message in regressions:
+            print(f"   {message}")
+        return 1
+    print("\n✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
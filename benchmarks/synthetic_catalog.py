@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalog generator for the selection benchmarks
+Writes a SQLite database with N contactors and N overload relays spread across manufacturers and frame sizes
+
+Usage:
+    python benchmarks/synthetic_catalog.py 10000 /tmp/catalog-10k.db
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Bump when the generated data changes so cached benchmark databases are rebuilt
+GENERATOR_VERSION = 1
+
+MANUFACTURERS = [
+    ('ABB', 'AF'), ('Schneider Electric', 'LC1D'), ('Siemens', '3RT'), ('Eaton', 'DIL'),
+    ('Allen-Bradley', '100-C'), ('Mitsubishi Electric', 'S-T'), ('LS Electric', 'MC'), ('Chint', 'NXC'),
+    ('Lovato', 'BF'), ('Benedict', 'K3'), ('WEG', 'CWM'), ('Danfoss', 'CI'),
+]
+
+# IEC AC-3 contactor ratings (A) and the voltage ratings they are offered at
+CURRENT_RATINGS = [6, 9, 12, 16, 18, 25, 32, 38, 40, 50, 65, 80, 95, 115, 150, 185, 225, 265, 330, 400, 500, 630, 800]
+VOLTAGE_RATINGS = [400, 440, 690, 1000]
+COIL_VOLTAGES = [24, 110, 230, 400]
+AUXILIARY_CONTACTS = ['1NO', '1NC', '1NO+1NC', '2NO+2NC']
+RESET_TYPES = ['Manual', 'Automatic', 'Manual/Automatic']
+
+
+def generate_contactors(count, seed=0):
+    """Yield count contactor records, cycling through manufacturers and ratings"""
+    rng = random.Random(seed)
+    for i in range(count):
+        manufacturer, prefix = MANUFACTURERS[i % len(MANUFACTURERS)]
+        rating = CURRENT_RATINGS[rng.randrange(len(CURRENT_RATINGS))]
+        yield {
+            'model': f'{prefix}{rating}-{i:06d}',
+            'manufacturer': manufacturer,
+            'current_rating': rating,
+            'voltage_rating': rng.choice(VOLTAGE_RATINGS),
+            'utilization_category': 'AC-3',
+            'poles': rng.choice([3, 3, 3, 4]),
+            'auxiliary_contacts': rng.choice(AUXILIARY_CONTACTS),
+            'coil_voltage': rng.choice(COIL_VOLTAGES),
+            'frame_size': f'{prefix}{rating}',
+            'price': round(30 + rating * 1.6 * rng.uniform(0.8, 1.4), 2),
+        }
+
+
+def generate_overload_relays(count, seed=0):
+    """Yield count overload relay records with adjacent current ranges and frame lists"""
+    rng = random.Random(seed + 1)
+    for i in range(count):
+        manufacturer, prefix = MANUFACTURERS[i % len(MANUFACTURERS)]
+        position = rng.randrange(len(CURRENT_RATINGS))
+        range_max = CURRENT_RATINGS[position] * rng.uniform(0.9, 1.1)
+        range_min = range_max * rng.uniform(0.6, 0.75)
+        frames = [f'{prefix}{rating}' for rating in CURRENT_RATINGS[max(position - 1, 0):position + 2]]
+        yield {
+            'model': f'{prefix}-OL{i:06d}',
+            'manufacturer': manufacturer,
+            'current_range_min': round(range_min, 2),
+            'current_range_max': round(range_max, 2),
+            'trip_class': rng.choice([10, 10, 20, 30]),
+            'reset_type': rng.choice(RESET_TYPES),
+            'compatible_contactor_frames': frames if rng.random() > 0.05 else [],
+            'price': round(25 + range_max * 0.9 * rng.uniform(0.8, 1.4), 2),
+        }
+
+
+def _write_jsonl(path, records):
+    with gzip.open(path, 'wt', encoding='utf-8') as stream:
+        for record in records:
+            stream.write(json.dumps(record) + '\n')
+
+
+def build_catalog_database(size, path, seed=0):
+    """Create a migrated SQLite database at path holding size contactors and size overload relays"""
+    from init_database import init_manufacturers, init_starting_methods
+    from src.main import create_app
+    from src.models.user import db
+    from src.database.migrations import upgrade_database
+    from src.services.catalog_import import import_catalog
+
+    if os.path.exists(path):
+        os.remove(path)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}'})
+    with app.app_context(), tempfile.TemporaryDirectory() as workdir:
+        upgrade_database()
+        init_manufacturers()
+        init_starting_methods()
+        db.session.commit()
+
+        contactors = os.path.join(workdir, 'contactors.jsonl.gz')
+        relays = os.path.join(workdir, 'overload_relays.jsonl.gz')
+        _write_jsonl(contactors, generate_contactors(size, seed))
+        _write_jsonl(relays, generate_overload_relays(size, seed))
+        reports = [import_catalog(contactors, 'contactors'), import_catalog(relays, 'overload_relays')]
+        db.engine.dispose()
+    return reports
+
+
+def cached_catalog_database(size, data_dir, seed=0):
+    """Path of a generated catalog database, building it if it is missing and migrating it if it is older"""
+    from src.main import create_app
+    from src.models.user import db
+    from src.database.migrations import upgrade_database
+
+    path = os.path.join(data_dir, f'catalog-{size}-s{seed}-v{GENERATOR_VERSION}.db')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        build_catalog_database(size, path + '.tmp', seed)
+        os.replace(path + '.tmp', path)
+    else:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}'})
+        with app.app_context():
+            upgrade_database()
+            db.engine.dispose()
+    return path
+
+
+def main():
+    """Parse arguments and generate the database"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic switchgear catalog database')
+    parser.add_argument('size', type=int, help='number of contactors and of overload relays')
+    parser.add_argument('path', help='SQLite database file to (re)create')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    print(f"🚀 Generating {args.size} contactors and overload relays into {args.path}...")
+    for report in build_catalog_database(args.size, args.path, args.seed):
+        summary = report.to_dict()
+        print(f"✓ {summary['target']}: {summary['inserted']} rows in {summary['seconds']}s")
+    print("\n✅ Synthetic catalog generated successfully!")
+
+
+if __name__ == '__main__':
+    main()
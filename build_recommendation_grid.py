@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Recommendation grid job for Motor Switchgear Selection API
+Precomputes /calculate for every standard IEC kW rating, voltage and compatible starting method
+
+Usage:
+    python build_recommendation_grid.py          # recompute the cells affected by catalog changes
+    python build_recommendation_grid.py --full   # recompute every cell
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.main import create_app
+from src.services.recommendation_grid import refresh_recommendation_grid
+
+def main():
+    """Parse arguments and refresh the grid"""
+    parser = argparse.ArgumentParser(description='Build or refresh the materialized recommendation grid')
+    parser.add_argument('--full', action='store_true', help='recompute every cell instead of the affected ones')
+    args = parser.parse_args()
+
+    print("🚀 Refreshing the recommendation grid...")
+
+    with create_app().app_context():
+        report = refresh_recommendation_grid(full=args.full)
+
+    print("\n📊 Grid Summary:")
+    print(f"   Mode: {report['mode']}")
+    print(f"   Catalog changes applied: {report['changes']}")
+    print(f"   Cells recomputed: {report['recomputed']} of {report['cells']}")
+    print(f"   Time: {report['seconds']:.2f}s")
+
+    print("\n✅ Recommendation grid is up to date!")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Bulk catalog import command for Motor Switchgear Selection API
+Streams CSV or JSONL vendor price lists into contactors, overload relays or manufacturers
+
+Usage:
+    python import_catalog.py contactors vendor_contactors.csv
+    python import_catalog.py overload_relays relays.jsonl.gz --chunk-size 10000
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.main import create_app
+from src.models.user import db
+from src.services.catalog_import import IMPORT_TARGETS, CatalogImportError, import_catalog
+from src.services.catalog_changes import active_change_consumers
+from src.services.motor_schedules import SCHEDULE_CONSUMER, refresh_motor_selections
+from src.services.recommendation_grid import GRID_TABLE, refresh_recommendation_grid
+
+def main():
+    """Parse arguments and run the import"""
+    parser = argparse.ArgumentParser(description='Import a vendor catalog file')
+    parser.add_argument('target', choices=sorted(IMPORT_TARGETS), help='table to import into')
+    parser.add_argument('path', help='.csv or .jsonl file, optionally gzip-compressed (.gz)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='override the format detected from the file name')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='rows per executemany batch')
+    parser.add_argument('--show-errors', type=int, default=10, help='number of invalid rows to print')
+    args = parser.parse_args()
+    
+    print(f"🚀 Importing {args.target} from {args.path}...")
+    
+    with create_app().app_context():
+        try:
+            report = import_catalog(args.path, args.target, args.format, args.chunk_size)
+        except (CatalogImportError, OSError) as e:
+            print(f"❌ Import failed: {e}")
+            return 1
+        
+        grid = schedules = None
+        if report.inserted or report.updated:
+            consumers = active_change_consumers(db.session.connection())
+            if GRID_TABLE in consumers:
+                grid = refresh_recommendation_grid()
+            if SCHEDULE_CONSUMER in consumers:
+                schedules = refresh_motor_selections()
+    
+    for line_number, message in report.errors[:args.show_errors]:
+        print(f"   ⚠ line {line_number}: {message}")
+    if len(report.errors) > args.show_errors:
+        print(f"   ⚠ ... {len(report.errors) - args.show_errors} more invalid rows")
+    
+    print("\n📊 Import Summary:")
+    print(f"   Rows read: {report.read}")
+    print(f"   Inserted: {report.inserted}")
+    print(f"   Updated: {report.updated}")
+    print(f"   Unchanged: {report.unchanged}")
+    print(f"   Invalid: {len(report.errors)}")
+    print(f"   Time: {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)")
+    if grid:
+        print(f"   Recommendation grid: {grid['recomputed']} of {grid['cells']} cells recomputed")
+    if schedules:
+        print(f"   Motor schedules: {schedules['recomputed']} of {schedules['motors']} motors recomputed")
+    
+    print("\n✅ Catalog import completed successfully!")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,8 +11,9 @@ import json
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.main import app
+from src.main import create_app
 from src.models.user import db
+from src.database.migrations import upgrade_database
 from src.models.switchgear import (
     Manufacturer, StartingMethod, Contactor, OverloadRelay, Motor
 )
@@ -235,9 +236,9 @@ def main():
     """Main initialization function"""
     print("🚀 Initializing Motor Switchgear Selection Database...")
     
-    with app.app_context():
-        # Create all tables
-        db.create_all()
+    with create_app().app_context():
+        # Create all tables and apply pending migrations
+        upgrade_database()
         print("✓ Database tables created")
         
         # Initialize data
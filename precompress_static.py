@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Static asset precompression for Motor Switchgear Selection API
+Writes .gz and .br files next to the compressible files of the frontend build so the server
+does not compress them at boot; run after copying a new build into src/static
+
+Usage:
+    python precompress_static.py                 # the app's static folder
+    python precompress_static.py path/to/dist
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.static_assets import ENCODINGS, brotli, compress, compressible
+
+def main():
+    """Parse arguments and write the compressed variants"""
+    parser = argparse.ArgumentParser(description='Precompress static assets with gzip and brotli')
+    parser.add_argument('folder', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'static'),
+                        help='static folder to process')
+    args = parser.parse_args()
+
+    print(f"🚀 Precompressing static assets in {args.folder}...")
+    if brotli is None:
+        print("   ⚠ brotli is not installed; only gzip variants will be written")
+
+    written = skipped = 0
+    original_bytes = compressed_bytes = 0
+    for directory, _, files in os.walk(args.folder):
+        for file_name in files:
+            if file_name.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(directory, file_name)
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            if not compressible(file_name, len(data)):
+                continue
+
+            for encoding, suffix in ENCODINGS:
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= os.stat(path).st_mtime:
+                    skipped += 1
+                    continue
+                encoded = compress(data, encoding)
+                if encoded is None:
+                    continue
+                with open(target, 'wb') as stream:
+                    stream.write(encoded)
+                written += 1
+                original_bytes += len(data)
+                compressed_bytes += len(encoded)
+                print(f"✓ {os.path.relpath(target, args.folder)}: {len(data):,} → {len(encoded):,} bytes")
+
+    print("\n📊 Precompression Summary:")
+    print(f"   Files written: {written}")
+    print(f"   Up to date: {skipped}")
+    if written:
+        print(f"   Size: {original_bytes:,} → {compressed_bytes:,} bytes")
+
+    print("\n✅ Static assets precompressed!")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+ASGI entry point: ``uvicorn src.asgi:app`` or
+``gunicorn -k uvicorn.workers.UvicornWorker src.asgi:app``.
+
+Requests under ``/api/switchgear`` run the unchanged Flask views in a
+SQLAlchemy greenlet, with catalog reads going through an async engine
+(aiosqlite for SQLite). Each query is awaited on the event loop, so one
+process serves many concurrent selections and listings while a query is
+in flight. Every other route, including writes, runs on the regular WSGI
+stack in a worker thread. Responses are produced by the same Flask app
+either way. The WSGI entry point (``src.wsgi``) is unaffected.
+"""
+
+import asyncio
+import io
+import sys
+
+from src.main import create_app
+
+ASYNC_PATH_PREFIX = '/api/switchgear'
+
+
+def wsgi_environ(scope, body):
+    """Translate an ASGI HTTP scope and request body into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _start_message(status, headers):
+    return {
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    }
+
+
+def run_wsgi(wsgi_app, environ, send_message):
+    """Run a WSGI app to completion, handing each ASGI message to send_message"""
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [_start_message(status, headers)]
+
+    result = wsgi_app(environ, start_response)
+    try:
+        send_message(started[0])
+        for chunk in result:
+            if chunk:
+                send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        send_message({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+
+class SwitchgearASGI:
+    """ASGI application serving a Flask app, with async catalog reads for the switchgear API"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.engine = None
+
+    async def startup(self):
+        from src.database.engine import create_async_catalog_engine
+        from src.services.request_metrics import instrument_engine
+
+        if self.engine is None:
+            self.engine = create_async_catalog_engine(self.flask_app)
+            instrument_engine(self.engine.sync_engine)
+
+    async def shutdown(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        environ = wsgi_environ(scope, bytes(body))
+
+        if scope['path'].startswith(ASYNC_PATH_PREFIX):
+            await self._serve_async(environ, send)
+        else:
+            messages = []
+            await asyncio.to_thread(run_wsgi, self.flask_app.wsgi_app, environ, messages.append)
+            for message in messages:
+                await send(message)
+
+    async def _serve_async(self, environ, send):
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from sqlalchemy.util import await_only
+
+        from src.database.engine import async_catalog_session
+
+        await self.startup()
+
+        def serve(session):
+            # Runs in a greenlet: queries and sends are awaited on the event loop
+            with async_catalog_session(session):
+                run_wsgi(self.flask_app.wsgi_app, environ, lambda message: await_only(send(message)))
+
+        async with AsyncSession(self.engine) as session:
+            await session.run_sync(serve)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = SwitchgearASGI(create_app())
@@ -0,0 +1,225 @@
+"""
+Database engine profile.
+
+The connection URI, pool sizing and SQLite pragmas come from the
+environment so the same code runs against a local SQLite file, a
+multi-worker gunicorn deployment (WAL, pooled connections) or a Postgres
+stand-in. With ``CATALOG_READ_ONLY`` set, catalog reads go through a
+separate engine that opens the SQLite file with ``mode=ro`` (or
+``immutable=1`` for a catalog file that never changes while served), so
+the selection and listing endpoints can never take a write lock.
+
+Requests served through the ASGI entry point (``src.asgi``) read the
+catalog through an async engine instead; ``catalog_session`` hands those
+requests the sync facade of their ``AsyncSession`` so the same view code
+awaits its queries on the event loop.
+"""
+
+import asyncio
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from src.models.user import db
+
+READ_ONLY_MODES = ('', 'ro', 'immutable')
+
+# Async drivers for the ASGI serving mode, by dialect
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+_async_catalog_session = ContextVar('async_catalog_session', default=None)
+
+
+def _env_int(environ, name, default):
+    return int(environ.get(name, default))
+
+
+def engine_profile(environ=os.environ):
+    """Flask config for the database connection, read from environment variables"""
+    uri = environ.get('DATABASE_URL', 'sqlite:///app.db')
+    if uri.startswith('postgres://'):
+        # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+        uri = 'postgresql://' + uri[len('postgres://'):]
+
+    engine_options = {'pool_pre_ping': True}
+    if not (uri.startswith('sqlite') and (':memory:' in uri or uri in ('sqlite://', 'sqlite:///'))):
+        engine_options.update(
+            pool_size=_env_int(environ, 'DB_POOL_SIZE', 5),
+            max_overflow=_env_int(environ, 'DB_MAX_OVERFLOW', 10),
+            pool_timeout=_env_int(environ, 'DB_POOL_TIMEOUT', 30),
+            pool_recycle=_env_int(environ, 'DB_POOL_RECYCLE', 1800),
+        )
+
+    read_only = environ.get('CATALOG_READ_ONLY', '').strip().lower()
+    if read_only not in READ_ONLY_MODES:
+        raise ValueError(f"CATALOG_READ_ONLY must be one of: {', '.join(mode or '(empty)' for mode in READ_ONLY_MODES)}")
+
+    return {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options,
+        'SQLITE_JOURNAL_MODE': environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'SQLITE_SYNCHRONOUS': environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'SQLITE_CACHE_SIZE_KB': _env_int(environ, 'SQLITE_CACHE_SIZE_KB', 65536),
+        'SQLITE_MMAP_SIZE': _env_int(environ, 'SQLITE_MMAP_SIZE', 268435456),
+        'SQLITE_BUSY_TIMEOUT_MS': _env_int(environ, 'SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'CATALOG_READ_ONLY': read_only,
+    }
+
+
+def _sqlite_pragmas(config, writable):
+    pragmas = [
+        f"busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"mmap_size = {int(config['SQLITE_MMAP_SIZE'])}",
+        'temp_store = MEMORY',
+    ]
+    if writable:
+        pragmas += [
+            f"journal_mode = {config['SQLITE_JOURNAL_MODE']}",
+            f"synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        ]
+    else:
+        pragmas.append('query_only = 1')
+    return pragmas
+
+
+def _install_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+
+
+def _create_read_only_engine(app, engine):
+    path = engine.url.database
+    if engine.dialect.name != 'sqlite' or not path or path == ':memory:':
+        return None
+
+    flag = 'immutable=1' if app.config['CATALOG_READ_ONLY'] == 'immutable' else 'mode=ro'
+    read_only = create_engine(f'sqlite:///file:{os.path.abspath(path)}?{flag}&uri=true',
+                              **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    _install_pragmas(read_only, _sqlite_pragmas(app.config, writable=False))
+    return read_only
+
+
+def init_engine(app):
+    """Install connection pragmas and the optional read-only catalog engine; call after db.init_app"""
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            _install_pragmas(engine, _sqlite_pragmas(app.config, writable=True))
+        if app.config.get('CATALOG_READ_ONLY'):
+            app.extensions['catalog_read_engine'] = _create_read_only_engine(app, engine)
+
+    @app.teardown_appcontext
+    def _close_catalog_session(exception):
+        session = g.pop('catalog_session', None)
+        if session is not None:
+            session.close()
+
+
+def catalog_session():
+    """Session for catalog reads: read-only when CATALOG_READ_ONLY is set, else db.session"""
+    session = _async_catalog_session.get()
+    if session is not None:
+        return session
+
+    engine = current_app.extensions.get('catalog_read_engine')
+    if engine is None:
+        return db.session
+
+    session = g.get('catalog_session')
+    if session is None:
+        session = g.catalog_session = Session(bind=engine)
+    return session
+
+
+def dispose_engines(app):
+    """Drop pooled connections inherited from a parent process; call in each forked worker"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    read_engine = app.extensions.get('catalog_read_engine')
+    if read_engine is not None:
+        read_engine.dispose(close=False)
+
+
+def async_database_url(app):
+    """The async driver URL for the app's database; SQLite files are always opened read-only"""
+    with app.app_context():
+        # Flask-SQLAlchemy has already resolved relative SQLite paths against the instance folder
+        url = db.engine.url
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f'No async driver is configured for {url.get_backend_name()}')
+    if driver.startswith('sqlite'):
+        path = url.database
+        if not path or path == ':memory:':
+            raise ValueError('The async serving mode needs a file-backed SQLite database')
+        flag = 'immutable=1' if app.config.get('CATALOG_READ_ONLY') == 'immutable' else 'mode=ro'
+        return f'{driver}:///file:{os.path.abspath(path)}?{flag}&uri=true'
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_async_catalog_engine(app):
+    """Async engine for catalog reads in the ASGI serving mode; call from the serving event loop"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(async_database_url(app), **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    if engine.dialect.name == 'sqlite':
+        _install_pragmas(engine.sync_engine, _sqlite_pragmas(app.config, writable=False))
+    return engine
+
+
+@contextmanager
+def async_catalog_session(session):
+    """Route catalog_session() to the sync facade of an AsyncSession; use inside AsyncSession.run_sync"""
+    token = _async_catalog_session.set(session)
+    try:
+        yield session
+    finally:
+        _async_catalog_session.reset(token)
+
+
+@contextmanager
+def catalog_lock(lock):
+    """
+    Hold a threading lock around catalog reads. Async-served requests share
+    one thread, so while the lock is busy they yield to the event loop
+    instead of blocking it.
+    """
+    if _async_catalog_session.get() is None:
+        with lock:
+            yield
+        return
+
+    while not lock.acquire(blocking=False):
+        await_only(asyncio.sleep(0.001))
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def catalog_wait(event):
+    """
+    Block until a threading event is set by another request. Async-served
+    requests poll it instead, yielding to the event loop in between, since
+    the request that sets it may be running on the same loop.
+    """
+    if _async_catalog_session.get() is None:
+        event.wait()
+        return
+
+    while not event.is_set():
+        await_only(asyncio.sleep(0.001))
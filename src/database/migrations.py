@@ -0,0 +1,145 @@
+"""
+In-place schema migrations for existing app.db files.
+
+``db.create_all`` only creates missing tables; it never adds columns or
+indexes to tables that already exist. Each migration below is applied
+once, inside a transaction, and recorded in ``schema_migrations`` so an
+older database can be upgraded without dropping and re-seeding it.
+
+Run with ``python -m src.database.migrations``.
+"""
+
+import time
+
+from sqlalchemy import inspect, text
+
+from src.models.user import db
+from src.services.catalog_search import create_search_index
+from src.services.catalog_version import bump_catalog_version
+
+
+def _add_column(connection, table, column, ddl):
+    columns = {col['name'] for col in inspect(connection).get_columns(table)}
+    if column not in columns:
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def _create_index(connection, name, table, columns):
+    connection.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+def link_part_manufacturers(connection):
+    """Add manufacturer_id foreign keys to parts and backfill them from the manufacturer names"""
+    for table in ('contactors', 'overload_relays'):
+        _add_column(connection, table, 'manufacturer_id', 'INTEGER REFERENCES manufacturers(id)')
+        connection.execute(text(f'''
+            INSERT INTO manufacturers (name)
+            SELECT DISTINCT p.manufacturer FROM {table} p
+            WHERE p.manufacturer IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM manufacturers m WHERE m.name = p.manufacturer)
+        '''))
+        connection.execute(text(f'''
+            UPDATE {table} SET manufacturer_id = (
+                SELECT MIN(m.id) FROM manufacturers m WHERE m.name = {table}.manufacturer
+            )
+            WHERE manufacturer_id IS NULL
+        '''))
+        _create_index(connection, f'ix_{table}_manufacturer_id', table, ['manufacturer_id'])
+    _create_index(connection, 'ix_manufacturers_name', 'manufacturers', ['name'])
+    bump_catalog_version(connection, ['manufacturers', 'contactors', 'overload_relays'])
+
+
+def add_selection_indexes(connection):
+    """Composite indexes covering the contactor and overload relay selection queries"""
+    _create_index(connection, 'ix_contactors_selection', 'contactors',
+                  ['voltage_rating', 'current_rating', 'price'])
+    _create_index(connection, 'ix_overload_relays_selection', 'overload_relays',
+                  ['current_range_min', 'current_range_max', 'price'])
+
+
+def add_part_checksums(connection):
+    """Content checksums and unique (manufacturer, model) keys used by the bulk catalog importer"""
+    for table in ('contactors', 'overload_relays'):
+        _add_column(connection, table, 'checksum', 'VARCHAR(40)')
+        duplicates = connection.execute(text(f'''
+            SELECT manufacturer, model FROM {table} GROUP BY manufacturer, model HAVING COUNT(*) > 1
+        ''')).all()
+        if duplicates:
+            listed = ', '.join(f'{manufacturer} {model}' for manufacturer, model in duplicates[:10])
+            raise RuntimeError(f'Cannot add a unique part key to {table}; remove duplicate parts first: {listed}')
+        connection.execute(text(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_part ON {table} (manufacturer, model)'
+        ))
+
+
+def add_frame_price_index(connection):
+    """Cheapest contactor per frame size lookups of the assembly solver"""
+    _create_index(connection, 'ix_contactors_frame_price', 'contactors', ['frame_size', 'price'])
+
+
+def add_motor_schedules(connection):
+    """Persisted schedule selections on motors, and per-consumer catalog change logs"""
+    for column, ddl in (
+        ('schedule_id', 'INTEGER REFERENCES motor_schedules(id)'),
+        ('tag', 'VARCHAR(50)'),
+        ('starting_method', 'VARCHAR(50)'),
+        ('circuit_breaker_rating', 'FLOAT'),
+        ('min_contactor_rating', 'FLOAT'),
+        ('status', 'INTEGER'),
+        ('total_cost', 'FLOAT'),
+        ('recommendation', 'TEXT'),
+        ('assembly_solver', 'VARCHAR(20)'),
+        ('starting_methods_version', 'INTEGER'),
+        ('computed_at', 'FLOAT'),
+    ):
+        _add_column(connection, 'motors', column, ddl)
+    _create_index(connection, 'ix_motors_schedule_id', 'motors', ['schedule_id'])
+    # Changes logged before there were several consumers all belong to the recommendation grid
+    _add_column(connection, 'catalog_changes', 'consumer', "VARCHAR(30) NOT NULL DEFAULT 'recommendation_grid'")
+
+
+# Ordered; never rename or reorder an entry once it has shipped
+MIGRATIONS = [
+    ('0001_link_part_manufacturers', link_part_manufacturers),
+    ('0002_add_selection_indexes', add_selection_indexes),
+    ('0003_create_search_index', create_search_index),
+    ('0004_add_part_checksums', add_part_checksums),
+    ('0005_add_frame_price_index', add_frame_price_index),
+    ('0006_add_motor_schedules', add_motor_schedules),
+]
+
+
+def _ensure_migrations_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations (version VARCHAR(100) PRIMARY KEY, applied_at FLOAT)'
+    ))
+
+
+def pending_migrations(connection):
+    _ensure_migrations_table(connection)
+    applied = set(connection.execute(text('SELECT version FROM schema_migrations')).scalars())
+    return [(version, migrate) for version, migrate in MIGRATIONS if version not in applied]
+
+
+def upgrade_database():
+    """Create missing tables, then apply pending migrations; returns the versions applied"""
+    db.create_all()
+
+    applied = []
+    with db.engine.begin() as connection:
+        for version, migrate in pending_migrations(connection):
+            migrate(connection)
+            connection.execute(
+                text('INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)'),
+                {'version': version, 'applied_at': time.time()}
+            )
+            applied.append(version)
+    return applied
+
+
+if __name__ == '__main__':
+    from src.main import create_app
+
+    with create_app().app_context():
+        versions = upgrade_database()
+    print(f"✓ Applied {len(versions)} migration(s): {', '.join(versions)}" if versions else "✓ Database is up to date")
@@ -5,54 +5,93 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from flask import Flask
 from flask_cors import CORS
 from src.models.user import db
-from src.routes.user import user_bp
-from src.routes.switchgear import switchgear_bp
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-# CORS configuration
-CORS(app, origins=['https://calm-unicorn-63d58d.netlify.app'] )
+def create_app(config=None):
+    """
+    Build the Flask application. Does not touch the database schema; run
+    ``python -m src.database.migrations`` (or init_database.py) once before
+    starting workers.
+    """
+    # Imported here so that importing this module stays cheap for scripts and the gunicorn master
+    from src.database.engine import engine_profile, init_engine
+    from src.services.json_provider import configure_json_provider
+    from src.services.request_metrics import init_request_metrics
+    from src.services.static_assets import get_static_manifest, init_static_manifest, static_response
+    from src.routes.user import user_bp
+    from src.routes.switchgear import switchgear_bp
+    from src.routes.schedule import schedule_bp
 
-db.init_app(app)
+    app = Flask(__name__)
+    # DATABASE_URL, pool sizes, SQLite pragmas and CATALOG_READ_ONLY come from the environment
+    app.config.update(engine_profile())
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Serve selections and full-row listings from the in-memory catalog index (set to 0 to query SQL directly)
+    app.config['CATALOG_INDEX_ENABLED'] = os.environ.get('CATALOG_INDEX_ENABLED', '1') != '0'
+    # File for a columnar catalog snapshot mmapped by every worker; unset keeps one in-memory index per process
+    app.config['CATALOG_SNAPSHOT_PATH'] = os.environ.get('CATALOG_SNAPSHOT_PATH')
+    app.config['CATALOG_VERSION_TTL'] = float(os.environ.get('CATALOG_VERSION_TTL', '1.0'))
+    app.config['CATALOG_CACHE_MAX_AGE'] = int(os.environ.get('CATALOG_CACHE_MAX_AGE', '60'))
+    app.config['CATALOG_PAGE_SIZE'] = int(os.environ.get('CATALOG_PAGE_SIZE', '100'))
+    app.config['CATALOG_MAX_PAGE_SIZE'] = int(os.environ.get('CATALOG_MAX_PAGE_SIZE', '1000'))
+    app.config['USER_PAGE_SIZE'] = int(os.environ.get('USER_PAGE_SIZE', '100'))
+    app.config['USER_MAX_PAGE_SIZE'] = int(os.environ.get('USER_MAX_PAGE_SIZE', '1000'))
+    app.config['USER_BULK_LIMIT'] = int(os.environ.get('USER_BULK_LIMIT', '10000'))
+    # Rows fetched per round trip by /export
+    app.config['EXPORT_BATCH_SIZE'] = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+    app.config['CALCULATE_BATCH_LIMIT'] = int(os.environ.get('CALCULATE_BATCH_LIMIT', '5000'))
+    # Largest parameter grid /sweep evaluates in one request
+    app.config['SWEEP_MAX_POINTS'] = int(os.environ.get('SWEEP_MAX_POINTS', '10000'))
+    # 'optimal' picks contactors and overload relay together for the lowest total cost; 'greedy' picks role by role
+    app.config['ASSEMBLY_SOLVER'] = os.environ.get('ASSEMBLY_SOLVER', 'optimal')
+    # Memoized /calculate payloads (size 0 disables the cache)
+    app.config['RECOMMENDATION_CACHE_SIZE'] = int(os.environ.get('RECOMMENDATION_CACHE_SIZE', '1024'))
+    app.config['RECOMMENDATION_CACHE_TTL'] = float(os.environ.get('RECOMMENDATION_CACHE_TTL', '300'))
+    # Identical concurrent /calculate requests share one computation (set to 0 to compute each)
+    app.config['CALCULATE_COALESCING'] = os.environ.get('CALCULATE_COALESCING', '1') != '0'
+    # Answer standard IEC ratings from the precomputed grid (build it with build_recommendation_grid.py)
+    app.config['RECOMMENDATION_GRID_ENABLED'] = os.environ.get('RECOMMENDATION_GRID_ENABLED', '1') != '0'
+    # 'json' (stdlib) or 'orjson'
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'json')
+    if config:
+        app.config.update(config)
+    configure_json_provider(app)
 
-# SAFE database creation - handles existing tables
-with app.app_context():
-    try:
-        db.create_all()
-    except Exception as e:
-        print(f"Database tables may already exist: {e}")
+    # CORS configuration
+    CORS(app, origins=['https://calm-unicorn-63d58d.netlify.app'] )
 
-app.register_blueprint(user_bp, url_prefix='/api/users')
-app.register_blueprint(switchgear_bp, url_prefix='/api/switchgear')
+    db.init_app(app)
+    init_engine(app)
+    init_request_metrics(app)
+    # Index (and compress) the frontend build once instead of touching the disk per request
+    init_static_manifest(app)
 
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 5001))
-    app.run(host='0.0.0.0', port=port, debug=False)
-# Import all models to ensure they are registered
-from src.models.switchgear import Manufacturer, StartingMethod, Contactor, OverloadRelay, Motor
+    app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(switchgear_bp, url_prefix='/api/switchgear')
+    app.register_blueprint(schedule_bp, url_prefix='/api/schedules')
 
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        manifest = get_static_manifest()
+        if manifest is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+        asset = manifest.get(path) if path != "" else None
+        if asset is None:
+            asset = manifest.get('index.html')
+            if asset is None:
+                return "index.html not found", 404
+        return static_response(asset)
+
+    return app
 
 
 if __name__ == '__main__':
+    from src.database.migrations import upgrade_database
+
+    app = create_app()
+    with app.app_context():
+        upgrade_database()
     port = int(os.environ.get('PORT', 5001))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -1,11 +1,18 @@
 from src.models.user import db
+from functools import lru_cache
+from sqlalchemy import event
 import json
 
+@lru_cache(maxsize=1024)
+def parse_contactor_frames(raw):
+    """Parse a compatible_contactor_frames JSON column once per distinct value"""
+    return tuple(json.loads(raw)) if raw else ()
+
 class Manufacturer(db.Model):
     __tablename__ = 'manufacturers'
     
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     country = db.Column(db.String(50))
     website = db.Column(db.String(200))
     
@@ -45,10 +52,17 @@ class StartingMethod(db.Model):
 
 class Contactor(db.Model):
     __tablename__ = 'contactors'
+    __table_args__ = (
+        db.Index('ix_contactors_selection', 'voltage_rating', 'current_rating', 'price'),
+        db.Index('ix_contactors_frame_price', 'frame_size', 'price'),
+        db.Index('ux_contactors_part', 'manufacturer', 'model', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     model = db.Column(db.String(50), nullable=False)
     manufacturer = db.Column(db.String(100), nullable=False)
+    manufacturer_id = db.Column(db.Integer, db.ForeignKey('manufacturers.id'), index=True)
+    manufacturer_ref = db.relationship('Manufacturer')
     current_rating = db.Column(db.Float, nullable=False)  # Amperes
     voltage_rating = db.Column(db.Integer, nullable=False)  # Volts
     utilization_category = db.Column(db.String(10), default='AC-3')
@@ -59,6 +73,7 @@ class Contactor(db.Model):
     price = db.Column(db.Float)
     image_url = db.Column(db.String(200))
     datasheet_url = db.Column(db.String(200))
+    checksum = db.Column(db.String(40))                      # Content hash set by the catalog importer
     
     def to_dict(self):
         return {
@@ -79,10 +94,16 @@ class Contactor(db.Model):
 
 class OverloadRelay(db.Model):
     __tablename__ = 'overload_relays'
+    __table_args__ = (
+        db.Index('ix_overload_relays_selection', 'current_range_min', 'current_range_max', 'price'),
+        db.Index('ux_overload_relays_part', 'manufacturer', 'model', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     model = db.Column(db.String(50), nullable=False)
     manufacturer = db.Column(db.String(100), nullable=False)
+    manufacturer_id = db.Column(db.Integer, db.ForeignKey('manufacturers.id'), index=True)
+    manufacturer_ref = db.relationship('Manufacturer')
     current_range_min = db.Column(db.Float, nullable=False)  # Minimum current in Amperes
     current_range_max = db.Column(db.Float, nullable=False)  # Maximum current in Amperes
     trip_class = db.Column(db.Integer, default=10)           # Trip class (10, 20, 30)
@@ -91,6 +112,7 @@ class OverloadRelay(db.Model):
     price = db.Column(db.Float)
     image_url = db.Column(db.String(200))
     datasheet_url = db.Column(db.String(200))
+    checksum = db.Column(db.String(40))                      # Content hash set by the catalog importer
     
     def to_dict(self):
         return {
@@ -102,12 +124,56 @@ class OverloadRelay(db.Model):
             'current_range': f"{self.current_range_min}-{self.current_range_max}A",
             'trip_class': self.trip_class,
             'reset_type': self.reset_type,
-            'compatible_contactor_frames': json.loads(self.compatible_contactor_frames) if self.compatible_contactor_frames else [],
+            'compatible_contactor_frames': list(parse_contactor_frames(self.compatible_contactor_frames)),
             'price': self.price,
             'image_url': self.image_url,
             'datasheet_url': self.datasheet_url
         }
 
+@event.listens_for(db.session, 'before_flush')
+def _link_part_manufacturers(session, flush_context, instances):
+    """Resolve the manufacturer name of new or edited parts to a Manufacturer row"""
+    parts = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, (Contactor, OverloadRelay)) and obj.manufacturer
+        and (obj.manufacturer_id is None or db.inspect(obj).attrs.manufacturer.history.has_changes())
+    ]
+    if not parts:
+        return
+    
+    names = {part.manufacturer for part in parts}
+    manufacturers = {}
+    with session.no_autoflush:
+        for manufacturer in Manufacturer.query.filter(Manufacturer.name.in_(names)).order_by(Manufacturer.id):
+            manufacturers.setdefault(manufacturer.name, manufacturer)
+    for manufacturer in session.new:
+        if isinstance(manufacturer, Manufacturer) and manufacturer.name in names:
+            manufacturers.setdefault(manufacturer.name, manufacturer)
+    
+    for part in parts:
+        manufacturer = manufacturers.get(part.manufacturer)
+        if manufacturer is None:
+            manufacturer = manufacturers[part.manufacturer] = Manufacturer(name=part.manufacturer)
+            session.add(manufacturer)
+        part.manufacturer_ref = manufacturer
+
+class MotorSchedule(db.Model):
+    """A project's list of motors, e.g. one MCC"""
+    __tablename__ = 'motor_schedules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.Float)
+    updated_at = db.Column(db.Float)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
 class Motor(db.Model):
     __tablename__ = 'motors'
     
@@ -122,6 +188,19 @@ class Motor(db.Model):
     efficiency = db.Column(db.Float, default=0.9)
     starting_current_multiplier = db.Column(db.Float, default=7.0)
     
+    # Schedule membership and the persisted selection
+    schedule_id = db.Column(db.Integer, db.ForeignKey('motor_schedules.id'), index=True)
+    tag = db.Column(db.String(50))                           # Equipment tag, e.g. P-101
+    starting_method = db.Column(db.String(50))
+    circuit_breaker_rating = db.Column(db.Float)
+    min_contactor_rating = db.Column(db.Float)               # Lowest rating any contactor role accepts; NULL if no contactor can help
+    status = db.Column(db.Integer)
+    total_cost = db.Column(db.Float)
+    recommendation = db.Column(db.Text)                      # JSON /calculate payload (or error)
+    assembly_solver = db.Column(db.String(20))
+    starting_methods_version = db.Column(db.Integer)
+    computed_at = db.Column(db.Float)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -133,6 +212,73 @@ class Motor(db.Model):
             'full_load_current': self.full_load_current,
             'power_factor': self.power_factor,
             'efficiency': self.efficiency,
-            'starting_current_multiplier': self.starting_current_multiplier
+            'starting_current_multiplier': self.starting_current_multiplier,
+            'schedule_id': self.schedule_id,
+            'tag': self.tag,
+            'starting_method': self.starting_method,
+            'circuit_breaker_rating': self.circuit_breaker_rating,
+            'status': self.status,
+            'total_cost': self.total_cost,
+            'computed_at': self.computed_at
+        }
+
+class MotorPart(db.Model):
+    """Reverse index from a catalog part to the persisted motors whose selection uses it"""
+    __tablename__ = 'motor_parts'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    part_id = db.Column(db.Integer, primary_key=True)
+    motor_id = db.Column(db.Integer, db.ForeignKey('motors.id'), primary_key=True, index=True)
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.Float)                         # Unix timestamp of last change
+    
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version,
+            'updated_at': self.updated_at
         }
 
+
+class CatalogChange(db.Model):
+    """Contactor and overload relay writes not yet applied to data derived from the catalog"""
+    __tablename__ = 'catalog_changes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    consumer = db.Column(db.String(30), nullable=False)      # See CHANGE_CONSUMERS in catalog_changes
+    table_name = db.Column(db.String(50), nullable=False)
+    part_id = db.Column(db.Integer)                          # Set for ORM writes; bulk imports log the part key
+    manufacturer = db.Column(db.String(100))
+    model = db.Column(db.String(50))
+    changed_at = db.Column(db.Float)
+
+
+class RecommendationGridCell(db.Model):
+    """Precomputed /calculate result for a standard motor rating, voltage and starting method"""
+    __tablename__ = 'recommendation_grid'
+    
+    power_kw = db.Column(db.Float, primary_key=True)
+    voltage = db.Column(db.Integer, primary_key=True)
+    starting_method = db.Column(db.String(50), primary_key=True)
+    full_load_current = db.Column(db.Float)
+    circuit_breaker_rating = db.Column(db.Float)
+    status = db.Column(db.Integer, nullable=False)
+    contactor_ids = db.Column(db.Text)                       # JSON array of the selected contactor ids
+    overload_relay_id = db.Column(db.Integer)
+    body = db.Column(db.Text, nullable=False)                # JSON recommendation (or error) payload
+
+
+class RecommendationGridState(db.Model):
+    """Single row describing the catalog the recommendation grid was computed from"""
+    __tablename__ = 'recommendation_grid_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    catalog_version = db.Column(db.String(100), nullable=False)  # JSON array, see recommendation_catalog_version
+    assembly_solver = db.Column(db.String(20), nullable=False)
+    built_at = db.Column(db.Float)
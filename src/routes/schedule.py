@@ -0,0 +1,80 @@
+import time
+
+from flask import Blueprint, jsonify, request
+from src.models.user import db
+from src.models.switchgear import Motor, MotorSchedule
+from src.services.motor_schedules import (
+    ScheduleError, add_schedule_motors, create_schedule, delete_schedule_motors, motor_result,
+    parse_schedule_motors, refresh_motor_selections, schedule_detail, schedule_totals
+)
+
+schedule_bp = Blueprint('schedule', __name__)
+
+@schedule_bp.route('', methods=['GET'])
+def get_schedules():
+    """Every schedule with its motor count, total cost and stale flag (see POST /refresh)"""
+    return jsonify(schedule_totals())
+
+@schedule_bp.route('', methods=['POST'])
+def create_motor_schedule():
+    """Persist a motor schedule and the switchgear selected for each motor"""
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'No data provided'}), 400
+
+    name = data.get('name')
+    if not isinstance(name, str) or not name.strip() or len(name) > 100:
+        return jsonify({'error': 'name must be a non-empty string of at most 100 characters'}), 400
+    try:
+        motors = parse_schedule_motors(data.get('motors'))
+    except ScheduleError as e:
+        return jsonify({'error': str(e)}), 400
+
+    schedule = create_schedule(name, motors)
+    return jsonify(schedule_detail(schedule)), 201
+
+@schedule_bp.route('/refresh', methods=['POST'])
+def refresh_schedules():
+    """Recompute the motor selections affected by catalog writes since the last refresh (all with full=true)"""
+    data = request.get_json(silent=True) or {}
+    full = data.get('full', False) if isinstance(data, dict) else False
+    if not isinstance(full, bool):
+        return jsonify({'error': 'full must be a boolean'}), 400
+    return jsonify(refresh_motor_selections(full=full))
+
+@schedule_bp.route('/<int:schedule_id>', methods=['GET'])
+def get_schedule(schedule_id):
+    """A schedule's motors, selections and bill of materials; stale until catalog writes are refreshed"""
+    schedule = db.get_or_404(MotorSchedule, schedule_id)
+    return jsonify(schedule_detail(schedule))
+
+@schedule_bp.route('/<int:schedule_id>', methods=['DELETE'])
+def delete_schedule(schedule_id):
+    schedule = db.get_or_404(MotorSchedule, schedule_id)
+    delete_schedule_motors(Motor.schedule_id == schedule.id)
+    db.session.delete(schedule)
+    db.session.commit()
+    return '', 204
+
+@schedule_bp.route('/<int:schedule_id>/motors', methods=['POST'])
+def add_motors(schedule_id):
+    """Add motors to a schedule"""
+    schedule = db.get_or_404(MotorSchedule, schedule_id)
+    data = request.json
+    try:
+        motors = parse_schedule_motors(data.get('motors') if isinstance(data, dict) else data)
+    except ScheduleError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = add_schedule_motors(schedule, motors)
+    return jsonify([motor_result(motor) for motor in rows]), 201
+
+@schedule_bp.route('/<int:schedule_id>/motors/<int:motor_id>', methods=['DELETE'])
+def delete_motor(schedule_id, motor_id):
+    motor = db.get_or_404(Motor, motor_id)
+    if motor.schedule_id != schedule_id:
+        return jsonify({'error': 'Motor not found in this schedule'}), 404
+    delete_schedule_motors(Motor.id == motor.id)
+    db.session.get(MotorSchedule, schedule_id).updated_at = time.time()
+    db.session.commit()
+    return '', 204
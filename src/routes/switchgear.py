@@ -1,10 +1,30 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 import math
-import json
+import time
+import numpy as np
 from src.models.user import db
 from src.models.switchgear import (
-    Manufacturer, StartingMethod, Contactor, OverloadRelay, Motor
+    Manufacturer, StartingMethod, Contactor, OverloadRelay, Motor, parse_contactor_frames
 )
+from src.database.engine import catalog_session
+from src.services.assembly_solver import assembly_solver_enabled, solve_assembly
+from src.services.catalog_index import (
+    ContactorIndex, OverloadRelayIndex, catalog_index_enabled,
+    get_contactor_index, get_overload_relay_index, get_serialized_rows, get_starting_method_table
+)
+from src.services.catalog_export import EXPORT_FORMATS, EXPORT_TABLES, export_chunks
+from src.services.catalog_search import PART_TYPES, search_parts
+from src.services.parameter_sweep import SweepError, parse_sweep, run_sweep
+from src.services.catalog_query import CatalogQueryError, list_catalog, parse_fields, serialized_listing
+from src.services.http_cache import catalog_conditional
+from src.services.json_provider import compact_responses, dumps_response_body, json_response
+from src.services.request_coalescing import calculation_coalescing_enabled, get_calculation_flights
+from src.services.request_metrics import get_request_metrics, set_starting_method_label
+from src.services.catalog_version import CATALOG_TABLES, get_catalog_version
+from src.services.recommendation_cache import (
+    get_recommendation_cache, recommendation_cache_key, recommendation_catalog_version
+)
+from src.services.recommendation_grid import get_recommendation_grid, recommendation_grid_enabled
 
 switchgear_bp = Blueprint('switchgear', __name__)
 
@@ -16,57 +36,71 @@ def calculate_full_load_current(power_kw, voltage, power_factor=0.8, efficiency=
     flc = power_watts / (sqrt_3 * voltage * power_factor * efficiency)
     return round(flc, 2)
 
-def get_compatible_starting_methods(motor_power_hp):
+def get_compatible_starting_methods(motor_power_hp, methods=None):
     """Return list of compatible starting methods based on motor power"""
+    if methods is None and catalog_index_enabled():
+        return get_starting_method_table().lookup(motor_power_hp)
+    
     compatible_methods = []
     
-    methods = StartingMethod.query.all()
+    if methods is None:
+        methods = [method.to_dict() for method in catalog_session().scalars(db.select(StartingMethod))]
     for method in methods:
-        if (method.min_power_hp <= motor_power_hp <= method.max_power_hp):
-            compatible_methods.append(method.to_dict())
+        if (method['min_power_hp'] <= motor_power_hp <= method['max_power_hp']):
+            compatible_methods.append(method)
     
     return compatible_methods
 
-def select_best_contactor(min_current_rating, min_voltage_rating):
+def select_best_contactor(min_current_rating, min_voltage_rating, index=None):
     """Query database for the most cost-effective contactor meeting requirements"""
-    contactor = Contactor.query.filter(
+    if index is None and catalog_index_enabled():
+        index = get_contactor_index()
+    if index is not None:
+        return index.select(min_current_rating, min_voltage_rating)
+    
+    contactor = catalog_session().scalars(db.select(Contactor).where(
         Contactor.current_rating >= min_current_rating,
         Contactor.voltage_rating >= min_voltage_rating
-    ).order_by(Contactor.current_rating.asc(), Contactor.price.asc()).first()
+    ).order_by(Contactor.current_rating.asc(), Contactor.price.asc(), Contactor.id.asc()).limit(1)).first()
     
     return contactor
 
-def select_overload_relay(flc, contactor_frame_size):
+def select_overload_relay(flc, contactor_frame_size, index=None):
     """Select overload relay with range covering FLC ± 20%"""
+    if index is None and catalog_index_enabled():
+        index = get_overload_relay_index()
+    if index is not None:
+        return index.select(flc, contactor_frame_size)
+    
     lower_limit = flc * 0.8
     upper_limit = flc * 1.2
     
     # Query for suitable overload relays
-    relays = OverloadRelay.query.filter(
+    relays = catalog_session().scalars(db.select(OverloadRelay).where(
         OverloadRelay.current_range_min <= lower_limit,
         OverloadRelay.current_range_max >= upper_limit
-    ).order_by(OverloadRelay.price.asc()).all()
+    ).order_by(OverloadRelay.price.asc(), OverloadRelay.id.asc())).all()
     
     # Filter by compatible frame size
     for relay in relays:
-        compatible_frames = json.loads(relay.compatible_contactor_frames) if relay.compatible_contactor_frames else []
+        compatible_frames = parse_contactor_frames(relay.compatible_contactor_frames)
         if contactor_frame_size in compatible_frames or not compatible_frames:
             return relay
     
     # If no exact match, find closest range
-    closest_relay = OverloadRelay.query.filter(
+    closest_relay = catalog_session().scalars(db.select(OverloadRelay).where(
         OverloadRelay.current_range_min <= flc,
         OverloadRelay.current_range_max >= flc
-    ).order_by(OverloadRelay.price.asc()).first()
+    ).order_by(OverloadRelay.price.asc(), OverloadRelay.id.asc()).limit(1)).first()
     
     return closest_relay
 
-def generate_contactors_for_starting_method(starting_method, circuit_breaker_rating, voltage):
+def generate_contactors_for_starting_method(starting_method, circuit_breaker_rating, voltage, index=None):
     """Generate contactor recommendations based on starting method"""
     contactor_rating = circuit_breaker_rating
     
     if starting_method == 'DOL':
-        main_contactor = select_best_contactor(contactor_rating, voltage)
+        main_contactor = select_best_contactor(contactor_rating, voltage, index)
         if not main_contactor:
             return None
             
@@ -77,14 +111,14 @@ def generate_contactors_for_starting_method(starting_method, circuit_breaker_rat
         }
     
     elif starting_method == 'Star-Delta':
-        main_contactor = select_best_contactor(contactor_rating, voltage)
+        main_contactor = select_best_contactor(contactor_rating, voltage, index)
         if not main_contactor:
             return None
             
         # Star and Delta contactors can be smaller (typically 58% of main)
         star_delta_rating = contactor_rating * 0.58
-        star_contactor = select_best_contactor(star_delta_rating, voltage)
-        delta_contactor = select_best_contactor(star_delta_rating, voltage)
+        star_contactor = select_best_contactor(star_delta_rating, voltage, index)
+        delta_contactor = select_best_contactor(star_delta_rating, voltage, index)
         
         if not star_contactor or not delta_contactor:
             return None
@@ -100,7 +134,7 @@ def generate_contactors_for_starting_method(starting_method, circuit_breaker_rat
         }
     
     elif starting_method in ['Soft Starter', 'VFD']:
-        bypass_contactor = select_best_contactor(contactor_rating, voltage)
+        bypass_contactor = select_best_contactor(contactor_rating, voltage, index)
         if not bypass_contactor:
             return None
             
@@ -178,6 +212,163 @@ def generate_component_list(contactors, overload_relay, starting_method):
     
     return components
 
+def parse_motor_specification(data):
+    """Normalize the motor inputs of a /calculate body; returns (spec, error)"""
+    if not data:
+        return None, {'error': 'No data provided'}
+    
+    # Extract and validate motor specifications
+    motor_power_hp = data.get('motor_power_hp')
+    motor_power_kw = data.get('motor_power_kw')
+    starting_method = data.get('starting_method')
+    
+    # Convert between HP and kW if needed
+    if motor_power_hp and not motor_power_kw:
+        motor_power_kw = motor_power_hp * 0.746
+    elif motor_power_kw and not motor_power_hp:
+        motor_power_hp = motor_power_kw / 0.746
+    elif not motor_power_hp and not motor_power_kw:
+        return None, {'error': 'Motor power must be specified in HP or kW'}
+    
+    if not starting_method:
+        return None, {'error': 'Starting method must be specified'}
+    
+    return {
+        'motor_power_hp': motor_power_hp,
+        'motor_power_kw': motor_power_kw,
+        'voltage': data.get('voltage', 415),
+        'frequency': data.get('frequency', 50),
+        'starting_method': starting_method,
+        'power_factor': data.get('power_factor', 0.8),
+        'efficiency': data.get('efficiency', 0.9)
+    }, None
+
+def build_recommendation(spec, compatible_methods, flc=None, circuit_breaker_rating=None,
+                         contactor_index=None, relay_index=None):
+    """Run the selection pipeline for one motor; returns (body, status_code)"""
+    motor_power_hp = spec['motor_power_hp']
+    starting_method = spec['starting_method']
+    voltage = spec['voltage']
+    
+    # Check starting method compatibility
+    compatible_method_names = [method['name'] for method in compatible_methods]
+    
+    if starting_method not in compatible_method_names:
+        return {
+            'error': f"Starting method '{starting_method}' not suitable for {motor_power_hp} HP motor",
+            'compatible_methods': compatible_methods
+        }, 400
+    
+    # Calculate Full Load Current
+    if flc is None:
+        flc = calculate_full_load_current(spec['motor_power_kw'], voltage, spec['power_factor'], spec['efficiency'])
+    
+    # Calculate circuit breaker rating (FLC × 1.5)
+    if circuit_breaker_rating is None:
+        circuit_breaker_rating = round(flc * 1.5, 2)
+    
+    if assembly_solver_enabled():
+        # Contactors and overload relay chosen together for the lowest total cost
+        contactors, overload_relay = solve_assembly(starting_method, circuit_breaker_rating, voltage, flc,
+                                                    contactor_index, relay_index)
+    else:
+        # Select contactors based on starting method
+        contactors = generate_contactors_for_starting_method(starting_method, circuit_breaker_rating, voltage,
+                                                             index=contactor_index)
+    
+    if not contactors:
+        return {'error': 'No suitable contactors found for the specified requirements'}, 404
+    
+    if not assembly_solver_enabled():
+        # Select overload relay
+        main_contactor = (contactors.get('main_contactor') or 
+                         contactors.get('bypass_contactor') or 
+                         contactors.get('input_contactor'))
+        
+        if main_contactor:
+            overload_relay = select_overload_relay(flc, main_contactor.get('frame_size', ''), index=relay_index)
+        else:
+            overload_relay = None
+    
+    # Calculate total cost
+    total_cost = contactors['total_cost']
+    if overload_relay:
+        total_cost += overload_relay.price
+    
+    # Generate component list
+    component_list = generate_component_list(contactors, overload_relay, starting_method)
+    
+    # Generate recommendation response
+    return {
+        'motor_specifications': {
+            'power_hp': round(motor_power_hp, 1),
+            'power_kw': round(spec['motor_power_kw'], 2),
+            'voltage': voltage,
+            'frequency': spec['frequency'],
+            'full_load_current': flc,
+            'power_factor': spec['power_factor'],
+            'efficiency': spec['efficiency']
+        },
+        'starting_method': starting_method,
+        'circuit_breaker_rating': circuit_breaker_rating,
+        'contactors': contactors,
+        'overload_relay': overload_relay.to_dict() if overload_relay else None,
+        'total_cost': round(total_cost, 2),
+        'component_list': component_list,
+        'compatible_starting_methods': compatible_methods
+    }, 200
+
+def calculate_full_load_currents(specs):
+    """Vectorized FLC and circuit breaker ratings for a list of parsed motor specs"""
+    power_kw = np.array([spec['motor_power_kw'] for spec in specs], dtype=float)
+    voltage = np.array([spec['voltage'] for spec in specs], dtype=float)
+    power_factor = np.array([spec['power_factor'] for spec in specs], dtype=float)
+    efficiency = np.array([spec['efficiency'] for spec in specs], dtype=float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_flc = power_kw * 1000 / (math.sqrt(3) * voltage * power_factor * efficiency)
+    
+    # Round with Python's round() so results match the single-motor endpoint exactly
+    flcs = [round(value, 2) for value in raw_flc.tolist()]
+    breakers = [round(value, 2) for value in (np.array(flcs) * 1.5).tolist()]
+    return flcs, breakers
+
+NUMERIC_MOTOR_FIELDS = ('motor_power_hp', 'motor_power_kw', 'voltage', 'power_factor', 'efficiency')
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def summarize_bill_of_materials(recommendations):
+    """Aggregate component lists of several recommendations into BOM totals"""
+    lines = {}
+    total_cost = 0.0
+    for recommendation in recommendations:
+        total_cost += recommendation['total_cost']
+        for component in recommendation['component_list']:
+            key = (component['component'], component['model'], component['manufacturer'])
+            line = lines.get(key)
+            if line is None:
+                line = lines[key] = {
+                    'component': component['component'],
+                    'model': component['model'],
+                    'manufacturer': component['manufacturer'],
+                    'quantity': 0,
+                    'unit_price': component['unit_price'],
+                    'total_price': 0.0
+                }
+            line['quantity'] += component['quantity']
+            line['total_price'] += component['total_price'] or 0.0
+    
+    bill_of_materials = sorted(lines.values(), key=lambda line: (line['component'], line['manufacturer'], line['model']))
+    for line in bill_of_materials:
+        line['total_price'] = round(line['total_price'], 2)
+    
+    return {
+        'bill_of_materials': bill_of_materials,
+        'total_components': sum(line['quantity'] for line in bill_of_materials),
+        'total_cost': round(total_cost, 2)
+    }
+
 # API Endpoints
 
 @switchgear_bp.route('/calculate', methods=['POST', 'OPTIONS'])
@@ -187,154 +378,312 @@ def calculate_recommendation():
         return '', 200
         
     try:
-        data = request.json
+        spec, error = parse_motor_specification(request.json)
+        if error:
+            return jsonify(error), 400
         
-        # Validate input
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
+        catalog_version = recommendation_catalog_version()
+        if recommendation_grid_enabled():
+            # Standard IEC ratings are precomputed by refresh_recommendation_grid
+            body = get_recommendation_grid().lookup(spec, catalog_version)
+            if body is not None:
+                set_starting_method_label(spec['starting_method'])
+                return json_response(body)
         
-        # Extract and validate motor specifications
-        motor_power_hp = data.get('motor_power_hp')
-        motor_power_kw = data.get('motor_power_kw')
-        voltage = data.get('voltage', 415)
-        frequency = data.get('frequency', 50)
-        starting_method = data.get('starting_method')
-        power_factor = data.get('power_factor', 0.8)
-        efficiency = data.get('efficiency', 0.9)
+        cache = get_recommendation_cache()
+        if cache.maxsize > 0:
+            body = cache.get(recommendation_cache_key(spec), catalog_version)
+            if body is not None:
+                # Only successful recommendations are cached, so the starting method is a known one
+                set_starting_method_label(spec['starting_method'])
+                return json_response(body)
         
-        # Convert between HP and kW if needed
-        if motor_power_hp and not motor_power_kw:
-            motor_power_kw = motor_power_hp * 0.746
-        elif motor_power_kw and not motor_power_hp:
-            motor_power_hp = motor_power_kw / 0.746
-        elif not motor_power_hp and not motor_power_kw:
-            return jsonify({'error': 'Motor power must be specified in HP or kW'}), 400
+        def compute():
+            compatible_methods = get_compatible_starting_methods(spec['motor_power_hp'])
+            # Label only with catalog method names to keep the metric's cardinality bounded
+            known = any(method['name'] == spec['starting_method'] for method in compatible_methods)
+            recommendation, status = build_recommendation(spec, compatible_methods)
+            body = dumps_response_body(recommendation)
+            if status == 200 and cache.maxsize > 0:
+                # Cache the encoded body so hits skip serialization entirely
+                cache.put(recommendation_cache_key(spec), catalog_version, body)
+            return body, status, spec['starting_method'] if known else 'other'
         
-        if not starting_method:
-            return jsonify({'error': 'Starting method must be specified'}), 400
-        
-        # Check starting method compatibility
-        compatible_methods = get_compatible_starting_methods(motor_power_hp)
-        compatible_method_names = [method['name'] for method in compatible_methods]
-        
-        if starting_method not in compatible_method_names:
-            return jsonify({
-                'error': f"Starting method '{starting_method}' not suitable for {motor_power_hp} HP motor",
-                'compatible_methods': compatible_methods
-            }), 400
-        
-        # Calculate Full Load Current
-        flc = calculate_full_load_current(motor_power_kw, voltage, power_factor, efficiency)
+        if calculation_coalescing_enabled():
+            # Identical requests arriving while this one is computed wait for its body instead
+            body, status, label = get_calculation_flights().run(
+                (recommendation_cache_key(spec), catalog_version), compute
+            )
+        else:
+            body, status, label = compute()
+        set_starting_method_label(label)
+        return json_response(body, status)
         
-        # Calculate circuit breaker rating (FLC × 1.5)
-        circuit_breaker_rating = round(flc * 1.5, 2)
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+@switchgear_bp.route('/calculate/batch', methods=['POST', 'OPTIONS'])
+def calculate_batch_recommendation():
+    """Size a whole motor schedule (e.g. an MCC) in one request"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.json
+        motors = data.get('motors') if isinstance(data, dict) else data
         
-        # Select contactors based on starting method
-        contactors = generate_contactors_for_starting_method(starting_method, circuit_breaker_rating, voltage)
+        if not motors or not isinstance(motors, list):
+            return jsonify({'error': 'A non-empty list of motors must be provided'}), 400
         
-        if not contactors:
-            return jsonify({'error': 'No suitable contactors found for the specified requirements'}), 404
+        batch_limit = current_app.config.get('CALCULATE_BATCH_LIMIT', 5000)
+        if len(motors) > batch_limit:
+            return jsonify({'error': f'A batch may contain at most {batch_limit} motors'}), 400
         
-        # Select overload relay
-        main_contactor = (contactors.get('main_contactor') or 
-                         contactors.get('bypass_contactor') or 
-                         contactors.get('input_contactor'))
+        results = [None] * len(motors)
+        parsed = []
+        for position, motor in enumerate(motors):
+            if not isinstance(motor, dict):
+                error = {'error': 'No data provided'}
+            elif not all(_is_number(motor[field]) for field in NUMERIC_MOTOR_FIELDS if motor.get(field) is not None):
+                error = {'error': 'Motor power, voltage, power factor and efficiency must be numeric'}
+            else:
+                spec, error = parse_motor_specification(motor)
+            if error:
+                results[position] = {'index': position, 'status': 400, **error}
+            else:
+                parsed.append((position, spec))
         
-        if main_contactor:
-            overload_relay = select_overload_relay(flc, main_contactor.get('frame_size', ''))
+        # Fetch the catalog once for the whole batch
+        if catalog_index_enabled():
+            starting_methods = None
+            contactor_index = get_contactor_index()
+            relay_index = get_overload_relay_index()
         else:
-            overload_relay = None
+            session = catalog_session()
+            starting_methods = [method.to_dict() for method in session.scalars(db.select(StartingMethod))]
+            contactor_index = ContactorIndex(contactor.to_dict() for contactor in session.scalars(db.select(Contactor)))
+            relay_index = OverloadRelayIndex(relay.to_dict() for relay in session.scalars(db.select(OverloadRelay)))
         
-        # Calculate total cost
-        total_cost = contactors['total_cost']
-        if overload_relay:
-            total_cost += overload_relay.price
+        flcs, breakers = calculate_full_load_currents([spec for _, spec in parsed])
         
-        # Generate component list
-        component_list = generate_component_list(contactors, overload_relay, starting_method)
-        
-        # Generate recommendation response
-        recommendation = {
-            'motor_specifications': {
-                'power_hp': round(motor_power_hp, 1),
-                'power_kw': round(motor_power_kw, 2),
-                'voltage': voltage,
-                'frequency': frequency,
-                'full_load_current': flc,
-                'power_factor': power_factor,
-                'efficiency': efficiency
-            },
-            'starting_method': starting_method,
-            'circuit_breaker_rating': circuit_breaker_rating,
-            'contactors': contactors,
-            'overload_relay': overload_relay.to_dict() if overload_relay else None,
-            'total_cost': round(total_cost, 2),
-            'component_list': component_list,
-            'compatible_starting_methods': compatible_methods
-        }
-        
-        return jsonify(recommendation), 200
+        recommendations = []
+        for (position, spec), flc, circuit_breaker_rating in zip(parsed, flcs, breakers):
+            if not math.isfinite(flc):
+                results[position] = {
+                    'index': position, 'status': 400,
+                    'error': 'Full load current is undefined for the given voltage, power factor and efficiency'
+                }
+                continue
+            
+            compatible_methods = get_compatible_starting_methods(spec['motor_power_hp'], starting_methods)
+            body, status = build_recommendation(spec, compatible_methods, flc, circuit_breaker_rating,
+                                                contactor_index, relay_index)
+            if status == 200:
+                recommendations.append(body)
+                results[position] = {'index': position, 'status': status, 'recommendation': body}
+            else:
+                results[position] = {'index': position, 'status': status, **body}
         
+        return jsonify({
+            'results': results,
+            'summary': {
+                'motors': len(motors),
+                'succeeded': len(recommendations),
+                'failed': len(motors) - len(recommendations),
+                **summarize_bill_of_materials(recommendations)
+            }
+        }), 200
+    
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
+@switchgear_bp.route('/sweep', methods=['POST', 'OPTIONS'])
+def sweep_parameters():
+    """Selections over ranges of motor power, voltage, power factor and efficiency"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        starting_method, axes = parse_sweep(request.json, current_app.config.get('SWEEP_MAX_POINTS', 10000))
+    except SweepError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        return jsonify(run_sweep(starting_method, axes)), 200
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+@switchgear_bp.route('/calculate/cache', methods=['GET'])
+def get_recommendation_cache_stats():
+    """Hit, miss and eviction counters of the recommendation cache"""
+    return jsonify(get_recommendation_cache().stats())
+
 @switchgear_bp.route('/starting-methods', methods=['GET'])
+@catalog_conditional('starting_methods')
 def get_starting_methods():
     """Get all available starting methods"""
-    methods = StartingMethod.query.all()
+    if serve_serialized_rows():
+        return json_response(get_serialized_rows(StartingMethod).array())
+    methods = catalog_session().scalars(db.select(StartingMethod)).all()
     return jsonify([method.to_dict() for method in methods])
 
 @switchgear_bp.route('/starting-methods/<float:power_hp>', methods=['GET'])
+@catalog_conditional('starting_methods')
 def get_compatible_starting_methods_for_power(power_hp):
     """Get compatible starting methods for a specific motor power"""
     compatible_methods = get_compatible_starting_methods(power_hp)
     return jsonify(compatible_methods)
 
 @switchgear_bp.route('/contactors', methods=['GET'])
+@catalog_conditional('contactors', 'manufacturers')
 def get_contactors():
-    """Get all contactors with optional filtering"""
-    min_current = request.args.get('min_current', type=float)
-    max_current = request.args.get('max_current', type=float)
-    voltage = request.args.get('voltage', type=int)
-    manufacturer = request.args.get('manufacturer')
+    """Get all contactors with optional filtering, projection and keyset pagination"""
+    return _catalog_listing(Contactor, contactor_filters(request.args), Contactor.current_rating)
+
+@switchgear_bp.route('/overload-relays', methods=['GET'])
+@catalog_conditional('overload_relays', 'manufacturers')
+def get_overload_relays():
+    """Get all overload relays with optional filtering, projection and keyset pagination"""
+    return _catalog_listing(OverloadRelay, overload_relay_filters(request.args), OverloadRelay.current_range_min)
+
+def contactor_filters(args):
+    """SQL conditions for the min_current/max_current/voltage/manufacturer/manufacturer_id contactor filters"""
+    min_current = args.get('min_current', type=float)
+    max_current = args.get('max_current', type=float)
+    voltage = args.get('voltage', type=int)
+    manufacturer = args.get('manufacturer')
+    manufacturer_id = args.get('manufacturer_id', type=int)
     
-    query = Contactor.query
+    conditions = []
     
     if min_current:
-        query = query.filter(Contactor.current_rating >= min_current)
+        conditions.append(Contactor.current_rating >= min_current)
     if max_current:
-        query = query.filter(Contactor.current_rating <= max_current)
+        conditions.append(Contactor.current_rating <= max_current)
     if voltage:
-        query = query.filter(Contactor.voltage_rating >= voltage)
+        conditions.append(Contactor.voltage_rating >= voltage)
     if manufacturer:
-        query = query.filter(Contactor.manufacturer.ilike(f'%{manufacturer}%'))
+        conditions.append(Contactor.manufacturer_id.in_(manufacturer_ids_named(manufacturer)))
+    if manufacturer_id:
+        conditions.append(Contactor.manufacturer_id == manufacturer_id)
     
-    contactors = query.order_by(Contactor.current_rating.asc()).all()
-    return jsonify([contactor.to_dict() for contactor in contactors])
+    return conditions
 
-@switchgear_bp.route('/overload-relays', methods=['GET'])
-def get_overload_relays():
-    """Get all overload relays with optional filtering"""
-    min_current = request.args.get('min_current', type=float)
-    max_current = request.args.get('max_current', type=float)
-    manufacturer = request.args.get('manufacturer')
+def overload_relay_filters(args):
+    """SQL conditions for the min_current/max_current/manufacturer/manufacturer_id overload relay filters"""
+    min_current = args.get('min_current', type=float)
+    max_current = args.get('max_current', type=float)
+    manufacturer = args.get('manufacturer')
+    manufacturer_id = args.get('manufacturer_id', type=int)
     
-    query = OverloadRelay.query
+    conditions = []
     
     if min_current:
-        query = query.filter(OverloadRelay.current_range_min <= min_current)
+        conditions.append(OverloadRelay.current_range_min <= min_current)
     if max_current:
-        query = query.filter(OverloadRelay.current_range_max >= max_current)
+        conditions.append(OverloadRelay.current_range_max >= max_current)
     if manufacturer:
-        query = query.filter(OverloadRelay.manufacturer.ilike(f'%{manufacturer}%'))
+        conditions.append(OverloadRelay.manufacturer_id.in_(manufacturer_ids_named(manufacturer)))
+    if manufacturer_id:
+        conditions.append(OverloadRelay.manufacturer_id == manufacturer_id)
+    
+    return conditions
+
+def manufacturer_ids_named(name):
+    """
+    Ids of the manufacturers called exactly name, resolved against the small
+    manufacturers table. Substring matching on manufacturer is left to /search.
+    """
+    return catalog_session().execute(
+        db.select(Manufacturer.id).where(Manufacturer.name == name)
+    ).scalars().all()
+
+def _catalog_listing(model, conditions, sort_column):
+    """Apply the shared fields/limit/cursor parameters to a catalog listing"""
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    
+    if cursor is not None and limit is None:
+        limit = current_app.config.get('CATALOG_PAGE_SIZE', 100)
+    if limit is not None and not 0 < limit <= current_app.config.get('CATALOG_MAX_PAGE_SIZE', 1000):
+        return jsonify({'error': f"limit must be between 1 and {current_app.config.get('CATALOG_MAX_PAGE_SIZE', 1000)}"}), 400
+    
+    try:
+        fields = parse_fields(model, request.args.get('fields'))
+        if request.args.get('fields') is None and serve_serialized_rows():
+            body = serialized_listing(model, conditions, sort_column, limit, cursor)
+            if body is not None:
+                return json_response(body)
+        result = list_catalog(model, conditions, sort_column, fields, limit, cursor)
+    except CatalogQueryError as e:
+        return jsonify({'error': str(e)}), 400
     
-    relays = query.order_by(OverloadRelay.current_range_min.asc()).all()
-    return jsonify([relay.to_dict() for relay in relays])
+    return jsonify(result)
+
+def serve_serialized_rows():
+    """Whether full-row listings can be assembled from the pre-encoded catalog rows"""
+    return catalog_index_enabled() and compact_responses()
+
+@switchgear_bp.route('/export', methods=['GET'])
+def export_catalog():
+    """Stream every contactor or overload relay as NDJSON or CSV, gzipped if the client accepts it"""
+    table = request.args.get('table')
+    file_format = request.args.get('format', 'ndjson')
+    
+    if table not in EXPORT_TABLES:
+        return jsonify({'error': f"table must be one of: {', '.join(EXPORT_TABLES)}"}), 400
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    compress = request.accept_encodings.quality('gzip') > 0
+    chunks = export_chunks(EXPORT_TABLES[table], file_format,
+                           current_app.config.get('EXPORT_BATCH_SIZE', 1000), compress)
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[file_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{table}.{file_format}"'
+    response.vary.add('Accept-Encoding')
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@switchgear_bp.route('/search', methods=['GET'])
+@catalog_conditional('contactors', 'overload_relays', 'manufacturers')
+def search_catalog():
+    """Ranked search over part model, manufacturer, frame size and utilization category"""
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'Search query q must be specified'}), 400
+    
+    part_type = request.args.get('type')
+    if part_type and part_type not in PART_TYPES:
+        return jsonify({'error': f"type must be one of: {', '.join(PART_TYPES)}"}), 400
+    part_types = [part_type] if part_type else list(PART_TYPES)
+    
+    limit = request.args.get('limit', default=current_app.config.get('CATALOG_PAGE_SIZE', 100), type=int)
+    if not 0 < limit <= current_app.config.get('CATALOG_MAX_PAGE_SIZE', 1000):
+        return jsonify({'error': f"limit must be between 1 and {current_app.config.get('CATALOG_MAX_PAGE_SIZE', 1000)}"}), 400
+    
+    conditions = {
+        'contactor': contactor_filters(request.args),
+        'overload_relay': overload_relay_filters(request.args)
+    }
+    results = search_parts(query, part_types, conditions, limit)
+    
+    return jsonify({
+        'query': query,
+        'count': len(results),
+        'results': [
+            {'part_type': result_type, 'rank': rank, 'part': part.to_dict()}
+            for result_type, rank, part in results
+        ]
+    })
 
 @switchgear_bp.route('/manufacturers', methods=['GET'])
+@catalog_conditional('manufacturers')
 def get_manufacturers():
     """Get all manufacturers"""
-    manufacturers = Manufacturer.query.all()
+    if serve_serialized_rows():
+        return json_response(get_serialized_rows(Manufacturer).array())
+    manufacturers = catalog_session().scalars(db.select(Manufacturer)).all()
     return jsonify([manufacturer.to_dict() for manufacturer in manufacturers])
 
 @switchgear_bp.route('/health', methods=['GET'])
@@ -346,3 +695,32 @@ def health_check():
         'version': '1.0.0'
     })
 
+@switchgear_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: round-trips the catalog database and reports its latency"""
+    started = time.perf_counter()
+    try:
+        catalog_session().execute(db.text('SELECT 1')).scalar()
+        latency_ms = (time.perf_counter() - started) * 1000
+        versions = {table: get_catalog_version(table) for table in CATALOG_TABLES.values()}
+    except Exception as e:
+        return jsonify({
+            'status': 'unavailable',
+            'service': 'Motor Switchgear Selection API',
+            'error': f'Database unavailable: {str(e)}'
+        }), 503
+    
+    return jsonify({
+        'status': 'ready',
+        'service': 'Motor Switchgear Selection API',
+        'version': '1.0.0',
+        'database': {'latency_ms': round(latency_ms, 3)},
+        'catalog_versions': versions
+    })
+
+@switchgear_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Request latency and SQL histograms in the Prometheus text format"""
+    return current_app.response_class(get_request_metrics().render() + get_calculation_flights().render(),
+                                      mimetype='text/plain; version=0.0.4')
+
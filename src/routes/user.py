@@ -1,12 +1,44 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from src.models.user import User, db
+from src.services.user_import import bulk_create_users
 
 user_bp = Blueprint('user', __name__)
 
+def _is_positive_int(value):
+    return value.isascii() and value.isdigit() and int(value) > 0
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """
+    All users, or with limit and/or cursor one page of them in id order;
+    pass next_cursor back as cursor for the next page
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    statement = db.select(User).order_by(User.id.asc())
+    if limit is None and cursor is None:
+        return jsonify([user.to_dict() for user in db.session.scalars(statement)])
+    
+    if limit is None:
+        limit = str(current_app.config.get('USER_PAGE_SIZE', 100))
+    max_limit = current_app.config.get('USER_MAX_PAGE_SIZE', 1000)
+    if not _is_positive_int(limit) or not 0 < int(limit) <= max_limit:
+        return jsonify({'error': f'limit must be between 1 and {max_limit}'}), 400
+    if cursor is not None and not _is_positive_int(cursor):
+        return jsonify({'error': 'Invalid cursor'}), 400
+    limit = int(limit)
+    
+    if cursor is not None:
+        statement = statement.where(User.id > int(cursor))
+    # Fetch one extra row to learn whether another page exists
+    users = db.session.scalars(statement.limit(limit + 1)).all()
+    has_more = len(users) > limit
+    users = users[:limit]
+    return jsonify({
+        'items': [user.to_dict() for user in users],
+        'limit': limit,
+        'next_cursor': users[-1].id if has_more else None
+    })
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
@@ -17,6 +49,26 @@ def create_user():
     db.session.commit()
     return jsonify(user.to_dict()), 201
 
+@user_bp.route('/users/bulk', methods=['POST'])
+def create_users_bulk():
+    """Create many users in one transaction, reporting conflicts per row"""
+    data = request.json
+    rows = data.get('users') if isinstance(data, dict) else data
+    
+    if not rows or not isinstance(rows, list):
+        return jsonify({'error': 'A non-empty list of users must be provided'}), 400
+    
+    batch_limit = current_app.config.get('USER_BULK_LIMIT', 10000)
+    if len(rows) > batch_limit:
+        return jsonify({'error': f'A batch may contain at most {batch_limit} users'}), 400
+    
+    results = bulk_create_users(rows)
+    created = sum(1 for result in results if result['status'] == 201)
+    return jsonify({
+        'results': results,
+        'summary': {'users': len(rows), 'created': created, 'failed': len(rows) - created}
+    }), 200
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
@@ -0,0 +1,171 @@
+"""
+Cost-optimal contactor and overload relay assemblies.
+
+The greedy selection picks each contactor role on its own and then looks
+for an overload relay that fits the main contactor's frame. The solver
+instead chooses the main contactor and relay together. Relays that cover
+FLC ± 20% are tried cheapest first. Each is paired with the cheapest
+sufficient contactor of a frame it fits. Because every assembly costs at
+least the relay price plus the cheapest sufficient contactor of any frame,
+the search stops once that bound exceeds the best assembly found. Roles
+that are not frame-matched (star and delta) are independent and simply
+take the cheapest sufficient contactor.
+
+With the catalog index enabled, candidates come from the in-memory indexes.
+Otherwise the relays covering FLC ± 20% are fetched first, then one query
+returns the cheapest sufficient contactor overall and the cheapest of each
+frame size those relays fit.
+"""
+
+from flask import current_app
+from sqlalchemy import func, union_all
+
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay, parse_contactor_frames
+from src.database.engine import catalog_session
+from src.services.catalog_index import (
+    ContactorIndex, catalog_index_enabled, get_contactor_index, get_overload_relay_index
+)
+
+# Contactor roles per starting method, with the fraction of the circuit breaker rating each must carry
+ASSEMBLY_ROLES = {
+    'DOL': (('main_contactor', 1.0),),
+    'Star-Delta': (('main_contactor', 1.0), ('star_contactor', 0.58), ('delta_contactor', 0.58)),
+    'Soft Starter': (('bypass_contactor', 1.0),),
+    'VFD': (('bypass_contactor', 1.0),),
+}
+
+# The role whose frame size the overload relay has to fit
+PROTECTED_ROLES = ('main_contactor', 'bypass_contactor')
+
+
+def assembly_solver_enabled():
+    """Whether recommendations use the cost-optimal solver instead of greedy per-role lookups"""
+    return current_app.config.get('ASSEMBLY_SOLVER', 'optimal') == 'optimal'
+
+
+def _fetch_relay_candidates(flc):
+    """Priced relays covering FLC ± 20% as (key, frames, relay), cheapest first"""
+    relays = catalog_session().scalars(db.select(OverloadRelay).where(
+        OverloadRelay.current_range_min <= flc * 0.8,
+        OverloadRelay.current_range_max >= flc * 1.2,
+        OverloadRelay.price.isnot(None)
+    ).order_by(OverloadRelay.price.asc(), OverloadRelay.id.asc())).all()
+    return [
+        ((1, relay.price, relay.id), frozenset(parse_contactor_frames(relay.compatible_contactor_frames)), relay)
+        for relay in relays
+    ]
+
+
+def _fetch_fallback_relay(flc):
+    return catalog_session().scalars(db.select(OverloadRelay).where(
+        OverloadRelay.current_range_min <= flc,
+        OverloadRelay.current_range_max >= flc,
+        OverloadRelay.price.isnot(None)
+    ).order_by(OverloadRelay.price.asc(), OverloadRelay.id.asc()).limit(1)).first()
+
+
+def _fetch_contactor_candidates(min_ratings, protected_rating, voltage, frames):
+    """
+    One query for every contactor the solver can pick: the cheapest priced contactor
+    for each minimum rating, and the cheapest of each given frame size
+    """
+    sufficient = (Contactor.voltage_rating >= voltage, Contactor.price.isnot(None))
+    parts = []
+    for rating in sorted(set(min_ratings)):
+        cheapest = db.select(Contactor.id).where(Contactor.current_rating >= rating, *sufficient) \
+            .order_by(Contactor.price.asc(), Contactor.id.asc()).limit(1).subquery()
+        parts.append(db.select(cheapest.c.id))
+    if frames:
+        ranked = db.select(
+            Contactor.id,
+            func.row_number().over(
+                partition_by=Contactor.frame_size,
+                order_by=(Contactor.price.asc(), Contactor.id.asc())
+            ).label('position')
+        ).where(
+            Contactor.frame_size.in_(sorted(frames)),
+            Contactor.current_rating >= protected_rating,
+            *sufficient
+        ).subquery()
+        parts.append(db.select(ranked.c.id).where(ranked.c.position == 1))
+
+    rows = catalog_session().scalars(db.select(Contactor).where(Contactor.id.in_(union_all(*parts)))).all()
+    return ContactorIndex(row.to_dict() for row in rows)
+
+
+def _contactor_cost(contactor):
+    return (contactor.price, contactor.id)
+
+
+def solve_assembly(starting_method, circuit_breaker_rating, voltage, flc, contactor_index=None, relay_index=None):
+    """
+    Lowest-cost contactors and overload relay for a motor; returns
+    (contactors, overload_relay) shaped like generate_contactors_for_starting_method
+    and select_overload_relay, or (None, None) when no contactor fits.
+    """
+    roles = ASSEMBLY_ROLES.get(starting_method)
+    if roles is None or circuit_breaker_rating is None or flc is None:
+        return None, None
+
+    if contactor_index is None and catalog_index_enabled():
+        contactor_index = get_contactor_index()
+    if relay_index is None and catalog_index_enabled():
+        relay_index = get_overload_relay_index()
+    if relay_index is not None:
+        relays, fallback_relay = relay_index.assembly_candidates(flc)
+    else:
+        relays, fallback_relay = _fetch_relay_candidates(flc), None
+    if contactor_index is None:
+        frames = set().union(*(frames for _, frames, _ in relays))
+        contactor_index = _fetch_contactor_candidates(
+            [circuit_breaker_rating * factor for _, factor in roles], circuit_breaker_rating, voltage, frames
+        )
+
+    picks = {}
+    for role, factor in roles:
+        if role not in PROTECTED_ROLES:
+            picks[role] = contactor_index.cheapest(circuit_breaker_rating * factor, voltage)
+            if picks[role] is None:
+                return None, None
+
+    protected_role = next(role for role, _ in roles if role in PROTECTED_ROLES)
+    cheapest_any = contactor_index.cheapest(circuit_breaker_rating, voltage)
+    if cheapest_any is None:
+        return None, None
+
+    cheapest_by_frame = {}
+    best = None
+    for _, frames, relay in relays:
+        # Bound: this relay and every later (pricier) one cost at least this much in any assembly
+        if best is not None and relay.price + cheapest_any.price > best[0]:
+            break
+
+        if frames:
+            fitting = []
+            for frame in frames:
+                if frame not in cheapest_by_frame:
+                    cheapest_by_frame[frame] = contactor_index.cheapest(circuit_breaker_rating, voltage, frame)
+                if cheapest_by_frame[frame] is not None:
+                    fitting.append(cheapest_by_frame[frame])
+            if not fitting:
+                continue
+            contactor = min(fitting, key=_contactor_cost)
+        else:
+            contactor = cheapest_any
+
+        cost = contactor.price + relay.price
+        if best is None or cost < best[0]:
+            best = (cost, contactor, relay)
+
+    if best is not None:
+        _, picks[protected_role], overload_relay = best
+    else:
+        # No frame-compatible relay covers FLC ± 20%: cheapest contactor and the cheapest relay covering FLC
+        picks[protected_role] = cheapest_any
+        overload_relay = fallback_relay if relay_index is not None else _fetch_fallback_relay(flc)
+
+    contactors = {role: picks[role].to_dict() for role, _ in roles}
+    contactors['quantity'] = len(roles)
+    contactors['total_cost'] = sum(picks[role].price for role, _ in roles)
+    return contactors, overload_relay
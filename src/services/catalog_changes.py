@@ -0,0 +1,173 @@
+"""
+Log of contactor and overload relay writes for derived data.
+
+Results derived from the catalog (the recommendation grid, persisted motor
+schedules) are brought up to date incrementally from this log. Each such
+consumer gets its own copy of every logged write while it has data to keep
+current, and deletes its rows once it has applied them. ORM flushes are
+logged here; bulk imports call ``log_part_changes`` themselves.
+
+``selection_affected`` decides whether written parts can change a stored
+/calculate result.
+"""
+
+import time
+from collections import defaultdict
+
+from sqlalchemy import and_, event, func, union
+
+from src.models.user import db
+from src.models.switchgear import (
+    CatalogChange, Contactor, MotorSchedule, OverloadRelay, RecommendationGridState
+)
+from src.services.assembly_solver import ASSEMBLY_ROLES
+
+PART_TABLES = {Contactor: 'contactors', OverloadRelay: 'overload_relays'}
+# Consumer -> table whose rows mean the consumer has derived data to keep current
+CHANGE_CONSUMERS = {
+    'recommendation_grid': RecommendationGridState,
+    'motor_schedules': MotorSchedule,
+}
+
+
+def active_change_consumers(connection):
+    """Consumers that need part writes logged"""
+    return [
+        consumer for consumer, model in CHANGE_CONSUMERS.items()
+        if connection.execute(db.select(model.id).limit(1)).first() is not None
+    ]
+
+
+def log_part_changes(connection, table_name, parts, consumers):
+    """Log written parts, given as dicts with part_id and/or manufacturer and model, for each consumer"""
+    if parts and consumers:
+        now = time.time()
+        connection.execute(CatalogChange.__table__.insert(), [{
+            'consumer': consumer,
+            'table_name': table_name,
+            'part_id': part.get('part_id'),
+            'manufacturer': part.get('manufacturer'),
+            'model': part.get('model'),
+            'changed_at': now,
+        } for consumer in consumers for part in parts])
+
+
+@event.listens_for(db.session, 'after_flush')
+def _log_part_writes(session, flush_context):
+    parts = defaultdict(list)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table_name = PART_TABLES.get(type(obj))
+        if table_name:
+            parts[table_name].append({'part_id': obj.id, 'manufacturer': obj.manufacturer, 'model': obj.model})
+    if parts:
+        consumers = active_change_consumers(session.connection())
+        for table_name, written in parts.items():
+            log_part_changes(session.connection(), table_name, written, consumers)
+
+
+def pending_changes(consumer):
+    """(upto, count) of the consumer's logged writes; applied rows are deleted, so all rows up to upto are pending"""
+    upto, count = db.session.execute(
+        db.select(func.max(CatalogChange.id), func.count(CatalogChange.id)).where(CatalogChange.consumer == consumer)
+    ).one()
+    return upto or 0, count
+
+
+def clear_changes(consumer, upto):
+    """Delete the consumer's logged writes up to upto once they are applied"""
+    changes = CatalogChange.__table__
+    db.session.execute(changes.delete().where(changes.c.consumer == consumer, changes.c.id <= upto))
+
+
+def changed_part_ids(model, consumer, upto):
+    """Select of the ids of current parts the consumer has writes logged for, up to change upto"""
+    part = model.__table__
+    changes = CatalogChange.__table__
+    window = (changes.c.consumer == consumer, changes.c.table_name == PART_TABLES[model], changes.c.id <= upto)
+    by_id = db.select(part.c.id).join(changes, changes.c.part_id == part.c.id).where(*window)
+    by_key = db.select(part.c.id).join(changes, and_(
+        changes.c.part_id.is_(None),
+        changes.c.manufacturer == part.c.manufacturer,
+        changes.c.model == part.c.model,
+    )).where(*window)
+    return union(by_id, by_key)
+
+
+def changed_parts(model, consumer, upto):
+    """Current rows of the parts logged up to change upto, and the logged part ids (deleted parts included)"""
+    part = model.__table__
+    changes = CatalogChange.__table__
+    rows = db.session.execute(
+        db.select(part).where(part.c.id.in_(changed_part_ids(model, consumer, upto)))
+    ).all()
+    logged_ids = set(db.session.scalars(db.select(changes.c.part_id).where(
+        changes.c.consumer == consumer, changes.c.table_name == PART_TABLES[model],
+        changes.c.id <= upto, changes.c.part_id.isnot(None)
+    )))
+    return rows, logged_ids | {row.id for row in rows}
+
+
+def selection_parts(body):
+    """(contactor ids, overload relay id) picked by a successful recommendation payload"""
+    contactor_ids = [part['id'] for part in body['contactors'].values() if isinstance(part, dict)]
+    overload_relay_id = body['overload_relay']['id'] if body['overload_relay'] else None
+    return contactor_ids, overload_relay_id
+
+
+def minimum_contactor_rating(starting_method, circuit_breaker_rating):
+    """Lowest contactor rating any role of the starting method accepts"""
+    factor = min((factor for _, factor in ASSEMBLY_ROLES.get(starting_method, ())), default=1.0)
+    return circuit_breaker_rating * factor
+
+
+def _uses_fallback_relay(body):
+    """Whether the relay was picked only because no frame-compatible relay covers FLC ± 20%"""
+    relay = body['overload_relay']
+    flc = body['motor_specifications']['full_load_current']
+    protected = body['contactors'].get('main_contactor') or body['contactors'].get('bypass_contactor')
+    frames = relay['compatible_contactor_frames']
+    return relay['current_range_min'] > flc * 0.8 or relay['current_range_max'] < flc * 1.2 or \
+        bool(frames) and protected['frame_size'] not in frames
+
+
+def selection_affected(selection, body, contactors, relays, assembly_solver):
+    """
+    Whether any written contactor or relay row could take part in a stored
+    selection. selection has the voltage, starting_method,
+    circuit_breaker_rating, full_load_current and status it was computed
+    for; body is its payload. Parts the selection uses are checked by the
+    caller.
+    """
+    min_rating = minimum_contactor_rating(selection.starting_method, selection.circuit_breaker_rating)
+    sufficient = [
+        row for row in contactors
+        if row.voltage_rating >= selection.voltage and row.current_rating >= min_rating
+    ]
+    if selection.status != 200:
+        # Only a new sufficient contactor can make an unanswerable selection possible
+        return bool(sufficient)
+
+    total_cost = body['total_cost']
+    if assembly_solver == 'optimal':
+        # Any assembly using a part costs at least its price; unpriced parts are never picked
+        def could_win(row):
+            return row.price is not None and row.price <= total_cost
+        if any(could_win(row) for row in sufficient):
+            return True
+    else:
+        # Greedy picks the lowest sufficient rating, so only ratings up to the current picks matter
+        largest_pick = max(part['current_rating'] for part in body['contactors'].values() if isinstance(part, dict))
+        if any(row.current_rating <= largest_pick for row in sufficient):
+            return True
+
+    flc = selection.full_load_current
+    covering = [row for row in relays if row.current_range_min <= flc <= row.current_range_max]
+    if not covering:
+        return False
+    relay = body['overload_relay']
+    if relay is None or _uses_fallback_relay(body):
+        return True
+    if assembly_solver == 'optimal':
+        return any(could_win(row) for row in covering)
+    return any(row.price is None or relay['price'] is None or row.price <= relay['price'] for row in covering)
+
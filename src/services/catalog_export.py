@@ -0,0 +1,90 @@
+"""
+Streaming export of whole part tables as NDJSON or CSV.
+
+Rows are read with one ordered SELECT fetched in ``yield_per`` batches
+(a server-side cursor where the driver has one) and encoded batch by
+batch, so memory stays flat however large the catalog is and the first
+bytes go out as soon as the first batch is read. Output can be gzipped on
+the fly. Both formats use the importer's field names, so an export can be
+fed back to import_catalog.py.
+"""
+
+import csv
+import io
+import zlib
+
+from src.models.user import db
+from src.database.engine import catalog_session
+from src.models.switchgear import Contactor, OverloadRelay
+from src.services.catalog_query import LISTING_FIELDS
+from src.services.json_provider import dumps_bytes
+
+EXPORT_TABLES = {
+    'contactors': Contactor,
+    'overload_relays': OverloadRelay,
+}
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _columns(model):
+    needed = []
+    for columns, _ in LISTING_FIELDS[model].values():
+        needed.extend(column for column in columns if column not in needed)
+    return [getattr(model, name) for name in needed]
+
+
+def export_batches(model, batch_size=1000):
+    """Yield lists of listing-shaped dicts for every row of model, in id order"""
+    field_specs = LISTING_FIELDS[model]
+    statement = db.select(*_columns(model)).order_by(model.id.asc()).execution_options(yield_per=batch_size)
+    result = catalog_session().execute(statement).mappings()
+    for rows in result.partitions():
+        batch = []
+        for row in rows:
+            item = {}
+            for field, (_, derive) in field_specs.items():
+                item[field] = derive(row) if derive else row[field]
+            batch.append(item)
+        yield batch
+
+
+def ndjson_chunks(batches):
+    """One JSON object per line"""
+    for batch in batches:
+        yield b''.join(dumps_bytes(item, separators=(',', ':')) + b'\n' for item in batch)
+
+
+def csv_chunks(batches, model):
+    """CSV with the importer's columns; relay frame lists are joined with '|'"""
+    fields = [field for field in LISTING_FIELDS[model] if field != 'current_range']
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in batches:
+        for item in batch:
+            writer.writerow([
+                '|'.join(item[field]) if isinstance(item[field], list) else item[field] for field in fields
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """gzip-encode a byte stream, flushing after every chunk so the client receives it right away"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_chunks(model, file_format, batch_size=1000, compress=False):
+    """Encoded byte chunks of a whole part table"""
+    batches = export_batches(model, batch_size)
+    chunks = csv_chunks(batches, model) if file_format == 'csv' else ndjson_chunks(batches)
+    return gzip_chunks(chunks) if compress else chunks
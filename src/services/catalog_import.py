@@ -0,0 +1,342 @@
+"""
+Streaming bulk importer for vendor catalog files.
+
+CSV and JSONL files (optionally gzip-compressed) are read in chunks and
+upserted with one executemany ``INSERT ... ON CONFLICT (manufacturer,
+model) DO UPDATE`` per chunk, all inside a single transaction. Every row
+carries a content checksum; rows whose checksum matches the stored one
+are skipped before they reach the database.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import time
+from itertools import islice
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db
+from src.models.switchgear import Contactor, Manufacturer, OverloadRelay
+from src.services.catalog_changes import active_change_consumers, log_part_changes
+from src.services.catalog_search import (
+    drop_search_triggers, install_search_triggers, rebuild_search_rows, search_index_available
+)
+from src.services.catalog_version import bump_catalog_version, invalidate_catalog_versions
+
+# Per part table: field -> (type, required)
+PART_FIELDS = {
+    Contactor: {
+        'model': (str, True),
+        'manufacturer': (str, True),
+        'current_rating': (float, True),
+        'voltage_rating': (int, True),
+        'utilization_category': (str, False),
+        'poles': (int, False),
+        'auxiliary_contacts': (str, False),
+        'coil_voltage': (int, False),
+        'frame_size': (str, False),
+        'price': (float, False),
+        'image_url': (str, False),
+        'datasheet_url': (str, False),
+    },
+    OverloadRelay: {
+        'model': (str, True),
+        'manufacturer': (str, True),
+        'current_range_min': (float, True),
+        'current_range_max': (float, True),
+        'trip_class': (int, False),
+        'reset_type': (str, False),
+        'compatible_contactor_frames': (list, False),
+        'price': (float, False),
+        'image_url': (str, False),
+        'datasheet_url': (str, False),
+    },
+}
+
+IMPORT_TARGETS = {
+    'contactors': Contactor,
+    'overload_relays': OverloadRelay,
+    'manufacturers': Manufacturer,
+}
+
+MANUFACTURER_FIELDS = ('name', 'country', 'website')
+
+# Changed rows in one chunk above which the search index is rebuilt in bulk rather than by triggers
+SEARCH_REBUILD_THRESHOLD = 1000
+
+
+class CatalogImportError(ValueError):
+    """Raised for a catalog row that cannot be imported"""
+
+
+def open_catalog_file(path):
+    """Open a possibly gzip-compressed catalog file as text"""
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise CatalogImportError(f'Cannot tell the format of {path}; use a .csv or .jsonl file or pass the format')
+
+
+def read_records(stream, file_format):
+    """Yield (line_number, dict) for each record of a CSV or JSONL stream"""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line:
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, CatalogImportError(f'invalid JSON: {e}')
+
+
+def _convert(value, kind):
+    if value is None or (isinstance(value, str) and value.strip() == ''):
+        return None
+    if kind is list:
+        if isinstance(value, list):
+            return [str(item) for item in value]
+        value = value.strip()
+        if value.startswith('['):
+            return [str(item) for item in json.loads(value)]
+        return [item.strip() for item in value.split('|') if item.strip()]
+    if kind is str:
+        return str(value).strip()
+    if kind is int:
+        return int(float(value))
+    return kind(value)
+
+
+def _field_specs(model):
+    """(field, type, required, column default) for each importable field of a part model"""
+    specs = []
+    for field, (kind, required) in PART_FIELDS[model].items():
+        default = model.__table__.c[field].default
+        specs.append((field, kind, required, default.arg if default is not None and not callable(default.arg) else None))
+    return specs
+
+
+def normalize_part(model, record, field_specs=None):
+    """Validate and convert one raw record into column values plus a checksum"""
+    if not isinstance(record, dict):
+        raise CatalogImportError('record is not an object')
+
+    row = {}
+    for field, kind, required, default in field_specs or _field_specs(model):
+        try:
+            value = _convert(record.get(field), kind)
+        except (TypeError, ValueError):
+            raise CatalogImportError(f'{field} must be of type {kind.__name__}') from None
+        if value is None:
+            if required:
+                raise CatalogImportError(f'{field} is required')
+            value = default
+        row[field] = value
+
+    if model is OverloadRelay:
+        if row['current_range_min'] > row['current_range_max']:
+            raise CatalogImportError('current_range_min is greater than current_range_max')
+        frames = row['compatible_contactor_frames']
+        row['compatible_contactor_frames'] = json.dumps(frames) if frames else None
+
+    payload = '\x1f'.join(map(repr, row.values()))
+    row['checksum'] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return row
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _upsert_statement(connection, model):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        insert = sqlite.insert
+    elif dialect == 'postgresql':
+        insert = postgresql.insert
+    else:
+        raise CatalogImportError(f'Bulk upsert is not supported on {dialect}')
+
+    table = model.__table__
+    statement = insert(table)
+    updated = [field for field in PART_FIELDS[model] if field not in ('manufacturer', 'model')]
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.manufacturer, table.c.model],
+        set_={field: statement.excluded[field] for field in (*updated, 'manufacturer_id', 'checksum')},
+        # Re-checked in SQL so a concurrent writer cannot make us overwrite with identical data
+        where=table.c.checksum.is_distinct_from(statement.excluded.checksum)
+    )
+
+
+class ImportReport:
+    def __init__(self, target):
+        self.target = target
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            'target': self.target,
+            'read': self.read,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'invalid': len(self.errors),
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def _import_manufacturers(connection, records, report):
+    table = Manufacturer.__table__
+    existing = {}
+    for row in connection.execute(db.select(table).order_by(table.c.id)):
+        existing.setdefault(row.name, dict(row._mapping))
+
+    for line_number, record in records:
+        report.read += 1
+        if isinstance(record, Exception):
+            report.errors.append((line_number, str(record)))
+            continue
+        if not isinstance(record, dict) or not _convert(record.get('name'), str):
+            report.errors.append((line_number, 'name is required'))
+            continue
+
+        values = {field: _convert(record.get(field), str) for field in MANUFACTURER_FIELDS}
+        current = existing.get(values['name'])
+        if current is None:
+            values['id'] = connection.execute(table.insert().values(**values)).inserted_primary_key[0]
+            report.inserted += 1
+        elif any(current[field] != values[field] for field in MANUFACTURER_FIELDS):
+            connection.execute(table.update().where(table.c.id == current['id']).values(**values))
+            values['id'] = current['id']
+            report.updated += 1
+        else:
+            report.unchanged += 1
+            continue
+        existing[values['name']] = values
+
+
+def _import_parts(connection, model, records, report, chunk_size):
+    table = model.__table__
+    manufacturers_table = Manufacturer.__table__
+    manufacturer_ids = {}
+    for row in connection.execute(db.select(manufacturers_table.c.id, manufacturers_table.c.name)
+                                  .order_by(manufacturers_table.c.id)):
+        manufacturer_ids.setdefault(row.name, row.id)
+    checksums = {
+        (row.manufacturer, row.model): row.checksum
+        for row in connection.execute(db.select(table.c.manufacturer, table.c.model, table.c.checksum))
+    }
+    upsert = _upsert_statement(connection, model)
+    field_specs = _field_specs(model)
+    search_triggers_dropped = False
+    change_consumers = active_change_consumers(connection)
+
+    for chunk in _chunks(records, chunk_size):
+        batch = {}
+        for line_number, record in chunk:
+            report.read += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                row = normalize_part(model, record, field_specs)
+            except CatalogImportError as e:
+                report.errors.append((line_number, str(e)))
+                continue
+
+            key = (row['manufacturer'], row['model'])
+            if checksums.get(key) == row['checksum']:
+                report.unchanged += 1
+                continue
+            if key in batch:
+                # Later rows of the same part win; count the earlier one as superseded
+                report.unchanged += 1
+            batch[key] = row
+
+        if not batch:
+            continue
+
+        missing = {row['manufacturer'] for row in batch.values()} - manufacturer_ids.keys()
+        for name in sorted(missing):
+            manufacturer_ids[name] = connection.execute(
+                manufacturers_table.insert().values(name=name)
+            ).inserted_primary_key[0]
+
+        if not search_triggers_dropped and len(batch) >= SEARCH_REBUILD_THRESHOLD and \
+                search_index_available(connection):
+            # Per-row FTS triggers dominate large imports; rebuild the index once at the end instead
+            drop_search_triggers(connection, table.name)
+            search_triggers_dropped = True
+
+        rows = []
+        for key, row in batch.items():
+            row['manufacturer_id'] = manufacturer_ids[row['manufacturer']]
+            if key not in checksums:
+                report.inserted += 1
+            else:
+                report.updated += 1
+            checksums[key] = row['checksum']
+            rows.append(row)
+        connection.execute(upsert, rows)
+        log_part_changes(connection, table.name, rows, change_consumers)
+
+    if search_triggers_dropped:
+        rebuild_search_rows(connection, table.name)
+        install_search_triggers(connection, table.name)
+
+
+def import_catalog(path, target, file_format=None, chunk_size=5000):
+    """
+    Import a CSV/JSONL catalog file into contactors, overload_relays or
+    manufacturers in one transaction. Must run inside an app context.
+    Returns an ImportReport.
+    """
+    model = IMPORT_TARGETS.get(target)
+    if model is None:
+        raise CatalogImportError(f"Unknown import target '{target}'; use one of: {', '.join(IMPORT_TARGETS)}")
+    file_format = file_format or detect_format(path)
+
+    report = ImportReport(target)
+    with open_catalog_file(path) as stream, db.engine.begin() as connection:
+        records = read_records(stream, file_format)
+        if model is Manufacturer:
+            _import_manufacturers(connection, records, report)
+        else:
+            _import_parts(connection, model, records, report, chunk_size)
+
+        if report.inserted or report.updated:
+            bump_catalog_version(connection, {'manufacturers', target})
+
+    invalidate_catalog_versions()
+    report.elapsed = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,372 @@
+"""
+Process-local, read-only indexes over the switchgear catalog.
+
+The selection functions in ``src.routes.switchgear`` answer from these
+structures instead of issuing one SQL query per lookup. Each index is tagged
+with the catalog version it was built from and is rebuilt lazily the first
+time it is requested after that version changes. With a shared catalog
+snapshot configured (``catalog_snapshot``), the selection lookups read the
+mapped snapshot instead.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import current_app
+
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay, StartingMethod
+from src.database.engine import catalog_lock, catalog_session
+from src.services.catalog_version import get_catalog_version
+from src.services.json_provider import dumps_bytes
+
+
+class CatalogRecord:
+    """Detached, read-only copy of a catalog row with the model's attribute interface"""
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"<CatalogRecord {self._data.get('model')}>"
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def _price_key(price):
+    # Mirrors SQL ``ORDER BY price ASC`` on SQLite, where NULL sorts first
+    return (0, 0.0) if price is None else (1, price)
+
+
+# Frame filter of ContactorIndex.cheapest meaning "any frame size"
+ANY_FRAME = object()
+
+
+def _cheapest_from(entries):
+    """Sort (current_rating, cost_key, record) entries by rating; suffix[i] is the cheapest of entries[i:]"""
+    entries.sort(key=lambda entry: entry[0])
+    suffix = [None] * len(entries)
+    best = None
+    for position in range(len(entries) - 1, -1, -1):
+        if best is None or entries[position][1] < best[0]:
+            best = entries[position][1:]
+        suffix[position] = best
+    return [entry[0] for entry in entries], suffix
+
+
+class ContactorIndex:
+    """Contactors grouped by voltage rating, each group sorted by (current_rating, price)"""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        groups = defaultdict(list)
+        priced = defaultdict(lambda: defaultdict(list))
+        for row in rows:
+            key = (row['current_rating'], *_price_key(row['price']), row['id'])
+            record = CatalogRecord(row)
+            groups[row['voltage_rating']].append((key, record))
+            if row['price'] is not None:
+                entry = (row['current_rating'], (row['price'], row['id']), record)
+                priced[ANY_FRAME][row['voltage_rating']].append(entry)
+                priced[row['frame_size']][row['voltage_rating']].append(entry)
+
+        self.voltages = sorted(groups)
+        self._groups = {}
+        for voltage, entries in groups.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._groups[voltage] = (
+                [key[0] for key, _ in entries],
+                [key for key, _ in entries],
+                [record for _, record in entries],
+            )
+
+        # frame (or ANY_FRAME) -> (sorted voltages, voltage -> cheapest-from tables) over priced contactors
+        self._cheapest = {}
+        for frame, by_voltage in priced.items():
+            self._cheapest[frame] = (
+                sorted(by_voltage),
+                {voltage: _cheapest_from(entries) for voltage, entries in by_voltage.items()},
+            )
+
+    def __len__(self):
+        return sum(len(group[2]) for group in self._groups.values())
+
+    def select(self, min_current_rating, min_voltage_rating):
+        """Cheapest contactor of the lowest sufficient rating, as the SQL query orders it"""
+        if min_current_rating is None or min_voltage_rating is None:
+            return None
+
+        best_key = None
+        best = None
+        for voltage in self.voltages[bisect_left(self.voltages, min_voltage_rating):]:
+            currents, keys, records = self._groups[voltage]
+            position = bisect_left(currents, min_current_rating)
+            if position < len(keys) and (best_key is None or keys[position] < best_key):
+                best_key = keys[position]
+                best = records[position]
+        return best
+
+    def cheapest(self, min_current_rating, min_voltage_rating, frame=ANY_FRAME):
+        """Lowest priced contactor of at least the given ratings, optionally of one frame size"""
+        voltages, tables = self._cheapest.get(frame, ((), None))
+        best = None
+        for voltage in voltages[bisect_left(voltages, min_voltage_rating):]:
+            currents, suffix = tables[voltage]
+            position = bisect_left(currents, min_current_rating)
+            if position < len(currents) and (best is None or suffix[position][0] < best[0]):
+                best = suffix[position]
+        return best[1] if best is not None else None
+
+
+class _IntervalNode:
+    __slots__ = ('center', 'by_min', 'by_max', 'left', 'right')
+
+    def __init__(self, center, entries):
+        self.center = center
+        self.by_min = sorted(entries, key=lambda entry: entry[0])
+        self.by_max = sorted(entries, key=lambda entry: entry[1], reverse=True)
+        self.left = None
+        self.right = None
+
+
+def _build_interval_tree(entries):
+    """Centered interval tree over (range_min, range_max, payload) entries"""
+    if not entries:
+        return None
+
+    endpoints = sorted(value for entry in entries for value in entry[:2])
+    center = endpoints[len(endpoints) // 2]
+    left = [entry for entry in entries if entry[1] < center]
+    right = [entry for entry in entries if entry[0] > center]
+    node = _IntervalNode(center, [entry for entry in entries if entry[0] <= center <= entry[1]])
+    node.left = _build_interval_tree(left)
+    node.right = _build_interval_tree(right)
+    return node
+
+
+class OverloadRelayIndex:
+    """Interval tree over relay current ranges with frame compatibility pre-parsed into sets"""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        entries = []
+        for row in rows:
+            frames = frozenset(row['compatible_contactor_frames'])
+            key = (*_price_key(row['price']), row['id'])
+            entries.append((row['current_range_min'], row['current_range_max'], (key, frames, CatalogRecord(row))))
+        self._count = len(entries)
+        self._root = _build_interval_tree(entries)
+
+    def __len__(self):
+        return self._count
+
+    def stab(self, current):
+        """Yield (range_min, range_max, payload) for every relay whose range contains current"""
+        node = self._root
+        while node is not None:
+            if current < node.center:
+                for entry in node.by_min:
+                    if entry[0] > current:
+                        break
+                    yield entry
+                node = node.left
+            elif current > node.center:
+                for entry in node.by_max:
+                    if entry[1] < current:
+                        break
+                    yield entry
+                node = node.right
+            else:
+                yield from node.by_min
+                return
+
+    def assembly_candidates(self, flc):
+        """
+        Priced relays covering FLC ± 20% as (key, frames, record), cheapest first,
+        and the cheapest priced relay covering FLC (None if there is none)
+        """
+        lower_limit = flc * 0.8
+        upper_limit = flc * 1.2
+        candidates = []
+        fallback_key = None
+        fallback = None
+        for range_min, range_max, (key, frames, record) in self.stab(flc):
+            if record.price is None:
+                continue
+            if fallback_key is None or key < fallback_key:
+                fallback_key, fallback = key, record
+            if range_min <= lower_limit and range_max >= upper_limit:
+                candidates.append((key, frames, record))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return candidates, fallback
+
+    def select(self, flc, contactor_frame_size):
+        """Cheapest frame-compatible relay covering FLC ± 20%, else the cheapest covering FLC"""
+        if flc is None:
+            return None
+
+        lower_limit = flc * 0.8
+        upper_limit = flc * 1.2
+        best_key = None
+        best = None
+        fallback_key = None
+        fallback = None
+        # Every range covering [0.8 FLC, 1.2 FLC] also contains FLC, so one stab answers both lookups
+        for range_min, range_max, (key, frames, record) in self.stab(flc):
+            if fallback_key is None or key < fallback_key:
+                fallback_key, fallback = key, record
+            if (range_min <= lower_limit and range_max >= upper_limit
+                    and (not frames or contactor_frame_size in frames)
+                    and (best_key is None or key < best_key)):
+                best_key, best = key, record
+        return best if best is not None else fallback
+
+
+class StartingMethodTable:
+    """Breakpoint table mapping motor power (HP) to the compatible starting methods"""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        methods = [row for row in rows if row['min_power_hp'] is not None and row['max_power_hp'] is not None]
+        self.breakpoints = sorted({row['min_power_hp'] for row in methods} | {row['max_power_hp'] for row in methods})
+
+        # at_breakpoint[i] covers power == breakpoints[i]; between[i] covers the open interval after it
+        self.at_breakpoint = []
+        self.between = []
+        for position, value in enumerate(self.breakpoints):
+            self.at_breakpoint.append([row for row in methods if row['min_power_hp'] <= value <= row['max_power_hp']])
+            if position + 1 < len(self.breakpoints):
+                upper = self.breakpoints[position + 1]
+                self.between.append([row for row in methods if row['min_power_hp'] <= value and upper <= row['max_power_hp']])
+        self.between.append([])
+
+    def lookup(self, motor_power_hp):
+        """Methods with min_power_hp <= motor_power_hp <= max_power_hp, in catalog order"""
+        if motor_power_hp != motor_power_hp:
+            return []
+
+        position = bisect_left(self.breakpoints, motor_power_hp)
+        if position < len(self.breakpoints) and self.breakpoints[position] == motor_power_hp:
+            return list(self.at_breakpoint[position])
+        if position == 0:
+            return []
+        return list(self.between[position - 1])
+
+
+class SerializedRows:
+    """Each row of a catalog table pre-encoded as a compact JSON fragment, in id order"""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.fragments = {row['id']: dumps_bytes(row, separators=(',', ':')) for row in rows}
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def array(self, ids=None):
+        """JSON array of the given rows (all rows when ids is None); None if any id is unknown"""
+        if ids is None:
+            return b'[' + b','.join(self.fragments.values()) + b']'
+        try:
+            return b'[' + b','.join([self.fragments[row_id] for row_id in ids]) + b']'
+        except KeyError:
+            # Row written after this snapshot's version was read; the caller falls back to SQL
+            return None
+
+
+class _IndexState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexes = {}
+
+
+def _state():
+    return current_app.extensions.setdefault('catalog_index', _IndexState())
+
+
+def _get_index(table_name, build, key=None):
+    version = get_catalog_version(table_name)
+    key = key or table_name
+    state = _state()
+    index = state.indexes.get(key)
+    if index is not None and index.version == version:
+        return index
+
+    with catalog_lock(state.lock):
+        index = state.indexes.get(key)
+        if index is None or index.version != version:
+            index = build(version)
+            state.indexes[key] = index
+    return index
+
+
+def get_versioned(table_name, build, key=None):
+    """Return build(version), memoized per app until the catalog version of table_name changes"""
+    return _get_index(table_name, build, key)
+
+
+def _load_all(model):
+    return catalog_session().scalars(db.select(model).order_by(model.id)).all()
+
+
+def catalog_index_enabled():
+    """Whether selections should use the in-memory indexes instead of SQL"""
+    return current_app.config.get('CATALOG_INDEX_ENABLED', True)
+
+
+def _snapshot():
+    """The shared catalog snapshot when CATALOG_SNAPSHOT_PATH is set, else None"""
+    from src.services.catalog_snapshot import catalog_snapshot_enabled, get_catalog_snapshot
+
+    return get_catalog_snapshot() if catalog_snapshot_enabled() else None
+
+
+def get_contactor_index():
+    """Return the contactor index for the current catalog version"""
+    snapshot = _snapshot()
+    if snapshot is not None:
+        return snapshot.contactors
+    return _get_index(
+        'contactors',
+        lambda version: ContactorIndex((c.to_dict() for c in _load_all(Contactor)), version)
+    )
+
+
+def get_starting_method_table():
+    """Return the starting method breakpoint table for the current catalog version"""
+    snapshot = _snapshot()
+    if snapshot is not None:
+        return snapshot.starting_methods
+    return _get_index(
+        'starting_methods',
+        lambda version: StartingMethodTable((m.to_dict() for m in _load_all(StartingMethod)), version)
+    )
+
+
+def get_overload_relay_index():
+    """Return the overload relay index for the current catalog version"""
+    snapshot = _snapshot()
+    if snapshot is not None:
+        return snapshot.overload_relays
+    return _get_index(
+        'overload_relays',
+        lambda version: OverloadRelayIndex((r.to_dict() for r in _load_all(OverloadRelay)), version)
+    )
+
+
+def get_serialized_rows(model):
+    """Return the pre-encoded JSON rows of a catalog table for the current catalog version"""
+    return _get_index(
+        model.__tablename__,
+        lambda version: SerializedRows((row.to_dict() for row in _load_all(model)), version),
+        key=f'{model.__tablename__}:json'
+    )
@@ -0,0 +1,145 @@
+"""
+Keyset pagination and sparse field projection for catalog listings.
+
+Pages are ordered by (sort column, id) and continued with an opaque cursor
+holding the last row's key, so each page is an index range scan rather than
+an OFFSET. ``fields=`` limits the SELECT to the requested columns; full
+rows are spliced from the pre-encoded fragments of the catalog index, so
+only their ids are read from SQL.
+"""
+
+import base64
+import json
+
+from src.models.user import db
+from src.database.engine import catalog_session
+from src.models.switchgear import Contactor, OverloadRelay, parse_contactor_frames
+from src.services.catalog_index import get_serialized_rows
+from src.services.json_provider import dumps_bytes
+
+
+class CatalogQueryError(ValueError):
+    """Raised for malformed fields, limit or cursor parameters"""
+
+
+def _relay_current_range(row):
+    return f"{row['current_range_min']}-{row['current_range_max']}A"
+
+
+def _relay_frames(row):
+    return list(parse_contactor_frames(row['compatible_contactor_frames']))
+
+
+# Output field -> (columns it needs, optional function deriving it from the fetched row)
+LISTING_FIELDS = {
+    Contactor: {
+        name: ((name,), None) for name in (
+            'id', 'model', 'manufacturer', 'current_rating', 'voltage_rating', 'utilization_category',
+            'poles', 'auxiliary_contacts', 'coil_voltage', 'frame_size', 'price', 'image_url', 'datasheet_url'
+        )
+    },
+    OverloadRelay: {
+        **{name: ((name,), None) for name in (
+            'id', 'model', 'manufacturer', 'current_range_min', 'current_range_max',
+            'trip_class', 'reset_type', 'price', 'image_url', 'datasheet_url'
+        )},
+        'current_range': (('current_range_min', 'current_range_max'), _relay_current_range),
+        'compatible_contactor_frames': (('compatible_contactor_frames',), _relay_frames),
+    },
+}
+
+
+def parse_fields(model, raw):
+    """Validate a comma separated ``fields=`` value; None means every field in to_dict order"""
+    available = LISTING_FIELDS[model]
+    if raw is None:
+        return list(available)
+
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if not fields or unknown:
+        raise CatalogQueryError(
+            f"Unknown fields: {', '.join(unknown) or '(none given)'}; available: {', '.join(available)}"
+        )
+    return fields
+
+
+def encode_cursor(sort_value, row_id):
+    payload = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise CatalogQueryError('Invalid cursor') from None
+    if not isinstance(row_id, int) or not isinstance(sort_value, (int, float)):
+        raise CatalogQueryError('Invalid cursor')
+    return sort_value, row_id
+
+
+def list_catalog(model, conditions, sort_column, fields=None, limit=None, cursor=None):
+    """
+    Run a catalog listing ordered by (sort_column, id).
+
+    Returns a list of dicts when neither ``limit`` nor ``cursor`` is given,
+    otherwise a page dict with ``items`` and ``next_cursor``.
+    """
+    field_specs = LISTING_FIELDS[model]
+    fields = fields or list(field_specs)
+    sort_name = sort_column.key
+
+    needed = {'id', sort_name}
+    for field in fields:
+        needed.update(field_specs[field][0])
+    columns = [getattr(model, name) for name in sorted(needed)]
+
+    statement = db.select(*columns).where(*conditions).order_by(sort_column.asc(), model.id.asc())
+    paginated = limit is not None or cursor is not None
+    if cursor is not None:
+        last_value, last_id = decode_cursor(cursor)
+        statement = statement.where(db.tuple_(sort_column, model.id) > db.tuple_(last_value, last_id))
+    if paginated:
+        # Fetch one extra row to learn whether another page exists
+        statement = statement.limit(limit + 1)
+
+    rows = catalog_session().execute(statement).mappings().all()
+    has_more = paginated and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+
+    items = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            derive = field_specs[field][1]
+            item[field] = derive(row) if derive else row[field]
+        items.append(item)
+
+    if not paginated:
+        return items
+    return {
+        'items': items,
+        'limit': limit,
+        'next_cursor': encode_cursor(rows[-1][sort_name], rows[-1]['id']) if has_more else None
+    }
+
+
+def serialized_listing(model, conditions, sort_column, limit=None, cursor=None):
+    """
+    The full-row listing list_catalog would return, as encoded JSON bytes
+    assembled from pre-serialized rows. None if a matching row is newer than
+    the cached fragments.
+    """
+    rows = get_serialized_rows(model)
+    result = list_catalog(model, conditions, sort_column, ['id'], limit, cursor)
+    items = rows.array([item['id'] for item in (result if isinstance(result, list) else result['items'])])
+    if items is None or isinstance(result, list):
+        return items
+    return b''.join((
+        b'{"items":', items,
+        b',"limit":', dumps_bytes(result['limit']),
+        b',"next_cursor":', dumps_bytes(result['next_cursor']), b'}'
+    ))
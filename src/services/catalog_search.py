@@ -0,0 +1,156 @@
+"""
+Part search over the ``catalog_search`` FTS5 trigram index.
+
+The index is created by a migration and kept in sync by triggers on the
+part tables; bulk writers may drop the triggers and rebuild a part type's
+rows in one statement instead. When the index is unavailable,
+or the query has no term of at least three characters (the trigram
+minimum), search falls back to a LIKE scan of the part tables; shorter
+terms in an otherwise indexed query are applied as LIKE filters.
+"""
+
+from sqlalchemy import column, inspect, literal_column, or_, table, text
+
+from src.models.user import db
+from src.database.engine import catalog_session
+from src.models.switchgear import Contactor, OverloadRelay
+
+PART_TYPES = {
+    'contactor': Contactor,
+    'overload_relay': OverloadRelay,
+}
+
+_search_table = table('catalog_search', column('part_type'), column('part_id'))
+_rank = literal_column('bm25(catalog_search)')
+
+
+# FTS rowids interleave both part tables: contactor id * 2, overload relay id * 2 + 1
+SEARCH_SOURCES = {
+    'contactors': ('contactor', '{row}.id * 2', '{row}.frame_size', '{row}.utilization_category'),
+    'overload_relays': ('overload_relay', '{row}.id * 2 + 1', '{row}.compatible_contactor_frames', 'NULL'),
+}
+SEARCH_COLUMNS = 'rowid, part_type, part_id, model, manufacturer, frame_size, utilization_category'
+
+
+def _search_values(table_name, row):
+    part_type, rowid, frame_size, utilization_category = SEARCH_SOURCES[table_name]
+    return (f"{rowid}, '{part_type}', {{row}}.id, {{row}}.model, {{row}}.manufacturer, "
+            f"{frame_size}, {utilization_category}").format(row=row)
+
+
+def rebuild_search_rows(connection, table_name):
+    """Replace every index row of one part table with a single INSERT ... SELECT"""
+    connection.execute(text('DELETE FROM catalog_search WHERE part_type = :part_type'),
+                       {'part_type': SEARCH_SOURCES[table_name][0]})
+    connection.execute(text(
+        f'INSERT INTO catalog_search ({SEARCH_COLUMNS}) SELECT {_search_values(table_name, table_name)} FROM {table_name}'
+    ))
+
+
+def install_search_triggers(connection, table_name):
+    old_rowid = SEARCH_SOURCES[table_name][1].format(row='old')
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS {table_name}_search_insert AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO catalog_search ({SEARCH_COLUMNS}) VALUES ({_search_values(table_name, 'new')});
+        END
+    """))
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS {table_name}_search_delete AFTER DELETE ON {table_name} BEGIN
+            DELETE FROM catalog_search WHERE rowid = {old_rowid};
+        END
+    """))
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS {table_name}_search_update AFTER UPDATE ON {table_name} BEGIN
+            DELETE FROM catalog_search WHERE rowid = {old_rowid};
+            INSERT INTO catalog_search ({SEARCH_COLUMNS}) VALUES ({_search_values(table_name, 'new')});
+        END
+    """))
+
+
+def drop_search_triggers(connection, table_name):
+    for event in ('insert', 'delete', 'update'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {table_name}_search_{event}'))
+
+
+def create_search_index(connection):
+    """Migration: FTS5 trigram index over part model, manufacturer, frame size and utilization category"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    try:
+        with connection.begin_nested():
+            connection.execute(text(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS catalog_search USING fts5('
+                'part_type UNINDEXED, part_id UNINDEXED, model, manufacturer, frame_size, utilization_category, '
+                "tokenize='trigram')"
+            ))
+    except Exception:
+        # SQLite built without FTS5 or older than 3.34 (no trigram tokenizer); search falls back to LIKE
+        return
+
+    for table_name in SEARCH_SOURCES:
+        rebuild_search_rows(connection, table_name)
+        install_search_triggers(connection, table_name)
+
+
+def search_index_available(bind=None):
+    bind = bind if bind is not None else catalog_session().connection()
+    return bind.dialect.name == 'sqlite' and inspect(bind).has_table('catalog_search')
+
+
+def fts_match_expression(query):
+    """Quote each term of a user query as an FTS5 phrase; terms are implicitly ANDed"""
+    terms = [term for term in query.split() if len(term) >= 3]
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _like_conditions(model, query):
+    conditions = []
+    for term in query.split():
+        pattern = f'%{term}%'
+        columns = [model.model, model.manufacturer]
+        columns += [model.frame_size, model.utilization_category] if model is Contactor \
+            else [model.compatible_contactor_frames]
+        conditions.append(or_(*(col.ilike(pattern) for col in columns)))
+    return conditions
+
+
+def search_parts(query, part_types, conditions, limit):
+    """
+    Search parts of the given types, each restricted by its list of extra
+    SQL conditions. Returns up to ``limit`` (part_type, rank, part) tuples,
+    best match first; rank is None for LIKE fallback results.
+    """
+    match = fts_match_expression(query)
+    use_fts = bool(match) and search_index_available()
+
+    results = []
+    for part_type in part_types:
+        model = PART_TYPES[part_type]
+        if use_fts:
+            statement = (
+                db.select(model, _rank.label('rank'))
+                .join(_search_table, _search_table.c.part_id == model.id)
+                .where(_search_table.c.part_type == part_type, text('catalog_search MATCH :match'))
+                .where(*conditions[part_type])
+                .order_by(_rank)
+                .limit(limit)
+            )
+            short_terms = ' '.join(term for term in query.split() if len(term) < 3)
+            if short_terms:
+                statement = statement.where(*_like_conditions(model, short_terms))
+            rows = catalog_session().execute(statement, {'match': match}).all()
+            results.extend((part_type, row.rank, row[0]) for row in rows)
+        else:
+            statement = (
+                db.select(model)
+                .where(*_like_conditions(model, query), *conditions[part_type])
+                .order_by(model.model.asc(), model.id.asc())
+                .limit(limit)
+            )
+            results.extend((part_type, None, part) for part in catalog_session().execute(statement).scalars())
+
+    if use_fts:
+        # bm25 is lower-is-better and comparable across rows of the same FTS table
+        results.sort(key=lambda result: result[1])
+    return results[:limit]
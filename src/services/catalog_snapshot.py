@@ -0,0 +1,445 @@
+"""
+Columnar catalog snapshot shared by worker processes through mmap.
+
+With ``CATALOG_SNAPSHOT_PATH`` set, the contactor, overload relay and
+starting method tables are compiled into one file: a typed array per
+numeric column (NaN or a sentinel for NULL), an interned string table for
+text columns, and the sort orders and cheapest-from tables the selection
+lookups need. Every worker maps the file read-only and reads the arrays in
+place, so the catalog is held once in the page cache however many workers
+there are, instead of once per worker as ``CatalogRecord`` objects.
+``SnapshotContactorIndex`` and ``SnapshotOverloadRelayIndex`` answer the
+same lookups as ``ContactorIndex`` and ``OverloadRelayIndex`` and build a
+record only for the rows they return.
+
+The header records the catalog versions the file was built from. When the
+catalog changes, the first worker to notice rebuilds the file under an
+exclusive lock and moves it into place with ``os.replace``. Other workers
+map the new file on their next lookup, and requests still using the old
+mapping finish on it.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+
+import numpy as np
+from flask import current_app
+
+from src.models.user import db
+from src.database.engine import catalog_lock, catalog_session
+from src.models.switchgear import Contactor, OverloadRelay, StartingMethod, parse_contactor_frames
+from src.services.catalog_index import ANY_FRAME, CatalogRecord, StartingMethodTable
+from src.services.catalog_version import get_catalog_version, invalidate_catalog_versions
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; concurrent rebuilds then just race to os.replace
+    fcntl = None
+
+MAGIC = b'SWGSNAP1'
+ALIGNMENT = 64
+INT_NULL = np.iinfo(np.int64).min
+# Group frame codes of the cheapest-from tables; string ids are >= 0
+ANY_FRAME_CODE = -2
+NULL_CODE = -1
+
+SNAPSHOT_TABLES = ('contactors', 'overload_relays', 'starting_methods')
+# Columns in to_dict order: 'f8' float, 'i8' integer, 'str' text, 'frames' JSON frame list, 'range' derived
+TABLE_COLUMNS = {
+    'contactors': (Contactor, (
+        ('id', 'i8'), ('model', 'str'), ('manufacturer', 'str'), ('current_rating', 'f8'),
+        ('voltage_rating', 'i8'), ('utilization_category', 'str'), ('poles', 'i8'),
+        ('auxiliary_contacts', 'str'), ('coil_voltage', 'i8'), ('frame_size', 'str'), ('price', 'f8'),
+        ('image_url', 'str'), ('datasheet_url', 'str'),
+    )),
+    'overload_relays': (OverloadRelay, (
+        ('id', 'i8'), ('model', 'str'), ('manufacturer', 'str'), ('current_range_min', 'f8'),
+        ('current_range_max', 'f8'), ('current_range', 'range'), ('trip_class', 'i8'), ('reset_type', 'str'),
+        ('compatible_contactor_frames', 'frames'), ('price', 'f8'), ('image_url', 'str'), ('datasheet_url', 'str'),
+    )),
+    'starting_methods': (StartingMethod, (
+        ('id', 'i8'), ('name', 'str'), ('description', 'str'), ('min_power_hp', 'f8'), ('max_power_hp', 'f8'),
+        ('starting_current_reduction', 'f8'), ('starting_torque_reduction', 'f8'), ('complexity_level', 'i8'),
+        ('cost_factor', 'f8'),
+    )),
+}
+
+
+def catalog_snapshot_enabled():
+    return bool(current_app.config.get('CATALOG_SNAPSHOT_PATH'))
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+
+    def intern(self, value):
+        if value is None:
+            return NULL_CODE
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.ids)
+        return string_id
+
+    def sections(self):
+        encoded = [value.encode('utf-8') for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return {'strings.offsets': offsets, 'strings.data': np.frombuffer(b''.join(encoded), dtype='u1')}
+
+
+def _column_sections(table_name, rows, strings):
+    sections = {}
+    for column, kind in TABLE_COLUMNS[table_name][1]:
+        name = f'{table_name}.{column}'
+        values = [row[column] for row in rows] if kind != 'range' else None
+        if kind == 'f8':
+            sections[name] = np.array([math.nan if value is None else value for value in values], dtype='<f8')
+        elif kind == 'i8':
+            sections[name] = np.array([INT_NULL if value is None else value for value in values], dtype='<i8')
+        elif kind == 'str':
+            sections[name] = np.array([strings.intern(value) for value in values], dtype='<i4')
+        elif kind == 'frames':
+            frames = [parse_contactor_frames(value) for value in values]
+            offsets = np.zeros(len(frames) + 1, dtype='<i8')
+            np.cumsum([len(row_frames) for row_frames in frames], out=offsets[1:])
+            sections[f'{name}.offsets'] = offsets
+            sections[f'{name}.ids'] = np.array(
+                [strings.intern(frame) for row_frames in frames for frame in row_frames], dtype='<i4'
+            )
+    return sections
+
+
+def _price_sort_columns(price, ids):
+    """lexsort keys (least significant first) ordering rows like ORDER BY price, id with NULL first"""
+    priced = ~np.isnan(price)
+    return ids, np.where(priced, price, 0.0), priced
+
+
+def _contactor_sections(sections):
+    """Sort orders and cheapest-from tables of the contactor lookups"""
+    current = sections['contactors.current_rating']
+    voltage = sections['contactors.voltage_rating']
+    price = sections['contactors.price']
+    ids = sections['contactors.id']
+    frame = sections['contactors.frame_size']
+
+    # select(): rows by (voltage, current, price key, id), grouped by voltage
+    order = np.lexsort((*_price_sort_columns(price, ids), current, voltage)).astype('<i4')
+    voltages, starts = np.unique(voltage[order], return_index=True)
+    sections['contactors.select.order'] = order
+    sections['contactors.select.current'] = current[order]
+    sections['contactors.select.voltages'] = voltages.astype('<i8')
+    sections['contactors.select.starts'] = np.append(starts, len(order)).astype('<i8')
+
+    # cheapest(): priced rows grouped by (frame, voltage) and sorted by current, once more with every frame
+    priced = np.flatnonzero(~np.isnan(price))
+    by_cost = priced[np.lexsort((ids[priced], price[priced]))]
+    rank = np.empty(len(price), dtype=np.int64)
+    rank[by_cost] = np.arange(len(by_cost))
+    members = np.concatenate([priced, priced])
+    codes = np.concatenate([np.full(len(priced), ANY_FRAME_CODE), frame[priced]])
+    order = np.lexsort((current[members], voltage[members], codes))
+    members, codes = members[order], codes[order]
+    group_voltages = voltage[members]
+    boundaries = np.flatnonzero((np.diff(codes) != 0) | (np.diff(group_voltages) != 0)) + 1
+    group_starts = np.concatenate([[0], boundaries]).astype('<i8') if len(members) else np.empty(0, dtype='<i8')
+    group_ends = np.append(boundaries, len(members)).astype('<i8') if len(members) else np.empty(0, dtype='<i8')
+    best = np.empty(len(members), dtype='<i4')
+    for start, end in zip(group_starts, group_ends):
+        # best[i] is the cheapest row of the group from position i on
+        suffix_rank = np.minimum.accumulate(rank[members[start:end]][::-1])[::-1]
+        best[start:end] = by_cost[suffix_rank]
+    sections['contactors.cheapest.current'] = current[members]
+    sections['contactors.cheapest.best'] = best
+    sections['contactors.cheapest.group_frames'] = codes[group_starts].astype('<i4')
+    sections['contactors.cheapest.group_voltages'] = group_voltages[group_starts].astype('<i8')
+    sections['contactors.cheapest.group_starts'] = group_starts
+    sections['contactors.cheapest.group_ends'] = group_ends
+
+
+def _relay_sections(sections):
+    """Relays by range minimum, so a stab is a prefix filtered on the range maximum"""
+    order = np.argsort(sections['overload_relays.current_range_min'], kind='stable').astype('<i4')
+    sections['overload_relays.stab.order'] = order
+    sections['overload_relays.stab.min'] = sections['overload_relays.current_range_min'][order]
+    sections['overload_relays.stab.max'] = sections['overload_relays.current_range_max'][order]
+
+
+def write_catalog_snapshot(path, versions):
+    """Compile the catalog into a snapshot file tagged with versions and move it into place atomically"""
+    session = catalog_session()
+    strings = _StringTable()
+    sections = {}
+    for table_name, (model, columns) in TABLE_COLUMNS.items():
+        table = model.__table__
+        selected = [table.c[column] for column, kind in columns if kind != 'range']
+        rows = session.execute(db.select(*selected).order_by(table.c.id)).mappings().all()
+        sections.update(_column_sections(table_name, rows, strings))
+    _contactor_sections(sections)
+    _relay_sections(sections)
+    sections.update(strings.sections())
+
+    header = {'versions': dict(zip(SNAPSHOT_TABLES, versions)), 'sections': {}}
+    offset = 0
+    for name, array in sections.items():
+        header['sections'][name] = [array.dtype.str, offset, len(array)]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    encoded = json.dumps(header).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as stream:
+        stream.write(MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+        for name, array in sections.items():
+            stream.seek(data_start + header['sections'][name][1])
+            stream.write(array.tobytes())
+        stream.truncate(data_start + offset)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(temporary, path)
+
+
+class CatalogSnapshot:
+    """Read-only mapping of a snapshot file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a catalog snapshot')
+        (length,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        header_end = len(MAGIC) + 8 + length
+        header = json.loads(self._mmap[len(MAGIC) + 8:header_end])
+        data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+        self.versions = tuple(header['versions'][table_name] for table_name in SNAPSHOT_TABLES)
+        self.arrays = {
+            name: np.frombuffer(self._mmap, dtype=dtype, count=count, offset=data_start + offset)
+            if count else np.empty(0, dtype=dtype)
+            for name, (dtype, offset, count) in header['sections'].items()
+        }
+        self.contactors = SnapshotContactorIndex(self)
+        self.overload_relays = SnapshotOverloadRelayIndex(self)
+        self.starting_methods = StartingMethodTable(
+            self.row('starting_methods', position) for position in range(len(self.arrays['starting_methods.id']))
+        )
+
+    def string(self, string_id):
+        if string_id < 0:
+            return None
+        offsets = self.arrays['strings.offsets']
+        return self.arrays['strings.data'][offsets[string_id]:offsets[string_id + 1]].tobytes().decode('utf-8')
+
+    def frames(self, table_name, column, position):
+        offsets = self.arrays[f'{table_name}.{column}.offsets']
+        ids = self.arrays[f'{table_name}.{column}.ids'][offsets[position]:offsets[position + 1]]
+        return [self.string(string_id) for string_id in ids]
+
+    def row(self, table_name, position):
+        """to_dict() of the row at position"""
+        row = {}
+        for column, kind in TABLE_COLUMNS[table_name][1]:
+            if kind == 'f8':
+                value = float(self.arrays[f'{table_name}.{column}'][position])
+                row[column] = None if math.isnan(value) else value
+            elif kind == 'i8':
+                value = int(self.arrays[f'{table_name}.{column}'][position])
+                row[column] = None if value == INT_NULL else value
+            elif kind == 'str':
+                row[column] = self.string(int(self.arrays[f'{table_name}.{column}'][position]))
+            elif kind == 'frames':
+                row[column] = self.frames(table_name, column, position)
+            else:
+                row[column] = f"{row['current_range_min']}-{row['current_range_max']}A"
+        return row
+
+    def record(self, table_name, position):
+        return CatalogRecord(self.row(table_name, int(position)))
+
+
+def _price_key(price, row_id):
+    # Mirrors catalog_index._price_key, with the id as tiebreaker
+    return (0, 0.0, row_id) if math.isnan(price) else (1, price, row_id)
+
+
+class SnapshotContactorIndex:
+    """ContactorIndex lookups over the snapshot's contactor columns"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        arrays = snapshot.arrays
+        self._current = arrays['contactors.current_rating']
+        self._price = arrays['contactors.price']
+        self._ids = arrays['contactors.id']
+        self._select_order = arrays['contactors.select.order']
+        self._select_current = arrays['contactors.select.current']
+        starts = arrays['contactors.select.starts'].tolist()
+        self.voltages = arrays['contactors.select.voltages'].tolist()
+        self._select_groups = {voltage: (starts[i], starts[i + 1]) for i, voltage in enumerate(self.voltages)}
+
+        # frame (or ANY_FRAME) -> (sorted voltages, voltage -> (start, end)) of the cheapest-from tables
+        self._cheapest_current = arrays['contactors.cheapest.current']
+        self._cheapest_best = arrays['contactors.cheapest.best']
+        groups = {}
+        for code, voltage, start, end in zip(
+            arrays['contactors.cheapest.group_frames'].tolist(), arrays['contactors.cheapest.group_voltages'].tolist(),
+            arrays['contactors.cheapest.group_starts'].tolist(), arrays['contactors.cheapest.group_ends'].tolist()
+        ):
+            frame = ANY_FRAME if code == ANY_FRAME_CODE else snapshot.string(code)
+            groups.setdefault(frame, {})[voltage] = (start, end)
+        self._cheapest = {frame: (sorted(by_voltage), by_voltage) for frame, by_voltage in groups.items()}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _key(self, position):
+        return (float(self._current[position]), *_price_key(float(self._price[position]), int(self._ids[position])))
+
+    def select(self, min_current_rating, min_voltage_rating):
+        """Cheapest contactor of the lowest sufficient rating, as the SQL query orders it"""
+        if min_current_rating is None or min_voltage_rating is None:
+            return None
+
+        best_key = None
+        best = None
+        for voltage in self.voltages[bisect_left(self.voltages, min_voltage_rating):]:
+            start, end = self._select_groups[voltage]
+            position = start + int(np.searchsorted(self._select_current[start:end], min_current_rating, 'left'))
+            if position < end:
+                row = self._select_order[position]
+                key = self._key(row)
+                if best_key is None or key < best_key:
+                    best_key, best = key, row
+        return self.snapshot.record('contactors', best) if best is not None else None
+
+    def cheapest(self, min_current_rating, min_voltage_rating, frame=ANY_FRAME):
+        """Lowest priced contactor of at least the given ratings, optionally of one frame size"""
+        voltages, groups = self._cheapest.get(frame, ((), None))
+        best_key = None
+        best = None
+        for voltage in voltages[bisect_left(voltages, min_voltage_rating):]:
+            start, end = groups[voltage]
+            position = start + int(np.searchsorted(self._cheapest_current[start:end], min_current_rating, 'left'))
+            if position < end:
+                row = self._cheapest_best[position]
+                key = (float(self._price[row]), int(self._ids[row]))
+                if best_key is None or key < best_key:
+                    best_key, best = key, row
+        return self.snapshot.record('contactors', best) if best is not None else None
+
+
+class SnapshotOverloadRelayIndex:
+    """OverloadRelayIndex lookups over the snapshot's relay columns"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        arrays = snapshot.arrays
+        self._min = arrays['overload_relays.current_range_min']
+        self._max = arrays['overload_relays.current_range_max']
+        self._price = arrays['overload_relays.price']
+        self._ids = arrays['overload_relays.id']
+        self._stab_order = arrays['overload_relays.stab.order']
+        self._stab_min = arrays['overload_relays.stab.min']
+        self._stab_max = arrays['overload_relays.stab.max']
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _covering(self, current):
+        """Positions of the relays whose range contains current, in (price key, id) order"""
+        count = int(np.searchsorted(self._stab_min, current, 'right'))
+        positions = self._stab_order[:count][self._stab_max[:count] >= current]
+        return positions[np.lexsort(_price_sort_columns(self._price[positions], self._ids[positions]))]
+
+    def _frames(self, position):
+        return self.snapshot.frames('overload_relays', 'compatible_contactor_frames', position)
+
+    def assembly_candidates(self, flc):
+        """
+        Priced relays covering FLC ± 20% as (key, frames, record), cheapest first,
+        and the cheapest priced relay covering FLC (None if there is none)
+        """
+        positions = self._covering(flc)
+        positions = positions[~np.isnan(self._price[positions])]
+        if not len(positions):
+            return [], None
+        fallback = self.snapshot.record('overload_relays', positions[0])
+        candidates = positions[(self._min[positions] <= flc * 0.8) & (self._max[positions] >= flc * 1.2)]
+
+        def iterate():
+            # Records are built as the solver walks the list; it usually stops after a few
+            for position in candidates:
+                key = _price_key(float(self._price[position]), int(self._ids[position]))
+                yield key, frozenset(self._frames(position)), self.snapshot.record('overload_relays', position)
+        return iterate(), fallback
+
+    def select(self, flc, contactor_frame_size):
+        """Cheapest frame-compatible relay covering FLC ± 20%, else the cheapest covering FLC"""
+        if flc is None:
+            return None
+
+        positions = self._covering(flc)
+        if not len(positions):
+            return None
+        candidates = positions[(self._min[positions] <= flc * 0.8) & (self._max[positions] >= flc * 1.2)]
+        for position in candidates:
+            frames = self._frames(position)
+            if not frames or contactor_frame_size in frames:
+                return self.snapshot.record('overload_relays', position)
+        return self.snapshot.record('overload_relays', positions[0])
+
+
+class _SnapshotState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+
+
+def _open_if_current(path, versions):
+    """The snapshot at path if it was built from versions, else None"""
+    try:
+        snapshot = CatalogSnapshot(path)
+    except (FileNotFoundError, ValueError):
+        return None
+    return snapshot if snapshot.versions == versions else None
+
+
+def get_catalog_snapshot():
+    """Return the mapped snapshot for the current catalog versions, rebuilding the file if it is stale"""
+    state = current_app.extensions.setdefault('catalog_snapshot', _SnapshotState())
+    versions = tuple(get_catalog_version(table_name) for table_name in SNAPSHOT_TABLES)
+    snapshot = state.snapshot
+    if snapshot is not None and snapshot.versions == versions:
+        return snapshot
+
+    path = current_app.config['CATALOG_SNAPSHOT_PATH']
+    with catalog_lock(state.lock):
+        snapshot = state.snapshot
+        if snapshot is not None and snapshot.versions == versions:
+            return snapshot
+
+        snapshot = _open_if_current(path, versions)
+        if snapshot is None:
+            # Another worker may already have built a newer catalog than this process has seen
+            invalidate_catalog_versions()
+            versions = tuple(get_catalog_version(table_name) for table_name in SNAPSHOT_TABLES)
+            snapshot = _open_if_current(path, versions)
+        if snapshot is None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(f'{path}.lock', 'w') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                snapshot = _open_if_current(path, versions)
+                if snapshot is None:
+                    write_catalog_snapshot(path, versions)
+                    snapshot = CatalogSnapshot(path)
+        state.snapshot = snapshot
+    return snapshot
@@ -0,0 +1,112 @@
+"""
+Catalog version tracking.
+
+Every write to a catalog table bumps a counter in ``catalog_versions`` inside
+the same transaction, so in-process caches (indexes, serialized rows, ...)
+can tell whether they are stale without re-reading the table itself. The
+counters are read at most once per ``CATALOG_VERSION_TTL`` seconds per
+process; writes made by this process are visible immediately.
+"""
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+
+from src.models.user import db
+from src.database.engine import catalog_lock, catalog_session
+from src.models.switchgear import (
+    Manufacturer, StartingMethod, Contactor, OverloadRelay, CatalogVersion
+)
+
+CATALOG_TABLES = {
+    Manufacturer: 'manufacturers',
+    StartingMethod: 'starting_methods',
+    Contactor: 'contactors',
+    OverloadRelay: 'overload_relays',
+}
+
+_PENDING_KEY = 'catalog_tables_changed'
+
+
+class _VersionState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.checked_at = 0.0
+
+
+def _state():
+    return current_app.extensions.setdefault('catalog_versions', _VersionState())
+
+
+def bump_catalog_version(connection, tables):
+    """Increment the version of each catalog table on the given connection"""
+    now = time.time()
+    table = CatalogVersion.__table__
+    for table_name in sorted(set(tables)):
+        result = connection.execute(
+            table.update()
+            .where(table.c.table_name == table_name)
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                table.insert().values(table_name=table_name, version=1, updated_at=now)
+            )
+
+
+def invalidate_catalog_versions():
+    """Force the next version lookup in this process to hit the database"""
+    _state().checked_at = 0.0
+
+
+def _load_versions():
+    state = _state()
+    ttl = current_app.config.get('CATALOG_VERSION_TTL', 1.0)
+    now = time.monotonic()
+    if now - state.checked_at < ttl:
+        return state.versions
+
+    with catalog_lock(state.lock):
+        if now - state.checked_at >= ttl:
+            rows = catalog_session().execute(
+                db.select(CatalogVersion.table_name, CatalogVersion.version, CatalogVersion.updated_at)
+            ).all()
+            state.versions = {row.table_name: (row.version, row.updated_at) for row in rows}
+            state.checked_at = time.monotonic()
+    return state.versions
+
+
+def get_catalog_version(table_name):
+    """Return the current version counter of a catalog table (0 if never written)"""
+    return _load_versions().get(table_name, (0, None))[0]
+
+
+def get_catalog_version_info(table_name):
+    """Return (version, updated_at) of a catalog table; updated_at is a Unix timestamp or None"""
+    return _load_versions().get(table_name, (0, None))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_catalog_changes(session, flush_context):
+    changed = {
+        CATALOG_TABLES[type(obj)]
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in CATALOG_TABLES
+    }
+    if changed:
+        bump_catalog_version(session.connection(), changed)
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_catalog_changes(session):
+    if session.info.pop(_PENDING_KEY, None):
+        invalidate_catalog_versions()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,67 @@
+"""
+Conditional GET support for catalog endpoints.
+
+Responses are tagged with a strong ETag derived from the catalog table
+version, the request path and the normalized query string, plus a
+Last-Modified header from the time of the last catalog write. Matching
+``If-None-Match`` / ``If-Modified-Since`` requests are answered with 304
+before the view runs, so unchanged polls never touch the catalog tables.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+
+from src.services.catalog_version import get_catalog_version_info
+
+
+def catalog_etag(table_names):
+    """Strong ETag for the current request against the given catalog tables"""
+    versions = ','.join(f'{name}:{get_catalog_version_info(name)[0]}' for name in table_names)
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    return hashlib.sha1(f'{versions}|{request.path}?{query}'.encode('utf-8')).hexdigest()
+
+
+def catalog_last_modified(table_names):
+    timestamps = [get_catalog_version_info(name)[1] for name in table_names]
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    if not timestamps:
+        return None
+    return datetime.fromtimestamp(int(max(timestamps)), tz=timezone.utc)
+
+
+def _apply_cache_headers(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CATALOG_CACHE_MAX_AGE', 60)
+    return response
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def catalog_conditional(*table_names):
+    """Decorate a GET view whose response depends only on the given catalog tables and the URL"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = catalog_etag(table_names)
+            last_modified = catalog_last_modified(table_names)
+            if _not_modified(etag, last_modified):
+                return _apply_cache_headers(Response(status=304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            return _apply_cache_headers(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+"""
+JSON encoding for API responses.
+
+``JSON_PROVIDER=orjson`` swaps Flask's stdlib ``json`` provider for one
+backed by orjson, which encodes straight to UTF-8 bytes several times
+faster. Output keeps Flask's sorted keys and compact separators; unlike the
+stdlib encoder it writes non-ASCII characters unescaped and NaN as null.
+
+The helpers below encode payloads and wrap pre-encoded bodies exactly the
+way ``jsonify`` would, so cached byte fragments can be served as-is.
+"""
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_PROVIDERS = ('json', 'orjson')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson"""
+
+    def _options(self, kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, **kwargs):
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=self._options(kwargs))
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return json_response(self.dumps_bytes(obj, **response_dump_args(self._app)))
+
+
+def configure_json_provider(app):
+    """Install the provider named by the JSON_PROVIDER config key"""
+    name = app.config.get('JSON_PROVIDER') or 'json'
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of: {', '.join(JSON_PROVIDERS)}")
+    if name == 'orjson':
+        if orjson is None:
+            raise RuntimeError('JSON_PROVIDER=orjson requires the orjson package')
+        app.json = OrjsonProvider(app)
+
+
+def response_dump_args(app):
+    """The indent/separators arguments jsonify would use for this app"""
+    if (app.json.compact is None and app.debug) or app.json.compact is False:
+        return {'indent': 2}
+    return {'separators': (',', ':')}
+
+
+def compact_responses():
+    return 'separators' in response_dump_args(current_app)
+
+
+def dumps_bytes(obj, **kwargs):
+    """Encode obj with the app's JSON provider as UTF-8 bytes"""
+    provider = current_app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(obj, **kwargs)
+    return provider.dumps(obj, **kwargs).encode('utf-8')
+
+
+def dumps_response_body(obj):
+    """Encode obj exactly as jsonify would, without the trailing newline"""
+    return dumps_bytes(obj, **response_dump_args(current_app))
+
+
+def json_response(body, status=200):
+    """Wrap an already encoded JSON body in a response identical to jsonify's"""
+    return current_app.response_class(body + b'\n', status=status, mimetype=current_app.json.mimetype)
@@ -0,0 +1,363 @@
+"""
+Persisted motor schedules.
+
+A schedule's motors are stored as ``Motor`` rows together with their
+/calculate payload, and ``motor_parts`` indexes every selected contactor
+and overload relay back to the motors using it. Once schedules exist,
+contactor and overload relay writes are logged in ``catalog_changes``.
+``refresh_motor_selections`` then recomputes only the motors a write can
+affect:
+
+* motors using a written part, found through ``motor_parts``;
+* motors a written part could now be picked for: a contactor meeting the
+  motor's voltage and lowest role rating (and, for the optimal solver,
+  priced no higher than its current assembly), or a relay whose range
+  contains its FLC. One set-based query joins the written parts to
+  ``motors`` on those bounds; the payloads of the matches are then checked
+  exactly.
+
+Motors computed with another ASSEMBLY_SOLVER or before a starting method
+change are recomputed too. Reading a schedule never writes: the refresh
+runs where the catalog is written (import_catalog.py) and through
+``POST /api/schedules/refresh`` for edits made any other way.
+
+Until then, schedules are reported with ``stale: true``. A schedule is
+stale while part writes are logged and not yet applied (the after_flush
+hook logs ORM edits, bulk imports log their own), or while any of its
+motors was computed with another solver or starting method version.
+Unapplied part writes mark every schedule stale, since telling which
+ones they affect is the refresh's job.
+"""
+
+import json
+import math
+import time
+
+from flask import current_app
+from sqlalchemy import and_, bindparam, case, func, literal, or_, true, union
+
+from src.models.user import db
+from src.database.engine import catalog_session
+from src.models.switchgear import (
+    CatalogChange, Contactor, Motor, MotorPart, MotorSchedule, OverloadRelay, StartingMethod
+)
+from src.services.catalog_changes import (
+    changed_part_ids, changed_parts, clear_changes, minimum_contactor_rating,
+    pending_changes, selection_affected, selection_parts
+)
+from src.services.catalog_index import catalog_index_enabled
+from src.services.catalog_version import get_catalog_version, invalidate_catalog_versions
+
+SCHEDULE_CONSUMER = 'motor_schedules'
+NUMERIC_FIELDS = ('motor_power_hp', 'motor_power_kw', 'voltage', 'frequency', 'power_factor', 'efficiency')
+
+
+class ScheduleError(ValueError):
+    """Raised for a malformed schedule or motor"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def parse_schedule_motor(data):
+    """Motor column values for a /calculate-style motor dict with an optional tag"""
+    from src.routes.switchgear import parse_motor_specification
+
+    if not isinstance(data, dict):
+        raise ScheduleError('Each motor must be an object')
+    if not all(_is_number(data[field]) for field in NUMERIC_FIELDS if data.get(field) is not None):
+        raise ScheduleError('Motor power, voltage, frequency, power factor and efficiency must be numeric')
+    tag = data.get('tag')
+    if tag is not None and (not isinstance(tag, str) or len(tag) > 50):
+        raise ScheduleError('tag must be a string of at most 50 characters')
+
+    spec, error = parse_motor_specification(data)
+    if error:
+        raise ScheduleError(error['error'])
+    if not isinstance(spec['starting_method'], str) or len(spec['starting_method']) > 50:
+        raise ScheduleError('starting_method must be a string of at most 50 characters')
+    if not all(spec[field] > 0 for field in ('motor_power_kw', 'voltage', 'power_factor', 'efficiency')):
+        raise ScheduleError('Motor power, voltage, power factor and efficiency must be positive')
+    if spec['voltage'] != int(spec['voltage']) or spec['frequency'] != int(spec['frequency']):
+        raise ScheduleError('voltage and frequency must be whole numbers')
+
+    return {
+        'tag': tag,
+        'power_hp': spec['motor_power_hp'],
+        'power_kw': spec['motor_power_kw'],
+        'voltage': int(spec['voltage']),
+        'frequency': int(spec['frequency']),
+        'power_factor': spec['power_factor'],
+        'efficiency': spec['efficiency'],
+        'starting_method': spec['starting_method'],
+    }
+
+
+def parse_schedule_motors(motors):
+    """Column values for a list of motors; raises ScheduleError naming the first bad one"""
+    if not motors or not isinstance(motors, list):
+        raise ScheduleError('A non-empty list of motors must be provided')
+    limit = current_app.config.get('CALCULATE_BATCH_LIMIT', 5000)
+    if len(motors) > limit:
+        raise ScheduleError(f'A schedule may contain at most {limit} motors')
+
+    parsed = []
+    for position, motor in enumerate(motors):
+        try:
+            parsed.append(parse_schedule_motor(motor))
+        except ScheduleError as e:
+            raise ScheduleError(f'Motor {position}: {e}') from None
+    return parsed
+
+
+def _motor_spec(motor):
+    return {
+        'motor_power_hp': motor.power_hp,
+        'motor_power_kw': motor.power_kw,
+        'voltage': motor.voltage,
+        'frequency': motor.frequency,
+        'starting_method': motor.starting_method,
+        'power_factor': motor.power_factor,
+        'efficiency': motor.efficiency,
+    }
+
+
+def compute_motor_selections(motors):
+    """Select switchgear for Motor rows in place and rebuild their motor_parts rows; flushes the session"""
+    from src.routes.switchgear import (
+        build_recommendation, calculate_full_load_current, get_compatible_starting_methods
+    )
+
+    if not motors:
+        return
+    starting_methods = None
+    if not catalog_index_enabled():
+        starting_methods = [method.to_dict() for method in catalog_session().scalars(db.select(StartingMethod))]
+    assembly_solver = current_app.config.get('ASSEMBLY_SOLVER', 'optimal')
+    starting_methods_version = get_catalog_version('starting_methods')
+    now = time.time()
+
+    parts = []
+    for motor in motors:
+        spec = _motor_spec(motor)
+        compatible_methods = get_compatible_starting_methods(spec['motor_power_hp'], starting_methods)
+        flc = calculate_full_load_current(motor.power_kw, motor.voltage, motor.power_factor, motor.efficiency)
+        circuit_breaker_rating = round(flc * 1.5, 2)
+        body, status = build_recommendation(spec, compatible_methods, flc, circuit_breaker_rating)
+
+        motor.full_load_current = flc
+        motor.circuit_breaker_rating = circuit_breaker_rating
+        # An incompatible starting method cannot be fixed by any catalog change
+        motor.min_contactor_rating = None if status == 400 else \
+            minimum_contactor_rating(motor.starting_method, circuit_breaker_rating)
+        motor.status = status
+        motor.total_cost = body['total_cost'] if status == 200 else None
+        motor.recommendation = json.dumps(body)
+        motor.assembly_solver = assembly_solver
+        motor.starting_methods_version = starting_methods_version
+        motor.computed_at = now
+        if status == 200:
+            contactor_ids, overload_relay_id = selection_parts(body)
+            parts.extend({'table_name': 'contactors', 'part_id': part_id, 'motor_id': motor.id}
+                         for part_id in set(contactor_ids))
+            if overload_relay_id is not None:
+                parts.append({'table_name': 'overload_relays', 'part_id': overload_relay_id, 'motor_id': motor.id})
+
+    db.session.flush()
+    motor_parts = MotorPart.__table__
+    db.session.execute(motor_parts.delete().where(motor_parts.c.motor_id == bindparam('key_motor_id')),
+                       [{'key_motor_id': motor.id} for motor in motors])
+    if parts:
+        db.session.execute(motor_parts.insert(), parts)
+
+
+def _affected_motor_ids(upto, assembly_solver):
+    """Ids of scheduled motors a logged contactor or relay write can change"""
+    motors = Motor.__table__
+    motor_parts = MotorPart.__table__
+    changes = CatalogChange.__table__
+    contactors = Contactor.__table__
+    relays = OverloadRelay.__table__
+
+    # Reverse index: motors using a written part, deleted parts included
+    logged = db.select(changes.c.table_name, changes.c.part_id).where(
+        changes.c.consumer == SCHEDULE_CONSUMER, changes.c.id <= upto, changes.c.part_id.isnot(None)
+    )
+    written = union(
+        logged,
+        db.select(literal('contactors'), changed_part_ids(Contactor, SCHEDULE_CONSUMER, upto).subquery().c.id),
+        db.select(literal('overload_relays'),
+                  changed_part_ids(OverloadRelay, SCHEDULE_CONSUMER, upto).subquery().c.id),
+    ).subquery()
+    using = set(db.session.scalars(db.select(motor_parts.c.motor_id).distinct().select_from(
+        motor_parts.join(written, and_(
+            motor_parts.c.table_name == written.c.table_name, motor_parts.c.part_id == written.c.part_id
+        ))
+    )))
+
+    # Motors a written part could now be picked for
+    written_contactors = changed_part_ids(Contactor, SCHEDULE_CONSUMER, upto)
+    written_relays = changed_part_ids(OverloadRelay, SCHEDULE_CONSUMER, upto)
+    price_bound = or_(motors.c.status != 200, and_(contactors.c.price.isnot(None),
+                                                    contactors.c.price <= motors.c.total_cost))
+    eligible = union(
+        db.select(motors.c.id).select_from(motors.join(contactors, and_(
+            contactors.c.id.in_(written_contactors),
+            contactors.c.voltage_rating >= motors.c.voltage,
+            contactors.c.current_rating >= motors.c.min_contactor_rating,
+        ))).where(motors.c.schedule_id.isnot(None), price_bound if assembly_solver == 'optimal' else true()),
+        db.select(motors.c.id).select_from(motors.join(relays, and_(
+            relays.c.id.in_(written_relays),
+            relays.c.current_range_min <= motors.c.full_load_current,
+            relays.c.current_range_max >= motors.c.full_load_current,
+        ))).where(motors.c.schedule_id.isnot(None), motors.c.status == 200),
+    )
+    candidates = set(db.session.scalars(eligible)) - using
+    if not candidates:
+        return using
+
+    contactor_rows, _ = changed_parts(Contactor, SCHEDULE_CONSUMER, upto)
+    relay_rows, _ = changed_parts(OverloadRelay, SCHEDULE_CONSUMER, upto)
+    for motor in db.session.scalars(db.select(Motor).where(Motor.id.in_(candidates))):
+        if selection_affected(motor, json.loads(motor.recommendation), contactor_rows, relay_rows, assembly_solver):
+            using.add(motor.id)
+    return using
+
+
+def _outdated_motors(assembly_solver, starting_methods_version):
+    """Condition matching motors computed with another solver or before a starting method change"""
+    return or_(
+        Motor.assembly_solver.is_distinct_from(assembly_solver),
+        Motor.starting_methods_version.is_distinct_from(starting_methods_version),
+    )
+
+
+def _current_outdated_motors():
+    return _outdated_motors(current_app.config.get('ASSEMBLY_SOLVER', 'optimal'),
+                            get_catalog_version('starting_methods'))
+
+
+def _changes_pending():
+    """Whether part writes are logged that no refresh has applied yet"""
+    return db.session.execute(
+        db.select(CatalogChange.id).where(CatalogChange.consumer == SCHEDULE_CONSUMER).limit(1)
+    ).first() is not None
+
+
+def refresh_motor_selections(full=False):
+    """
+    Bring persisted motor selections up to date with the catalog, recomputing
+    only affected motors unless full is set. Returns a report dict.
+    """
+    started = time.perf_counter()
+    invalidate_catalog_versions()
+    assembly_solver = current_app.config.get('ASSEMBLY_SOLVER', 'optimal')
+    starting_methods_version = get_catalog_version('starting_methods')
+    upto, changes = pending_changes(SCHEDULE_CONSUMER)
+    scheduled = Motor.schedule_id.isnot(None)
+    motor_count = db.session.scalar(db.select(func.count(Motor.id)).where(scheduled))
+
+    full = full or changes > motor_count
+    if full:
+        selected = scheduled
+    else:
+        stale = set(db.session.scalars(db.select(Motor.id).where(
+            scheduled, _outdated_motors(assembly_solver, starting_methods_version)
+        )))
+        if changes:
+            stale |= _affected_motor_ids(upto, assembly_solver)
+        selected = Motor.id.in_(stale)
+
+    motors = db.session.scalars(db.select(Motor).where(selected).order_by(Motor.id)).all() \
+        if full or stale else []
+    compute_motor_selections(motors)
+    if changes:
+        clear_changes(SCHEDULE_CONSUMER, upto)
+    db.session.commit()
+
+    return {
+        'mode': 'full' if full else 'incremental',
+        'changes': changes,
+        'recomputed': len(motors),
+        'motors': motor_count,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def add_schedule_motors(schedule, motors):
+    """Create Motor rows from parsed column values, select their switchgear and commit"""
+    rows = [Motor(schedule_id=schedule.id, **values) for values in motors]
+    db.session.add_all(rows)
+    db.session.flush()
+    compute_motor_selections(rows)
+    schedule.updated_at = time.time()
+    db.session.commit()
+    return rows
+
+
+def create_schedule(name, motors):
+    now = time.time()
+    schedule = MotorSchedule(name=name, created_at=now, updated_at=now)
+    db.session.add(schedule)
+    db.session.flush()
+    add_schedule_motors(schedule, motors)
+    return schedule
+
+
+def delete_schedule_motors(condition):
+    """Delete the motors matching condition and their motor_parts rows"""
+    motor_parts = MotorPart.__table__
+    db.session.execute(motor_parts.delete().where(
+        motor_parts.c.motor_id.in_(db.select(Motor.id).where(condition))
+    ))
+    db.session.execute(Motor.__table__.delete().where(condition))
+
+
+def motor_result(motor):
+    """A motor with its selection (or selection error)"""
+    body = json.loads(motor.recommendation)
+    if motor.status == 200:
+        return {**motor.to_dict(), 'recommendation': body}
+    return {**motor.to_dict(), **body}
+
+
+def schedule_detail(schedule):
+    """A schedule with its motors, their selections, the BOM totals and whether a refresh is due"""
+    from src.routes.switchgear import summarize_bill_of_materials
+
+    motors = db.session.scalars(
+        db.select(Motor).where(Motor.schedule_id == schedule.id).order_by(Motor.id)
+    ).all()
+    results = [motor_result(motor) for motor in motors]
+    recommendations = [result['recommendation'] for result in results if result['status'] == 200]
+    outdated = db.session.execute(db.select(Motor.id).where(
+        Motor.schedule_id == schedule.id, _current_outdated_motors()
+    ).limit(1)).first() is not None
+    return {
+        **schedule.to_dict(),
+        'stale': outdated or _changes_pending(),
+        'motors': results,
+        'summary': {
+            'motors': len(motors),
+            'succeeded': len(recommendations),
+            'failed': len(motors) - len(recommendations),
+            **summarize_bill_of_materials(recommendations)
+        }
+    }
+
+
+def schedule_totals():
+    """Every schedule with its motor count, total cost and whether a refresh is due"""
+    outdated = case((and_(Motor.id.isnot(None), _current_outdated_motors()), 1), else_=0)
+    rows = db.session.execute(
+        db.select(MotorSchedule, func.count(Motor.id), func.sum(Motor.total_cost), func.max(outdated))
+        .outerjoin(Motor, Motor.schedule_id == MotorSchedule.id)
+        .group_by(MotorSchedule.id).order_by(MotorSchedule.id)
+    ).all()
+    pending = _changes_pending() if rows else False
+    return [
+        {**schedule.to_dict(), 'motors': motors, 'total_cost': round(total_cost or 0.0, 2),
+         'stale': bool(stale) or pending}
+        for schedule, motors, total_cost, stale in rows
+    ]
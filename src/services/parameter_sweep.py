@@ -0,0 +1,474 @@
+"""
+Sizing sensitivity sweeps over motor power, voltage, power factor and efficiency.
+
+``run_sweep`` evaluates the /calculate selection at every point of the grid
+spanned by the four parameter axes, without a Python-level lookup per point:
+
+* FLC and circuit breaker ratings are broadcast over the whole grid.
+* Contactors are columnar arrays. Greedy picks are one ``searchsorted``
+  per voltage over the contactors in ``select_best_contactor`` order. The
+  optimal solver's "cheapest of at least this rating" comes from
+  ``searchsorted`` into suffix minima of each frame size's contactors.
+* Overload relays are matched by pairing each relay with the run of
+  points, sorted by FLC, whose FLC ± 20% (or FLC) it covers. Both bounds
+  are monotone in FLC, so each run is two ``searchsorted`` calls. The pairs
+  are then reduced per point with ``np.minimum.at``, breaking ties the way
+  the selection functions do.
+
+The result is a set of matrices indexed [power][voltage][power_factor]
+[efficiency]: point status, part ids per contactor role, relay id and
+total cost, plus each referenced part once.
+"""
+
+import math
+
+import numpy as np
+from flask import current_app
+
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay, StartingMethod
+from src.database.engine import catalog_session
+from src.services.assembly_solver import ASSEMBLY_ROLES, PROTECTED_ROLES, assembly_solver_enabled
+from src.services.catalog_index import catalog_index_enabled, get_versioned
+
+# Axis order of every result matrix, with the /calculate default of each parameter
+SWEEP_AXES = (
+    ('motor_power', None),
+    ('voltage', 415),
+    ('power_factor', 0.8),
+    ('efficiency', 0.9),
+)
+
+# Upper bound on (point, relay) pairs materialized at once
+PAIR_CHUNK = 1 << 21
+
+# Rank that loses to every contactor when taking minima over frames
+NO_RANK = np.iinfo(np.int64).max
+
+
+class SweepError(ValueError):
+    """Raised for a malformed sweep request"""
+
+
+def _is_number(value):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        # An integer too large for a float
+        return False
+
+
+def parse_axis(name, value, max_points):
+    """
+    Values of one axis: a number, a list of numbers, {start, stop, step} (stop
+    included) or {start, stop, num}. Generated steps are rounded to 10 decimal
+    places so they land on the decimal values they name.
+    """
+    if _is_number(value):
+        return np.array([value], dtype=float)
+    if isinstance(value, list):
+        if not value or not all(_is_number(item) for item in value):
+            raise SweepError(f'{name} must be a non-empty list of numbers')
+        if len(value) > max_points:
+            raise SweepError(f'{name} may have at most {max_points} values')
+        return np.array(value, dtype=float)
+    if not isinstance(value, dict) or not _is_number(value.get('start')) or not _is_number(value.get('stop')):
+        raise SweepError(f'{name} must be a number, a list of numbers or a {{start, stop, step|num}} range')
+
+    start, stop = float(value['start']), float(value['stop'])
+    if 'num' in value:
+        num = value['num']
+        if not isinstance(num, int) or isinstance(num, bool) or not 0 < num <= max_points:
+            raise SweepError(f'{name}.num must be an integer between 1 and {max_points}')
+        return np.round(np.linspace(start, stop, num), 10)
+
+    step = value.get('step')
+    if not _is_number(step) or step <= 0:
+        raise SweepError(f'{name}.step must be a positive number')
+    if stop < start:
+        raise SweepError(f'{name}.stop must not be below {name}.start')
+    # Checked before flooring: a tiny step over a wide range overflows to inf
+    span = (stop - start) / step + 1e-9
+    if not math.isfinite(span) or span >= max_points:
+        raise SweepError(f'{name} may have at most {max_points} values')
+    return np.round(start + step * np.arange(math.floor(span) + 1), 10)
+
+
+def parse_sweep(data, max_points):
+    """(starting_method, axes) of a sweep body; axes maps each SWEEP_AXES name to its values"""
+    if not isinstance(data, dict):
+        raise SweepError('No data provided')
+    starting_method = data.get('starting_method')
+    if not isinstance(starting_method, str) or not starting_method:
+        raise SweepError('Starting method must be specified')
+
+    if (data.get('motor_power_kw') is None) == (data.get('motor_power_hp') is None):
+        raise SweepError('Motor power must be specified in either HP or kW')
+    power_unit = 'motor_power_kw' if data.get('motor_power_kw') is not None else 'motor_power_hp'
+
+    axes = {}
+    for name, default in SWEEP_AXES:
+        field = power_unit if name == 'motor_power' else name
+        axes[name] = parse_axis(field, data.get(field, default), max_points)
+
+    points = math.prod(len(values) for values in axes.values())
+    if points > max_points:
+        raise SweepError(f'A sweep may cover at most {max_points} points, this one covers {points}')
+
+    # The same conversions parse_motor_specification applies to a single motor
+    if power_unit == 'motor_power_kw':
+        axes['motor_power_kw'], axes['motor_power_hp'] = axes['motor_power'], axes['motor_power'] / 0.746
+    else:
+        axes['motor_power_kw'], axes['motor_power_hp'] = axes['motor_power'] * 0.746, axes['motor_power']
+    return starting_method, axes
+
+
+def _round2(values):
+    # Python's round() so results match calculate_full_load_current exactly (np.round differs at half-cents)
+    return np.fromiter((round(value, 2) for value in values.ravel().tolist()), dtype=float,
+                       count=values.size).reshape(values.shape)
+
+
+def sweep_ratings(axes):
+    """FLC and circuit breaker rating broadcast over the (power, voltage, power factor, efficiency) grid"""
+    power_kw = axes['motor_power_kw'][:, None, None, None]
+    voltage = axes['voltage'][None, :, None, None]
+    power_factor = axes['power_factor'][None, None, :, None]
+    efficiency = axes['efficiency'][None, None, None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        raw_flc = power_kw * 1000 / (math.sqrt(3) * voltage * power_factor * efficiency)
+        flc = _round2(raw_flc)
+        breaker = _round2(flc * 1.5)
+    return flc, breaker
+
+
+def _price_column(rows):
+    return np.array([np.nan if row['price'] is None else row['price'] for row in rows], dtype=float)
+
+
+class ContactorArrays:
+    """
+    Contactor columns. Selection positions index the contactors sorted by
+    (current_rating, price with NULL first, id), as select_best_contactor
+    orders them; ranks index the priced contactors sorted by (price, id).
+    Position and rank -1 read a trailing "none" sentinel.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.rows = {row['id']: row for row in rows}
+        current = np.array([row['current_rating'] for row in rows], dtype=float)
+        voltage = np.array([row['voltage_rating'] for row in rows], dtype=float)
+        price = _price_column(rows)
+        ids = np.array([row['id'] for row in rows], dtype=np.int64)
+
+        order = np.lexsort((ids, np.nan_to_num(price), ~np.isnan(price), current))
+        self.current = current[order]
+        self.voltage = voltage[order]
+        self.ids = np.append(ids[order], -1)
+        self.price = np.append(price[order], np.nan)
+        self.frame = [rows[position]['frame_size'] for position in order.tolist()] + [None]
+
+        priced = np.flatnonzero(~np.isnan(price))
+        by_cost = priced[np.lexsort((ids[priced], price[priced]))]
+        self.rank_ids = np.append(ids[by_cost], -1)
+        self.rank_price = np.append(price[by_cost], np.nan)
+        rank = np.empty(len(rows), dtype=np.int64)
+        rank[by_cost] = np.arange(len(by_cost))
+
+        # frame (None for any frame) -> priced contactors of that frame sorted by current rating
+        frames = np.array([row['frame_size'] for row in rows], dtype=object)
+        self._cheapest = {}
+        for frame in [None, *{row['frame_size'] for row in rows} - {None}]:
+            members = priced if frame is None else priced[frames[priced] == frame]
+            members = members[np.argsort(current[members], kind='stable')]
+            self._cheapest[frame] = (current[members], voltage[members], rank[members])
+
+    def select(self, ratings, voltage):
+        """Positions of select_best_contactor(rating, voltage) for an array of ratings"""
+        # Filtering keeps the sort order, so the first sufficient rating is also the cheapest of that rating
+        positions = np.flatnonzero(self.voltage >= voltage)
+        found = np.searchsorted(self.current[positions], ratings, side='left')
+        picks = np.full(ratings.shape, -1, dtype=np.int64)
+        fits = found < len(positions)
+        picks[fits] = positions[found[fits]]
+        return picks
+
+    def cheapest(self, ratings, voltage, frame=None):
+        """Ranks of the cheapest priced contactor of at least each rating and the voltage, optionally of one frame"""
+        picks = np.full(ratings.shape, -1, dtype=np.int64)
+        if frame not in self._cheapest:
+            return picks
+        current, voltages, rank = self._cheapest[frame]
+        sufficient = voltages >= voltage
+        current, rank = current[sufficient], rank[sufficient]
+        if not len(rank):
+            return picks
+        suffix = np.minimum.accumulate(rank[::-1])[::-1]
+        found = np.searchsorted(current, ratings, side='left')
+        fits = found < len(rank)
+        picks[fits] = suffix[found[fits]]
+        return picks
+
+
+class RelayArrays:
+    """Overload relay columns sorted by (price with NULL first, id); position -1 reads a "none" sentinel"""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        price = _price_column(rows)
+        ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        order = np.lexsort((ids, np.nan_to_num(price), ~np.isnan(price)))
+        rows = [rows[position] for position in order.tolist()]
+
+        self.rows = rows
+        self.ids = np.append(ids[order], -1)
+        self.price = np.append(price[order], np.nan)
+        self.priced = np.flatnonzero(~np.isnan(self.price[:-1]))
+        self.range_min = np.array([row['current_range_min'] for row in rows], dtype=float)
+        self.range_max = np.array([row['current_range_max'] for row in rows], dtype=float)
+
+        # Distinct compatible frame sets, and each relay's position among them
+        codes = {}
+        self.frame_set = np.array([
+            codes.setdefault(frozenset(row['compatible_contactor_frames']), len(codes)) for row in rows
+        ], dtype=np.int64)
+        self.frame_sets = list(codes)
+
+    def pairs(self, flc, lower, upper, relays=None):
+        """
+        Yield (point, relay) index arrays for every relay (of the given positions)
+        with range_min <= FLC x lower and range_max >= FLC x upper
+        """
+        relays = np.arange(len(self.rows)) if relays is None else relays
+        order = np.argsort(flc, kind='stable')
+        # Both products are non-decreasing in FLC, so each relay covers one run of the sorted points
+        first = np.searchsorted(flc[order] * lower, self.range_min[relays], side='left')
+        last = np.searchsorted(flc[order] * upper, self.range_max[relays], side='right')
+        counts = np.maximum(last - first, 0)
+        covering = np.flatnonzero(counts)
+        ends = np.cumsum(counts[covering])
+
+        start = 0
+        while start < len(covering):
+            done = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, done + PAIR_CHUNK, side='right')), start + 1)
+            chunk = covering[start:stop]
+            sizes = counts[chunk]
+            offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+            positions = np.repeat(first[chunk], sizes) + np.arange(int(sizes.sum())) - offsets
+            yield order[positions], relays[np.repeat(chunk, sizes)]
+            start = stop
+
+    def first(self, flc, lower, upper, relays=None, accept=None):
+        """
+        Per point, the lowest position among relays (of the given positions) covering
+        [FLC x lower, FLC x upper] that accept(points, relays) allows; -1 if there is none
+        """
+        best = np.full(flc.shape, len(self.rows), dtype=np.int64)
+        for points, matched in self.pairs(flc, lower, upper, relays):
+            if accept is not None:
+                allowed = accept(points, matched)
+                points, matched = points[allowed], matched[allowed]
+            np.minimum.at(best, points, matched)
+        best[best == len(self.rows)] = -1
+        return best
+
+
+def _load_rows(model):
+    return [row.to_dict() for row in catalog_session().scalars(db.select(model).order_by(model.id))]
+
+
+def _sweep_catalog():
+    """(starting methods or None for the index table, contactor arrays, relay arrays) for the current catalog"""
+    if not catalog_index_enabled():
+        return _load_rows(StartingMethod), ContactorArrays(_load_rows(Contactor)), \
+            RelayArrays(_load_rows(OverloadRelay))
+    contactors = get_versioned(
+        'contactors', lambda version: ContactorArrays(_load_rows(Contactor), version), key='contactors:sweep'
+    )
+    relays = get_versioned(
+        'overload_relays', lambda version: RelayArrays(_load_rows(OverloadRelay), version), key='overload_relays:sweep'
+    )
+    return None, contactors, relays
+
+
+def _greedy_picks(roles, flc, breaker, voltage, contactors, relays):
+    """
+    Contactor ids per role, relay positions, total cost and whether every
+    role was filled, for flat arrays of points, with the greedy selection
+    """
+    complete = np.full(flc.shape, bool(roles))
+    contactor_ids = {}
+    total = np.zeros(flc.shape)
+    protected = None
+    for role, factor in roles:
+        picks = np.full(flc.shape, -1, dtype=np.int64)
+        for value in np.unique(voltage).tolist():
+            points = np.flatnonzero(complete & (voltage == value))
+            picks[points] = contactors.select(breaker[points] * factor, value)
+        complete &= picks >= 0
+        contactor_ids[role] = contactors.ids[picks]
+        total = total + contactors.price[picks]
+        if protected is None:
+            protected = picks
+
+    # select_overload_relay: the cheapest relay covering FLC ± 20% that fits the protected contactor's frame...
+    relay_picks = np.full(flc.shape, -1, dtype=np.int64)
+    points = np.flatnonzero(complete)
+    if len(points) and len(relays.rows):
+        frame_codes = {}
+        point_frame = np.array([
+            frame_codes.setdefault(contactors.frame[pick], len(frame_codes)) for pick in protected[points].tolist()
+        ], dtype=np.int64)
+        fits = np.array([
+            [not frames or frame in frames for frame in frame_codes] for frames in relays.frame_sets
+        ], dtype=bool).reshape(len(relays.frame_sets), len(frame_codes))
+
+        picks = relays.first(flc[points], 0.8, 1.2, accept=lambda at, matched: fits[
+            relays.frame_set[matched], point_frame[at]
+        ])
+        # ...else the cheapest relay covering FLC
+        missing = np.flatnonzero(picks < 0)
+        picks[missing] = relays.first(flc[points][missing], 1.0, 1.0)
+        relay_picks[points] = picks
+    total = total + np.where(relay_picks >= 0, relays.price[relay_picks], 0.0)
+    return contactor_ids, relay_picks, total, complete
+
+
+def _optimal_picks(roles, flc, breaker, voltage, contactors, relays):
+    """The results of _greedy_picks for the cost-optimal assembly of solve_assembly"""
+    voltages = np.unique(voltage).tolist()
+
+    def cheapest(ratings, frame=None):
+        ranks = np.full(flc.shape, -1, dtype=np.int64)
+        for value in voltages:
+            points = np.flatnonzero(voltage == value)
+            ranks[points] = contactors.cheapest(ratings[points], value, frame)
+        return ranks
+
+    complete = np.full(flc.shape, bool(roles))
+    ranks = {}
+    for role, factor in roles:
+        if role not in PROTECTED_ROLES:
+            ranks[role] = cheapest(breaker * factor)
+            complete &= ranks[role] >= 0
+    cheapest_any = cheapest(breaker)
+    complete &= cheapest_any >= 0
+
+    relay_picks = np.full(flc.shape, -1, dtype=np.int64)
+    protected = cheapest_any.copy()
+    points = np.flatnonzero(complete)
+    if len(points) and len(relays.rows):
+        # Cheapest contactor per point for each relay frame set (of any frame for an empty set)
+        by_frame = {frame: cheapest(breaker, frame)[points] for frame in set().union(*relays.frame_sets)}
+        by_set = np.empty((len(points), len(relays.frame_sets)), dtype=np.int64)
+        for code, frames in enumerate(relays.frame_sets):
+            if frames:
+                found = np.stack([by_frame[frame] for frame in frames])
+                by_set[:, code] = np.where(found >= 0, found, NO_RANK).min(axis=0)
+            else:
+                by_set[:, code] = cheapest_any[points]
+        by_set[by_set == NO_RANK] = -1
+
+        # Lowest relay + contactor cost per point; among equal costs the relay first in (price, id) order
+        best_cost = np.full(len(points), np.inf)
+        candidates = []
+        for at, matched in relays.pairs(flc[points], 0.8, 1.2, relays.priced):
+            contactor = by_set[at, relays.frame_set[matched]]
+            usable = contactor >= 0
+            at, matched = at[usable], matched[usable]
+            cost = contactors.rank_price[contactor[usable]] + relays.price[matched]
+            np.minimum.at(best_cost, at, cost)
+            candidates.append((at, matched, cost))
+        best_relay = np.full(len(points), len(relays.rows), dtype=np.int64)
+        for at, matched, cost in candidates:
+            winning = cost == best_cost[at]
+            np.minimum.at(best_relay, at[winning], matched[winning])
+
+        solved = best_relay < len(relays.rows)
+        picks = np.where(solved, best_relay, -1)
+        assembled = by_set[np.arange(len(points)), relays.frame_set[np.where(solved, best_relay, 0)]]
+        protected[points] = np.where(solved, assembled, cheapest_any[points])
+        # No frame-compatible relay covers FLC ± 20%: the cheapest priced relay covering FLC
+        missing = np.flatnonzero(~solved)
+        picks[missing] = relays.first(flc[points][missing], 1.0, 1.0, relays.priced)
+        relay_picks[points] = picks
+
+    contactor_ids = {}
+    total = np.zeros(flc.shape)
+    for role, _ in roles:
+        rank = protected if role in PROTECTED_ROLES else ranks[role]
+        contactor_ids[role] = contactors.rank_ids[rank]
+        total = total + contactors.rank_price[rank]
+    total = total + np.where(relay_picks >= 0, relays.price[relay_picks], 0.0)
+    return contactor_ids, relay_picks, total, complete
+
+
+def _matrix(values, valid):
+    """Nested lists shaped like the grid, with null where valid is false"""
+    return np.where(valid, values.astype(object), None).tolist()
+
+
+def run_sweep(starting_method, axes):
+    """Selection results over the whole parameter grid, as matrices indexed [power][voltage][power_factor][efficiency]"""
+    from src.routes.switchgear import get_compatible_starting_methods
+
+    starting_methods, contactors, relays = _sweep_catalog()
+    flc, breaker = sweep_ratings(axes)
+    shape = flc.shape
+
+    # Starting method compatibility depends on motor power only
+    suitable = np.array([
+        any(method['name'] == starting_method for method in get_compatible_starting_methods(power_hp, starting_methods))
+        for power_hp in axes['motor_power_hp'].tolist()
+    ], dtype=bool)[:, None, None, None]
+    finite = np.isfinite(flc)
+    computable = suitable & finite
+
+    # Selections run over the flattened computable points
+    points = np.flatnonzero(computable)
+    voltage = np.broadcast_to(axes['voltage'][None, :, None, None], shape).ravel()[points]
+    solve = _optimal_picks if assembly_solver_enabled() else _greedy_picks
+    contactor_ids, relay_picks, point_total, point_complete = solve(
+        ASSEMBLY_ROLES.get(starting_method, ()), flc.ravel()[points], breaker.ravel()[points], voltage,
+        contactors, relays
+    )
+
+    def grid(values, fill):
+        full = np.full(flc.size, fill, dtype=values.dtype)
+        full[points] = values
+        return full.reshape(shape)
+
+    complete = grid(point_complete, False)
+    relay_picks = np.where(point_complete, relay_picks, -1)
+    relay_ids = grid(relays.ids[relay_picks], -1)
+    total = _round2(grid(point_total, np.nan))
+    contactor_grids = {role: grid(ids, -1) for role, ids in contactor_ids.items()}
+    status = np.where(complete, 200, np.where(computable, 404, 400))
+
+    used_contactors = set()
+    for ids in contactor_grids.values():
+        used_contactors.update(np.unique(ids[complete]).tolist())
+    used_relays = np.unique(relay_picks[relay_picks >= 0]).tolist()
+    return {
+        'starting_method': starting_method,
+        'assembly_solver': current_app.config.get('ASSEMBLY_SOLVER', 'optimal'),
+        'axes': {name: axes[name].tolist() for name in (
+            'motor_power_kw', 'motor_power_hp', 'voltage', 'power_factor', 'efficiency'
+        )},
+        'shape': list(shape),
+        'status': status.tolist(),
+        'full_load_current': _matrix(flc, finite),
+        'circuit_breaker_rating': _matrix(breaker, finite),
+        'contactors': {role: _matrix(ids, complete) for role, ids in contactor_grids.items()},
+        'overload_relay': _matrix(relay_ids, relay_ids >= 0),
+        'total_cost': _matrix(total, complete & np.isfinite(total)),
+        'parts': {
+            'contactors': [contactors.rows[part_id] for part_id in sorted(used_contactors)],
+            'overload_relays': [relays.rows[position] for position in used_relays],
+        },
+    }
@@ -0,0 +1,121 @@
+"""
+Bounded LRU + TTL cache of full /calculate recommendation payloads.
+
+Entries are keyed on the normalized motor inputs and are dropped wholesale
+whenever the contactor, overload relay or starting method catalog changes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from src.services.catalog_version import get_catalog_version
+
+DEPENDENT_TABLES = ('contactors', 'overload_relays', 'starting_methods')
+
+
+class RecommendationCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached payload for key, or None on a miss"""
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, version, payload):
+        """Store a payload computed against the given catalog version"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = (self._clock() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+def _key_part(value):
+    # 415 and 415.0 hash alike but serialize differently, so keep the type in the key
+    return (type(value).__name__, value)
+
+
+def recommendation_cache_key(spec):
+    """Cache key for a parsed motor specification (see parse_motor_specification)"""
+    return tuple(_key_part(spec[field]) for field in (
+        'motor_power_kw', 'motor_power_hp', 'voltage', 'frequency',
+        'starting_method', 'power_factor', 'efficiency'
+    ))
+
+
+def recommendation_catalog_version():
+    """Versions of every table a recommendation is derived from"""
+    return tuple(get_catalog_version(table_name) for table_name in DEPENDENT_TABLES)
+
+
+def get_recommendation_cache():
+    """Return this app's recommendation cache, creating it from config on first use"""
+    cache = current_app.extensions.get('recommendation_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('recommendation_cache', RecommendationCache(
+            maxsize=current_app.config.get('RECOMMENDATION_CACHE_SIZE', 1024),
+            ttl=current_app.config.get('RECOMMENDATION_CACHE_TTL', 300.0)
+        ))
+    return cache
@@ -0,0 +1,197 @@
+"""
+Materialized /calculate results for standard IEC motor ratings.
+
+``refresh_recommendation_grid`` runs the selection for every IEC 60072-1 kW
+step x common supply voltage x compatible starting method and stores each
+payload in ``recommendation_grid``. /calculate answers requests matching a
+cell exactly (power given in kW, default power factor, efficiency and
+frequency) from an in-process copy of the table, as long as the grid was
+computed from the current catalog versions; anything else is computed live.
+
+Once a grid exists, contactor and overload relay writes (ORM flushes and
+bulk imports) are logged in ``catalog_changes``. A refresh then recomputes
+only the cells those rows can affect: cells using a written part, and cells
+where a written part meets the ratings (or its range contains the FLC) and
+is cheap enough, or for the greedy solver small enough, to be picked. A
+starting method change, another ASSEMBLY_SOLVER setting or more logged
+writes than there are cells recomputes every cell.
+"""
+
+import json
+import time
+
+from flask import current_app
+from sqlalchemy import bindparam
+
+from src.models.user import db
+from src.database.engine import catalog_session
+from src.models.switchgear import Contactor, OverloadRelay, RecommendationGridCell, RecommendationGridState
+from src.services.catalog_changes import (
+    changed_parts, clear_changes, pending_changes, selection_affected, selection_parts
+)
+from src.services.catalog_index import get_versioned
+from src.services.catalog_version import bump_catalog_version, invalidate_catalog_versions
+from src.services.json_provider import dumps_response_body
+from src.services.recommendation_cache import (
+    DEPENDENT_TABLES, recommendation_cache_key, recommendation_catalog_version
+)
+
+# IEC 60072-1 standard output ratings
+IEC_POWER_KW = (
+    0.37, 0.55, 0.75, 1.1, 1.5, 2.2, 3, 4, 5.5, 7.5, 11, 15, 18.5, 22, 30, 37, 45, 55,
+    75, 90, 110, 132, 160, 200, 250, 315, 355, 400,
+)
+GRID_VOLTAGES = (230, 400, 415, 690)
+GRID_TABLE = 'recommendation_grid'
+
+
+def recommendation_grid_enabled():
+    return current_app.config.get('RECOMMENDATION_GRID_ENABLED', True)
+
+
+def grid_spec(power_kw, voltage, starting_method):
+    """Parsed motor specification of the /calculate request a grid cell answers"""
+    from src.routes.switchgear import parse_motor_specification
+
+    # Integral steps are sent as JSON integers (3, not 3.0), which the payload echoes back
+    power_kw = int(power_kw) if float(power_kw).is_integer() else power_kw
+    spec, _ = parse_motor_specification({
+        'motor_power_kw': power_kw, 'voltage': voltage, 'starting_method': starting_method
+    })
+    return spec
+
+
+class RecommendationGrid:
+    """Encoded successful grid payloads keyed like the recommendation cache"""
+
+    def __init__(self, state, cells, version=None):
+        self.version = version
+        self.catalog_version = tuple(json.loads(state.catalog_version)) if state else None
+        self.assembly_solver = state.assembly_solver if state else None
+        self._bodies = {}
+        for cell in cells:
+            if cell.status == 200:
+                key = recommendation_cache_key(grid_spec(cell.power_kw, cell.voltage, cell.starting_method))
+                self._bodies[key] = dumps_response_body(json.loads(cell.body))
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def lookup(self, spec, catalog_version):
+        """Encoded payload for spec, or None unless a cell matches and is current"""
+        if catalog_version != self.catalog_version or \
+                current_app.config.get('ASSEMBLY_SOLVER', 'optimal') != self.assembly_solver:
+            return None
+        return self._bodies.get(recommendation_cache_key(spec))
+
+
+def get_recommendation_grid():
+    """Return the grid loaded for the current grid version"""
+    def build(version):
+        session = catalog_session()
+        state = session.get(RecommendationGridState, 1)
+        cells = session.scalars(db.select(RecommendationGridCell)).all()
+        return RecommendationGrid(state, cells, version)
+    return get_versioned(GRID_TABLE, build)
+
+
+def _compute_cell(power_kw, voltage, starting_method, compatible_methods):
+    from src.routes.switchgear import build_recommendation, calculate_full_load_current
+
+    spec = grid_spec(power_kw, voltage, starting_method)
+    flc = calculate_full_load_current(spec['motor_power_kw'], voltage, spec['power_factor'], spec['efficiency'])
+    circuit_breaker_rating = round(flc * 1.5, 2)
+    body, status = build_recommendation(spec, compatible_methods, flc, circuit_breaker_rating)
+
+    contactor_ids, overload_relay_id = selection_parts(body) if status == 200 else ([], None)
+    return {
+        'power_kw': power_kw,
+        'voltage': voltage,
+        'starting_method': starting_method,
+        'full_load_current': flc,
+        'circuit_breaker_rating': circuit_breaker_rating,
+        'status': status,
+        'contactor_ids': json.dumps(contactor_ids),
+        'overload_relay_id': overload_relay_id,
+        'body': json.dumps(body),
+    }
+
+
+def _grid_methods():
+    """Compatible starting method dicts per IEC power step"""
+    from src.routes.switchgear import get_compatible_starting_methods
+
+    return {power_kw: get_compatible_starting_methods(power_kw / 0.746) for power_kw in IEC_POWER_KW}
+
+
+def _affected_cells(cells, upto, assembly_solver):
+    """Keys of the cells a logged contactor or relay write can change"""
+    contactors, contactor_ids = changed_parts(Contactor, GRID_TABLE, upto)
+    relays, relay_ids = changed_parts(OverloadRelay, GRID_TABLE, upto)
+
+    affected = set()
+    for cell in cells:
+        uses_written_part = contactor_ids.intersection(json.loads(cell.contactor_ids or '[]')) or \
+            cell.overload_relay_id in relay_ids
+        if uses_written_part or selection_affected(cell, json.loads(cell.body), contactors, relays, assembly_solver):
+            affected.add((cell.power_kw, cell.voltage, cell.starting_method))
+    return affected
+
+
+def refresh_recommendation_grid(full=False):
+    """
+    Bring the recommendation grid up to date with the catalog, recomputing only
+    affected cells unless full is set or the grid cannot be updated in place.
+    Must run inside an app context; returns a report dict.
+    """
+    started = time.perf_counter()
+    invalidate_catalog_versions()
+    catalog_version = list(recommendation_catalog_version())
+    versions = dict(zip(DEPENDENT_TABLES, catalog_version))
+    assembly_solver = current_app.config.get('ASSEMBLY_SOLVER', 'optimal')
+    upto, changes = pending_changes(GRID_TABLE)
+
+    state = db.session.get(RecommendationGridState, 1)
+    cells = db.session.scalars(db.select(RecommendationGridCell)).all()
+    methods = _grid_methods()
+    expected = {
+        (power_kw, voltage, method['name'])
+        for power_kw, compatible in methods.items() for method in compatible for voltage in GRID_VOLTAGES
+    }
+    if state is not None:
+        previous = dict(zip(DEPENDENT_TABLES, json.loads(state.catalog_version)))
+    full = full or state is None or state.assembly_solver != assembly_solver or \
+        previous['starting_methods'] != versions['starting_methods'] or \
+        {(cell.power_kw, cell.voltage, cell.starting_method) for cell in cells} != expected or \
+        changes > len(expected)
+
+    keys = expected if full else _affected_cells(cells, upto, assembly_solver)
+    rows = [_compute_cell(power_kw, voltage, method, methods[power_kw]) for power_kw, voltage, method in sorted(keys)]
+
+    table = RecommendationGridCell.__table__
+    if full:
+        db.session.execute(table.delete())
+    elif rows:
+        db.session.execute(table.delete().where(
+            table.c.power_kw == bindparam('key_power_kw'),
+            table.c.voltage == bindparam('key_voltage'),
+            table.c.starting_method == bindparam('key_starting_method'),
+        ), [{'key_power_kw': p, 'key_voltage': v, 'key_starting_method': m} for p, v, m in keys])
+    if rows:
+        db.session.execute(table.insert(), rows)
+
+    db.session.merge(RecommendationGridState(
+        id=1, catalog_version=json.dumps(catalog_version), assembly_solver=assembly_solver, built_at=time.time()
+    ))
+    clear_changes(GRID_TABLE, upto)
+    bump_catalog_version(db.session.connection(), [GRID_TABLE])
+    db.session.commit()
+    invalidate_catalog_versions()
+
+    return {
+        'mode': 'full' if full else 'incremental',
+        'changes': changes,
+        'recomputed': len(rows),
+        'cells': len(expected),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,100 @@
+"""
+Single-flight coalescing of identical concurrent /calculate requests.
+
+When several requests for the same normalized motor specification and
+catalog version miss the recommendation cache at once, only the first one
+runs the selection. The others wait for its encoded response and reuse
+it, whether they are served by threads or by the async engine's event
+loop. Each process coalesces only its own requests; the counters are
+exported on /metrics.
+"""
+
+import threading
+
+from flask import current_app
+
+from src.database.engine import catalog_wait
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its result with concurrent callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    def run(self, key, compute):
+        """Return compute()'s result, or that of an identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            catalog_wait(call.done)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            requests = self.computed + self.coalesced
+            return {
+                'in_flight': len(self._calls),
+                'computed': self.computed,
+                'coalesced': self.coalesced,
+                'coalesced_ratio': round(self.coalesced / requests, 4) if requests else 0.0,
+            }
+
+    def render(self):
+        """Counters in the Prometheus text format"""
+        stats = self.stats()
+        return '\n'.join((
+            '# HELP switchgear_calculations_computed_total /calculate selections run',
+            '# TYPE switchgear_calculations_computed_total counter',
+            f"switchgear_calculations_computed_total {stats['computed']}",
+            '# HELP switchgear_calculations_coalesced_total /calculate requests answered by an identical in-flight selection',
+            '# TYPE switchgear_calculations_coalesced_total counter',
+            f"switchgear_calculations_coalesced_total {stats['coalesced']}",
+            '# HELP switchgear_calculations_in_flight /calculate selections currently running',
+            '# TYPE switchgear_calculations_in_flight gauge',
+            f"switchgear_calculations_in_flight {stats['in_flight']}",
+        )) + '\n'
+
+
+def calculation_coalescing_enabled():
+    return current_app.config.get('CALCULATE_COALESCING', True)
+
+
+def get_calculation_flights():
+    """Return this app's /calculate single-flight group"""
+    flights = current_app.extensions.get('calculation_flights')
+    if flights is None:
+        flights = current_app.extensions.setdefault('calculation_flights', SingleFlight())
+    return flights
@@ -0,0 +1,179 @@
+"""
+Per-request SQL accounting, Server-Timing headers and Prometheus metrics.
+
+Engine event hooks count and time every statement a request issues. The
+JSON provider is timed for serialization; whatever remains of the request
+time is reported as compute. Each response carries a ``Server-Timing``
+header with that split. Latency histograms per route and per /calculate
+starting method are kept in process memory and exported in the Prometheus
+text format. Under gunicorn every worker exports its own series.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from src.models.user import db
+from src.services.json_provider import OrjsonProvider
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def _labels(self, values, extra=''):
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{self._labels(values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(values)} {total}')
+            lines.append(f'{self.name}_count{self._labels(values)} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_duration = Histogram(
+            'switchgear_request_duration_seconds', 'Request latency by route',
+            ('route', 'method', 'status'), DURATION_BUCKETS
+        )
+        self.request_sql_queries = Histogram(
+            'switchgear_request_sql_queries', 'SQL statements issued per request by route',
+            ('route', 'method'), QUERY_BUCKETS
+        )
+        self.request_sql_duration = Histogram(
+            'switchgear_request_sql_duration_seconds', 'Time spent in SQL per request by route',
+            ('route', 'method'), DURATION_BUCKETS
+        )
+        self.calculation_duration = Histogram(
+            'switchgear_calculation_duration_seconds', '/calculate latency by requested starting method',
+            ('starting_method', 'status'), DURATION_BUCKETS
+        )
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for histogram in (self.request_duration, self.request_sql_queries,
+                              self.request_sql_duration, self.calculation_duration):
+                lines += histogram.render()
+        return '\n'.join(lines) + '\n'
+
+
+def get_request_metrics():
+    return current_app.extensions['request_metrics']
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_seconds += time.perf_counter() - context._query_started
+
+
+def instrument_engine(engine):
+    """Count and time the statements of an engine against the current request"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _timed_serialization(method):
+    @wraps(method)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if has_request_context() and 'serialize_seconds' in g:
+                g.serialize_seconds += time.perf_counter() - started
+    return timed
+
+
+def set_starting_method_label(starting_method):
+    """Label the current /calculate request for the per starting method histogram"""
+    g.starting_method = starting_method
+
+
+def _server_timing(total, sql_seconds, sql_queries, serialize_seconds):
+    compute = max(total - sql_seconds - serialize_seconds, 0.0)
+    return ', '.join((
+        f'db;dur={sql_seconds * 1000:.2f};desc="{sql_queries} queries"',
+        f'compute;dur={compute * 1000:.2f}',
+        f'serialize;dur={serialize_seconds * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ))
+
+
+def init_request_metrics(app):
+    """Install the SQL hooks, serialization timing and per-request bookkeeping; call after init_engine"""
+    app.extensions['request_metrics'] = RequestMetrics()
+    with app.app_context():
+        instrument_engine(db.engine)
+    read_engine = app.extensions.get('catalog_read_engine')
+    if read_engine is not None:
+        instrument_engine(read_engine)
+
+    provider = app.json
+    method = 'dumps_bytes' if isinstance(provider, OrjsonProvider) else 'dumps'
+    setattr(provider, method, _timed_serialization(getattr(provider, method)))
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+        g.serialize_seconds = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        if 'request_started' not in g:
+            return response
+        total = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = _server_timing(total, g.sql_seconds, g.sql_queries, g.serialize_seconds)
+
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics = app.extensions['request_metrics']
+        with metrics.lock:
+            metrics.request_duration.observe((route, request.method, str(response.status_code)), total)
+            metrics.request_sql_queries.observe((route, request.method), g.sql_queries)
+            metrics.request_sql_duration.observe((route, request.method), g.sql_seconds)
+            if 'starting_method' in g:
+                metrics.calculation_duration.observe((g.starting_method, str(response.status_code)), total)
+        return response
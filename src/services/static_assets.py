@@ -0,0 +1,142 @@
+"""
+In-memory manifest of the frontend's static folder.
+
+The folder is walked once when the app is created; restart to pick up a new
+frontend build. Each file is held in memory together with its gzip and
+brotli variants, read from ``.gz``/``.br`` files next to it when the build
+(or precompress_static.py) wrote them, otherwise compressed at boot. Boot
+time brotli needs the optional ``brotli`` package; prebuilt ``.br`` files
+are served without it.
+
+Responses carry the smallest variant the client's Accept-Encoding allows.
+Fingerprinted names (``app-3f9a1c2e.js``) are cached for a year as
+immutable; every other file, ``index.html`` included, has an ETag and is
+revalidated. Unknown paths get ``index.html`` for client-side routing.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json', 'application/manifest+json',
+    'application/wasm', 'application/xml', 'image/svg+xml', 'image/vnd.microsoft.icon',
+)
+MIN_COMPRESS_SIZE = 1024
+# (Content-Encoding, file suffix), most preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# A name segment of 8+ letters and digits (at least one of each) before the extension
+FINGERPRINT = re.compile(r'[.-](?=\w*\d)(?=\w*[A-Za-z])[A-Za-z0-9_]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def compressible(path, size):
+    mimetype = mimetypes.guess_type(path)[0] or ''
+    return size >= MIN_COMPRESS_SIZE and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(data, encoding):
+    """gzip or brotli encode data at maximum compression; None if brotli is unavailable"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def _read(path):
+    with open(path, 'rb') as stream:
+        return stream.read()
+
+
+class StaticAsset:
+    def __init__(self, path, name):
+        data = _read(path)
+        stat = os.stat(path)
+        self.name = name
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.last_modified = int(stat.st_mtime)
+        self.immutable = FINGERPRINT.search(os.path.basename(name)) is not None
+        self.etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+        self.variants = {'identity': data}
+
+        if compressible(name, len(data)):
+            for encoding, suffix in ENCODINGS:
+                prebuilt = path + suffix
+                if os.path.exists(prebuilt) and os.stat(prebuilt).st_mtime >= stat.st_mtime:
+                    encoded = _read(prebuilt)
+                else:
+                    encoded = compress(data, encoding)
+                if encoded is not None and len(encoded) < len(data):
+                    self.variants[encoding] = encoded
+
+    def choose(self, accept_encodings):
+        """(encoding, body) of the smallest variant the client accepts"""
+        encoding = min(
+            (encoding for encoding in self.variants
+             if encoding == 'identity' or accept_encodings.quality(encoding) > 0),
+            key=lambda encoding: len(self.variants[encoding])
+        )
+        return encoding, self.variants[encoding]
+
+
+class StaticManifest:
+    """Static files by URL path, indexed once"""
+
+    def __init__(self, folder):
+        self.assets = {}
+        for directory, _, files in os.walk(folder):
+            names = set(files)
+            for file_name in files:
+                base, suffix = os.path.splitext(file_name)
+                if suffix in ('.gz', '.br') and base in names:
+                    continue  # a precompressed variant, served through its original
+                path = os.path.join(directory, file_name)
+                name = os.path.relpath(path, folder).replace(os.sep, '/')
+                self.assets[name] = StaticAsset(path, name)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def get(self, name):
+        return self.assets.get(name)
+
+
+def init_static_manifest(app):
+    """Index the app's static folder, if it has one"""
+    if app.static_folder is not None and os.path.isdir(app.static_folder):
+        app.extensions['static_manifest'] = StaticManifest(app.static_folder)
+
+
+def get_static_manifest():
+    return current_app.extensions.get('static_manifest')
+
+
+def static_response(asset):
+    """Serve an asset with content negotiation, validators and cache headers"""
+    encoding, body = asset.choose(request.accept_encodings)
+    response = current_app.response_class(body, mimetype=asset.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    if len(asset.variants) > 1:
+        response.vary.add('Accept-Encoding')
+
+    # Each encoding is a different representation, so it gets its own validator
+    response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+    response.last_modified = asset.last_modified
+    if asset.immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
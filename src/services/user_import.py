@@ -0,0 +1,100 @@
+"""
+Bulk user creation.
+
+A batch is validated row by row, then checked for taken usernames and
+emails with a single ``WHERE username IN (...) OR email IN (...)`` query
+against the unique indexes, and the remaining rows are inserted with one
+executemany in one transaction. Rows that clash with an existing user or
+with an earlier row of the same batch are reported as conflicts instead
+of failing the whole batch.
+"""
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import User, db
+
+# field -> maximum length
+USER_FIELDS = {
+    'username': User.username.type.length,
+    'email': User.email.type.length,
+}
+
+
+def _validate(row):
+    if not isinstance(row, dict):
+        return 'Each user must be an object'
+    for field, max_length in USER_FIELDS.items():
+        value = row.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return f'{field} must be a non-empty string'
+        if len(value) > max_length:
+            return f'{field} may be at most {max_length} characters'
+    return None
+
+
+def _taken_values(rows):
+    """Usernames and emails of rows that already exist, from one query"""
+    usernames = {row['username'] for row in rows}
+    emails = {row['email'] for row in rows}
+    existing = db.session.execute(
+        db.select(User.username, User.email).where(
+            db.or_(User.username.in_(usernames), User.email.in_(emails))
+        )
+    ).all()
+    return {username for username, _ in existing}, {email for _, email in existing}
+
+
+def bulk_create_users(rows):
+    """
+    Create users from a list of {username, email} dicts in one transaction.
+
+    Returns one result per input row, in order: ``{index, status: 201,
+    user}`` for created users, ``{index, status: 400|409, error}``
+    otherwise.
+    """
+    results = [None] * len(rows)
+    candidates = []
+    for position, row in enumerate(rows):
+        error = _validate(row)
+        if error:
+            results[position] = {'index': position, 'status': 400, 'error': error}
+        else:
+            candidates.append((position, {field: row[field] for field in USER_FIELDS}))
+
+    if not candidates:
+        return results
+
+    taken = dict(zip(USER_FIELDS, _taken_values([row for _, row in candidates])))
+    accepted = []
+    for position, row in candidates:
+        clash = next((field for field in USER_FIELDS if row[field] in taken[field]), None)
+        if clash:
+            results[position] = {
+                'index': position, 'status': 409,
+                'error': f"{clash} '{row[clash]}' is already taken"
+            }
+            continue
+        for field in USER_FIELDS:
+            taken[field].add(row[field])
+        accepted.append((position, row))
+
+    if accepted:
+        try:
+            ids = db.session.scalars(
+                db.insert(User).returning(User.id, sort_by_parameter_order=True),
+                [row for _, row in accepted]
+            ).all()
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request took one of the values after the check; nothing was inserted
+            db.session.rollback()
+            for position, _ in accepted:
+                results[position] = {
+                    'index': position, 'status': 409,
+                    'error': 'A conflicting user was created concurrently; retry the row'
+                }
+            return results
+
+        for (position, row), user_id in zip(accepted, ids):
+            results[position] = {'index': position, 'status': 201, 'user': {'id': user_id, **row}}
+    return results
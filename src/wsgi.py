@@ -0,0 +1,11 @@
+"""
+WSGI entry point for gunicorn: ``gunicorn src.wsgi:app``.
+
+Builds the app at import time so that with ``--preload`` the master pays
+for imports once and workers start as forks; the schema is migrated by a
+separate release step, never here.
+"""
+
+from src.main import create_app
+
+app = create_app()
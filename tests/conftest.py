@@ -0,0 +1,117 @@
+"""
+Shared fixtures: a synthetic catalog database generated once per test run
+(the one the benchmarks use), and Flask apps over private copies of it.
+
+Run with ``python -m pytest`` from the project root.
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_catalog import build_catalog_database, generate_contactors, generate_overload_relays
+from src.database.engine import dispose_engines
+from src.main import create_app
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay
+
+CATALOG_SIZE = 400
+
+# Standard motor ratings (kW) and the voltages and starting methods /calculate is asked about
+MOTOR_POWERS_KW = [0.75, 1.5, 2.2, 4, 5.5, 7.5, 11, 15, 18.5, 22, 30, 37, 45, 55, 75, 90, 110, 132, 160, 200, 250]
+VOLTAGES = [230, 400, 415, 690]
+STARTING_METHODS = ['DOL', 'Star-Delta', 'Soft Starter', 'VFD']
+
+
+@pytest.fixture(scope='session')
+def catalog_path(tmp_path_factory):
+    """Migrated SQLite catalog with CATALOG_SIZE contactors and CATALOG_SIZE overload relays"""
+    path = tmp_path_factory.mktemp('catalog') / 'catalog.db'
+    build_catalog_database(CATALOG_SIZE, str(path))
+    return path
+
+
+@pytest.fixture
+def make_app(catalog_path, tmp_path):
+    """
+    Factory for apps over a fresh copy of the catalog, so tests may write to
+    it. The recommendation cache and grid are off unless a test enables them,
+    so /calculate runs the selection it is testing.
+    """
+    apps = []
+
+    def make(**config):
+        path = tmp_path / f'catalog-{len(apps)}.db'
+        shutil.copy(catalog_path, path)
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'RECOMMENDATION_CACHE_SIZE': 0,
+            'RECOMMENDATION_GRID_ENABLED': False,
+            'CATALOG_VERSION_TTL': 0.0,
+            **config,
+        })
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        dispose_engines(app)
+
+
+def random_motors(count, seed=0):
+    """/calculate bodies over standard ratings, in kW or HP, with some off-standard powers"""
+    rng = random.Random(seed)
+    motors = []
+    for _ in range(count):
+        power_kw = rng.choice(MOTOR_POWERS_KW)
+        if rng.random() < 0.3:
+            power_kw = round(power_kw * rng.uniform(0.8, 1.2), 2)
+        motor = {'voltage': rng.choice(VOLTAGES), 'starting_method': rng.choice(STARTING_METHODS)}
+        if rng.random() < 0.5:
+            motor['motor_power_kw'] = power_kw
+        else:
+            motor['motor_power_hp'] = round(power_kw / 0.746, 1)
+        motors.append(motor)
+    return motors
+
+
+def edit_catalog(seed, edits=12):
+    """
+    Apply random contactor and overload relay writes through the ORM, as an
+    admin editing the catalog would: price and rating changes, new parts and
+    deletions. Must run inside an app context; commits.
+    """
+    rng = random.Random(seed)
+    contactors = db.session.scalars(db.select(Contactor).order_by(Contactor.id)).all()
+    relays = db.session.scalars(db.select(OverloadRelay).order_by(OverloadRelay.id)).all()
+    new_contactors = generate_contactors(edits, seed=seed + 100)
+    new_relays = generate_overload_relays(edits, seed=seed + 100)
+    for position in range(edits):
+        edit = rng.choice(['cheaper', 'dearer', 'rerate', 'add', 'delete'])
+        contactor = contactors.pop(rng.randrange(len(contactors)))
+        relay = relays.pop(rng.randrange(len(relays)))
+        if edit == 'cheaper':
+            contactor.price = round(contactor.price * 0.2, 2)
+            relay.price = round(relay.price * 0.2, 2)
+        elif edit == 'dearer':
+            contactor.price = round(contactor.price * 5, 2)
+            relay.price = round(relay.price * 5, 2)
+        elif edit == 'rerate':
+            contactor.current_rating = rng.choice([9, 40, 150, 400])
+            relay.current_range_min = round(relay.current_range_min * 0.5, 2)
+        elif edit == 'add':
+            db.session.add(Contactor(**{**next(new_contactors), 'model': f'EDIT-C{seed}-{position}', 'price': 1.0}))
+            record = next(new_relays)
+            record['compatible_contactor_frames'] = json.dumps(record['compatible_contactor_frames'])
+            db.session.add(OverloadRelay(**{**record, 'model': f'EDIT-R{seed}-{position}', 'price': 1.0}))
+        else:
+            db.session.delete(contactor)
+            db.session.delete(relay)
+    db.session.commit()
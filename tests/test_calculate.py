@@ -0,0 +1,72 @@
+"""/calculate gives the same answer from the indexes and from SQL, and the optimal solver finds the cheapest assembly"""
+
+import pytest
+
+from conftest import random_motors
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay
+from src.services.assembly_solver import ASSEMBLY_ROLES, PROTECTED_ROLES
+from src.services.catalog_index import CatalogRecord
+
+
+def _calculate_all(app, motors):
+    client = app.test_client()
+    responses = [client.post('/api/switchgear/calculate', json=motor) for motor in motors]
+    return [(response.status_code, response.get_json()) for response in responses]
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+def test_calculate_index_matches_sql(make_app, solver):
+    motors = random_motors(150, seed=1)
+    from_index = _calculate_all(make_app(ASSEMBLY_SOLVER=solver, CATALOG_INDEX_ENABLED=True), motors)
+    from_sql = _calculate_all(make_app(ASSEMBLY_SOLVER=solver, CATALOG_INDEX_ENABLED=False), motors)
+    assert from_index == from_sql
+    assert {status for status, _ in from_index} >= {200, 400}
+
+
+def _cheapest_assembly(body, contactors, relays):
+    """Lowest total cost of any assembly for a recommendation's motor, by brute force"""
+    voltage = body['motor_specifications']['voltage']
+    flc = body['motor_specifications']['full_load_current']
+    breaker = body['circuit_breaker_rating']
+    usable = [row for row in contactors if row.price is not None and row.voltage_rating >= voltage]
+
+    total = 0.0
+    protected_rating = None
+    for role, factor in ASSEMBLY_ROLES[body['starting_method']]:
+        if role in PROTECTED_ROLES:
+            protected_rating = breaker * factor
+        else:
+            total += min(row.price for row in usable if row.current_rating >= breaker * factor)
+
+    protected = [row for row in usable if row.current_rating >= protected_rating]
+    pairs = [
+        contactor.price + relay.price
+        for relay in relays
+        if relay.price is not None and relay.current_range_min <= flc * 0.8 and relay.current_range_max >= flc * 1.2
+        for contactor in protected
+        if not relay.compatible_contactor_frames or contactor.frame_size in relay.compatible_contactor_frames
+    ]
+    if pairs:
+        return total + min(pairs)
+    covering = [relay.price for relay in relays
+                if relay.price is not None and relay.current_range_min <= flc <= relay.current_range_max]
+    return total + min(row.price for row in protected) + min(covering, default=0.0)
+
+
+def test_optimal_solver_finds_the_cheapest_assembly(make_app):
+    motors = random_motors(150, seed=2)
+    app = make_app(ASSEMBLY_SOLVER='optimal')
+    results = _calculate_all(app, motors)
+    greedy = _calculate_all(make_app(ASSEMBLY_SOLVER='greedy'), motors)
+    with app.app_context():
+        contactors = [CatalogRecord(row.to_dict()) for row in db.session.scalars(db.select(Contactor))]
+        relays = [CatalogRecord(row.to_dict()) for row in db.session.scalars(db.select(OverloadRelay))]
+
+    solved = 0
+    for (status, body), (greedy_status, _) in zip(results, greedy):
+        assert status == greedy_status
+        if status == 200:
+            assert body['total_cost'] == pytest.approx(_cheapest_assembly(body, contactors, relays))
+            solved += 1
+    assert solved > 50
@@ -0,0 +1,132 @@
+"""The in-memory catalog indexes answer exactly as the SQL queries they replace"""
+
+import itertools
+import random
+
+from sqlalchemy import update
+
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay, StartingMethod
+from src.routes.switchgear import get_compatible_starting_methods, select_best_contactor, select_overload_relay
+from src.services.catalog_index import (
+    ANY_FRAME, StartingMethodTable, get_contactor_index, get_overload_relay_index
+)
+
+
+def _unprice(model, every):
+    """Clear the price of every n-th part, which SQL sorts before any priced one"""
+    db.session.execute(update(model).where(model.id % every == 0).values(price=None))
+    db.session.commit()
+
+
+def _ids(parts):
+    return [part.id if part is not None else None for part in parts]
+
+
+def test_contactor_index_matches_sql(make_app):
+    app = make_app()
+    ratings = [0, 5.9, 6, 6.1, 9, 17.5, 40, 64.99, 65, 120, 400, 799, 800, 800.1, 2000]
+    voltages = [0, 230, 400, 401, 690, 1000, 1001]
+    with app.app_context():
+        _unprice(Contactor, 13)
+        cases = list(itertools.product(ratings, voltages))
+        from_index = _ids(select_best_contactor(rating, voltage) for rating, voltage in cases)
+        app.config['CATALOG_INDEX_ENABLED'] = False
+        from_sql = _ids(select_best_contactor(rating, voltage) for rating, voltage in cases)
+    assert from_index == from_sql
+    assert any(from_index) and None in from_index
+
+
+def test_cheapest_contactor_matches_brute_force(make_app):
+    app = make_app()
+    with app.app_context():
+        _unprice(Contactor, 11)
+        index = get_contactor_index()
+        rows = [row.to_dict() for row in db.session.scalars(db.select(Contactor))]
+    frames = [ANY_FRAME, 'AF40', 'LC1D95', '3RT400', 'no such frame']
+    for rating, voltage, frame in itertools.product([0, 9, 33, 95, 401, 900], [230, 400, 690, 1000], frames):
+        eligible = [
+            row for row in rows
+            if row['price'] is not None and row['current_rating'] >= rating and row['voltage_rating'] >= voltage
+            and (frame is ANY_FRAME or row['frame_size'] == frame)
+        ]
+        expected = min(eligible, key=lambda row: (row['price'], row['id']))['id'] if eligible else None
+        found = index.cheapest(rating, voltage, frame)
+        assert (found.id if found is not None else None) == expected, (rating, voltage, frame)
+
+
+def test_contactor_index_follows_catalog_writes(make_app):
+    app = make_app()
+    with app.app_context():
+        before = select_best_contactor(30, 400)
+        contactor = db.session.get(Contactor, before.id)
+        contactor.current_rating = 1
+        db.session.commit()
+
+        after = select_best_contactor(30, 400)
+        app.config['CATALOG_INDEX_ENABLED'] = False
+        assert after.id != before.id
+        assert after.id == select_best_contactor(30, 400).id
+
+
+def test_overload_relay_index_matches_sql(make_app):
+    app = make_app()
+    currents = [0.1, 1, 3.7, 5.4, 6, 10, 21.65, 40, 57.7, 99.99, 150, 333, 500, 760, 900, 5000]
+    frames = ['AF40', 'LC1D95', '3RT150', 'DIL400', 'unlisted']
+    with app.app_context():
+        _unprice(OverloadRelay, 9)
+        cases = list(itertools.product(currents, frames))
+        from_index = _ids(select_overload_relay(flc, frame) for flc, frame in cases)
+        app.config['CATALOG_INDEX_ENABLED'] = False
+        from_sql = _ids(select_overload_relay(flc, frame) for flc, frame in cases)
+    assert from_index == from_sql
+    assert any(from_index) and None in from_index
+
+
+def test_overload_relay_stab_and_candidates_match_brute_force(make_app):
+    app = make_app()
+    with app.app_context():
+        _unprice(OverloadRelay, 7)
+        index = get_overload_relay_index()
+        rows = [row.to_dict() for row in db.session.scalars(db.select(OverloadRelay))]
+    for flc in [0.5, 4.2, 9, 17.3, 25, 64, 120.5, 300, 640, 1000]:
+        covering = {row['id'] for row in rows if row['current_range_min'] <= flc <= row['current_range_max']}
+        assert {payload[2].id for _, _, payload in index.stab(flc)} == covering
+
+        priced = [row for row in rows if row['id'] in covering and row['price'] is not None]
+        wide = [row for row in priced
+                if row['current_range_min'] <= flc * 0.8 and row['current_range_max'] >= flc * 1.2]
+        wide.sort(key=lambda row: (row['price'], row['id']))
+        candidates, fallback = index.assembly_candidates(flc)
+        assert [(record.id, frames) for _, frames, record in candidates] == \
+            [(row['id'], frozenset(row['compatible_contactor_frames'])) for row in wide]
+        cheapest = min(priced, key=lambda row: (row['price'], row['id']))['id'] if priced else None
+        assert (fallback.id if fallback is not None else None) == cheapest
+
+
+def test_starting_method_table_matches_sql(make_app):
+    app = make_app()
+    with app.app_context():
+        bounds = set()
+        for method in db.session.scalars(db.select(StartingMethod)):
+            bounds.update((method.min_power_hp, method.max_power_hp))
+        powers = [value + offset for value in sorted(bounds) for offset in (-0.01, 0, 0.01)]
+        powers += [-1, 0, 1e6, float('nan')]
+        from_table = [[method['name'] for method in get_compatible_starting_methods(power)] for power in powers]
+        app.config['CATALOG_INDEX_ENABLED'] = False
+        from_sql = [[method['name'] for method in get_compatible_starting_methods(power)] for power in powers]
+    assert from_table == from_sql
+    assert any(from_table) and [] in from_table
+
+
+def test_starting_method_table_matches_scan_of_overlapping_ranges():
+    rng = random.Random(5)
+    rows = []
+    for position in range(12):
+        low = rng.choice([0.5, 1, 5, 7.5, 10, 15, 40, 100])
+        rows.append({'id': position, 'name': f'method-{position}',
+                     'min_power_hp': low, 'max_power_hp': low + rng.choice([0, 2.5, 10, 50, 400])})
+    table = StartingMethodTable(rows)
+    for power in [0, 0.5, 0.75, 1, 3, 5, 7.5, 9.99, 10, 12.5, 15, 17.5, 40, 55, 90, 100, 150, 450, 500, 501]:
+        expected = [row['id'] for row in rows if row['min_power_hp'] <= power <= row['max_power_hp']]
+        assert [row['id'] for row in table.lookup(power)] == expected, power
@@ -0,0 +1,81 @@
+"""Catalog listings: keyset pagination, fields= projection and filters"""
+
+import pytest
+
+
+def _walk_pages(client, url, filters, limit):
+    """Every item of a listing, fetched page by page through next_cursor"""
+    items = []
+    response = client.get(url, query_string={**filters, 'limit': limit})
+    while True:
+        assert response.status_code == 200
+        page = response.get_json()
+        assert page['limit'] == limit and len(page['items']) <= limit
+        items.extend(page['items'])
+        if page['next_cursor'] is None:
+            return items
+        response = client.get(url, query_string={**filters, 'limit': limit, 'cursor': page['next_cursor']})
+
+
+@pytest.mark.parametrize('index_enabled', [True, False])
+@pytest.mark.parametrize('url, filters', [
+    ('/api/switchgear/contactors', {}),
+    ('/api/switchgear/contactors', {'min_current': 20, 'voltage': 690}),
+    ('/api/switchgear/overload-relays', {}),
+    ('/api/switchgear/overload-relays', {'max_current': 100}),
+])
+def test_pages_add_up_to_the_full_listing(make_app, index_enabled, url, filters):
+    client = make_app(CATALOG_INDEX_ENABLED=index_enabled).test_client()
+    everything = client.get(url, query_string=filters).get_json()
+    assert isinstance(everything, list) and everything
+
+    # Many parts share a rating, so pages also break inside runs of equal sort values
+    assert _walk_pages(client, url, filters, 37) == everything
+    sort_key = 'current_rating' if 'contactors' in url else 'current_range_min'
+    assert [item[sort_key] for item in everything] == sorted(item[sort_key] for item in everything)
+
+
+def test_cursor_alone_uses_the_default_page_size(make_app):
+    client = make_app(CATALOG_PAGE_SIZE=50).test_client()
+    first = client.get('/api/switchgear/contactors?limit=10').get_json()
+    page = client.get('/api/switchgear/contactors', query_string={'cursor': first['next_cursor']}).get_json()
+    assert page['limit'] == 50 and len(page['items']) == 50
+    assert page['items'][0]['id'] not in {item['id'] for item in first['items']}
+
+
+def test_fields_projection(make_app):
+    client = make_app().test_client()
+    full = client.get('/api/switchgear/overload-relays').get_json()
+    projected = client.get('/api/switchgear/overload-relays?fields=id,current_range,compatible_contactor_frames')
+    assert projected.get_json() == [
+        {field: item[field] for field in ('id', 'current_range', 'compatible_contactor_frames')} for item in full
+    ]
+
+    page = client.get('/api/switchgear/contactors?fields=model,price&limit=5').get_json()
+    assert all(set(item) == {'model', 'price'} for item in page['items'])
+
+
+@pytest.mark.parametrize('query', [
+    'cursor=not-a-cursor', 'cursor=WzEsIngiXQ', 'limit=0', 'limit=100000', 'fields=id,unknown', 'fields=,',
+])
+def test_malformed_listing_parameters_are_rejected(make_app, query):
+    response = make_app().test_client().get(f'/api/switchgear/contactors?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_manufacturer_filter_is_exact(make_app):
+    client = make_app().test_client()
+    manufacturers = {item['name']: item['id'] for item in client.get('/api/switchgear/manufacturers').get_json()}
+    name = 'Schneider Electric'
+
+    for url in ('/api/switchgear/contactors', '/api/switchgear/overload-relays'):
+        by_name = client.get(url, query_string={'manufacturer': name}).get_json()
+        assert by_name and {item['manufacturer'] for item in by_name} == {name}
+        assert client.get(url, query_string={'manufacturer_id': manufacturers[name]}).get_json() == by_name
+        # Parts of other manufacturers whose names merely contain the term are not matched
+        assert client.get(url, query_string={'manufacturer': 'Electric'}).get_json() == []
+        assert client.get(url, query_string={'manufacturer': name.lower()}).get_json() == []
+
+    search = client.get('/api/switchgear/search', query_string={'q': 'electric', 'limit': 1000}).get_json()
+    assert {result['part']['manufacturer'] for result in search['results']} >= {name, 'Mitsubishi Electric', 'LS Electric'}
@@ -0,0 +1,94 @@
+"""The mmapped catalog snapshot answers every lookup exactly as the in-memory indexes do"""
+
+import itertools
+import os
+
+import pytest
+from sqlalchemy import update
+
+from conftest import edit_catalog, random_motors
+from src.database.engine import dispose_engines
+from src.main import create_app
+from src.models.user import db
+from src.models.switchgear import Contactor, OverloadRelay
+from src.services.catalog_index import (
+    ANY_FRAME, get_contactor_index, get_overload_relay_index, get_starting_method_table
+)
+
+FRAMES = ['AF40', 'LC1D95', '3RT150', 'DIL400', 'unlisted']
+
+
+def _unpriced_app(make_app, **config):
+    app = make_app(**config)
+    with app.app_context():
+        db.session.execute(update(Contactor).where(Contactor.id % 13 == 0).values(price=None))
+        db.session.execute(update(OverloadRelay).where(OverloadRelay.id % 9 == 0).values(price=None))
+        db.session.commit()
+    return app
+
+
+def _lookups(app):
+    """Results of every index lookup over a grid of inputs, as plain data"""
+    def as_dict(record):
+        return record.to_dict() if record is not None else None
+
+    with app.app_context():
+        contactors = get_contactor_index()
+        relays = get_overload_relay_index()
+        methods = get_starting_method_table()
+        results = []
+        for rating, voltage in itertools.product([0, 6, 17.5, 65, 120, 400, 800.1], [0, 230, 400, 690, 1001]):
+            results.append(as_dict(contactors.select(rating, voltage)))
+            for frame in [ANY_FRAME, *FRAMES]:
+                results.append(as_dict(contactors.cheapest(rating, voltage, frame)))
+        for flc in [0.1, 3.7, 10, 21.65, 57.7, 150, 333, 760, 5000]:
+            candidates, fallback = relays.assembly_candidates(flc)
+            results.append(([(key, sorted(frames), record.to_dict()) for key, frames, record in candidates],
+                            as_dict(fallback)))
+            results.extend(as_dict(relays.select(flc, frame)) for frame in FRAMES)
+        for power_hp in [0, 0.5, 1, 4.9, 5, 5.1, 15, 100, 200, 500, 1000, 1001]:
+            results.append(methods.lookup(power_hp))
+    return results
+
+
+def test_snapshot_lookups_match_index(make_app, tmp_path):
+    snapshot_app = _unpriced_app(make_app, CATALOG_SNAPSHOT_PATH=str(tmp_path / 'catalog.snapshot'))
+    index_app = _unpriced_app(make_app)
+    assert _lookups(snapshot_app) == _lookups(index_app)
+    assert os.path.exists(tmp_path / 'catalog.snapshot')
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+def test_calculate_from_snapshot_matches_index(make_app, tmp_path, solver):
+    motors = random_motors(100, seed=4)
+    results = []
+    for config in ({'CATALOG_SNAPSHOT_PATH': str(tmp_path / 'catalog.snapshot')}, {}):
+        client = make_app(ASSEMBLY_SOLVER=solver, **config).test_client()
+        results.append([(response.status_code, response.get_json())
+                        for response in (client.post('/api/switchgear/calculate', json=motor) for motor in motors)])
+    assert results[0] == results[1]
+
+
+def test_snapshot_is_shared_and_rebuilt_after_catalog_writes(make_app, tmp_path):
+    path = str(tmp_path / 'catalog.snapshot')
+    writer = make_app(CATALOG_SNAPSHOT_PATH=path)
+    reader = create_app({**{key: writer.config[key] for key in (
+        'SQLALCHEMY_DATABASE_URI', 'CATALOG_SNAPSHOT_PATH', 'CATALOG_VERSION_TTL'
+    )}, 'RECOMMENDATION_GRID_ENABLED': False})
+    try:
+        first = _lookups(writer)
+        built = os.stat(path)
+        # A second process with the same catalog maps the file instead of writing its own
+        assert _lookups(reader) == first
+        assert os.stat(path).st_ino == built.st_ino and os.stat(path).st_mtime_ns == built.st_mtime_ns
+
+        with writer.app_context():
+            edit_catalog(6)
+        edited = _lookups(writer)
+        assert edited != first and os.stat(path).st_ino != built.st_ino
+        assert _lookups(reader) == edited
+
+        writer.config['CATALOG_SNAPSHOT_PATH'] = None
+        assert _lookups(writer) == edited
+    finally:
+        dispose_engines(reader)
@@ -0,0 +1,81 @@
+"""The shipped pre-migration app.db upgrades through every migration without losing data"""
+
+import os
+import shutil
+
+import pytest
+from sqlalchemy import inspect, text
+
+from src.database.engine import dispose_engines
+from src.database.migrations import MIGRATIONS, upgrade_database
+from src.main import create_app
+from src.models.user import db
+
+BASELINE_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'src', 'database', 'app.db')
+PART_TABLES = ('contactors', 'overload_relays')
+
+
+@pytest.fixture
+def baseline_app(tmp_path):
+    path = tmp_path / 'app.db'
+    shutil.copy(BASELINE_DATABASE, path)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'RECOMMENDATION_GRID_ENABLED': False})
+    yield app
+    dispose_engines(app)
+
+
+def _rows(connection, table):
+    return connection.execute(text(f'SELECT * FROM {table} ORDER BY id')).mappings().all()
+
+
+def test_baseline_database_upgrades_through_every_migration(baseline_app):
+    with baseline_app.app_context():
+        with db.engine.connect() as connection:
+            before = {table: [dict(row) for row in _rows(connection, table)]
+                      for table in (*PART_TABLES, 'motors', 'starting_methods')}
+        assert all(before.values())
+
+        assert upgrade_database() == [version for version, _ in MIGRATIONS]
+        assert upgrade_database() == []
+
+        inspector = inspect(db.engine)
+        for table in PART_TABLES:
+            columns = {column['name'] for column in inspector.get_columns(table)}
+            assert {'manufacturer_id', 'checksum'} <= columns
+            indexes = {index['name'] for index in inspector.get_indexes(table)}
+            assert {f'ix_{table}_manufacturer_id', f'ux_{table}_part'} <= indexes
+        assert {'ix_contactors_selection', 'ix_contactors_frame_price'} <= \
+            {index['name'] for index in inspector.get_indexes('contactors')}
+        assert {'schedule_id', 'recommendation', 'starting_methods_version'} <= \
+            {column['name'] for column in inspector.get_columns('motors')}
+        assert 'consumer' in {column['name'] for column in inspector.get_columns('catalog_changes')}
+
+        with db.engine.connect() as connection:
+            for table, rows in before.items():
+                after = _rows(connection, table)
+                assert [{key: row[key] for key in rows[0]} for row in after] == rows
+            # Every part is linked to the manufacturer it names
+            for table in PART_TABLES:
+                assert connection.execute(text(f'''
+                    SELECT COUNT(*) FROM {table} p LEFT JOIN manufacturers m ON m.id = p.manufacturer_id
+                    WHERE m.name IS NOT p.manufacturer
+                ''')).scalar() == 0
+            assert connection.execute(text('SELECT COUNT(*) FROM motors WHERE schedule_id IS NOT NULL')).scalar() == 0
+
+
+def test_upgraded_baseline_database_serves_requests(baseline_app):
+    with baseline_app.app_context():
+        upgrade_database()
+    client = baseline_app.test_client()
+
+    response = client.post('/api/switchgear/calculate',
+                           json={'motor_power_kw': 3, 'voltage': 400, 'starting_method': 'DOL'})
+    assert response.status_code == 200
+    assert response.get_json()['contactors']['main_contactor']['manufacturer']
+
+    assert client.get('/api/switchgear/search?q=abb').get_json()['count'] > 0
+    schedule = client.post('/api/schedules', json={
+        'name': 'Upgraded', 'motors': [{'motor_power_kw': 3, 'voltage': 400, 'starting_method': 'DOL'}]
+    })
+    assert schedule.status_code == 201
@@ -0,0 +1,94 @@
+"""Persisted schedules: incremental refreshes match a full recompute, and reads report staleness"""
+
+import json
+
+import pytest
+
+from conftest import edit_catalog, random_motors
+from src.models.user import db
+from src.models.switchgear import Motor
+from src.services.motor_schedules import refresh_motor_selections
+
+
+def _selections():
+    return {
+        motor.id: (motor.status, motor.total_cost, json.loads(motor.recommendation))
+        for motor in db.session.scalars(db.select(Motor).where(Motor.schedule_id.isnot(None)))
+    }
+
+
+def _create_schedules(client, count=3, motors=60):
+    ids = []
+    for position in range(count):
+        response = client.post('/api/schedules', json={
+            'name': f'MCC-{position}', 'motors': random_motors(motors, seed=10 + position)
+        })
+        assert response.status_code == 201
+        ids.append(response.get_json()['id'])
+    return ids
+
+
+def test_schedule_matches_calculate(make_app):
+    app = make_app()
+    client = app.test_client()
+    motors = random_motors(40, seed=3)
+    schedule = client.post('/api/schedules', json={'name': 'MCC', 'motors': motors}).get_json()
+
+    for motor, stored in zip(motors, schedule['motors']):
+        response = client.post('/api/switchgear/calculate', json=motor)
+        assert stored['status'] == response.status_code
+        if response.status_code == 200:
+            assert stored['recommendation'] == response.get_json()
+    succeeded = [motor['recommendation'] for motor in schedule['motors'] if motor['status'] == 200]
+    assert schedule['summary']['succeeded'] == len(succeeded)
+    assert schedule['summary']['total_cost'] == pytest.approx(sum(body['total_cost'] for body in succeeded))
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_incremental_refresh_matches_full_recompute(make_app, solver, seed):
+    app = make_app(ASSEMBLY_SOLVER=solver)
+    _create_schedules(app.test_client())
+    with app.app_context():
+        edit_catalog(seed)
+        report = refresh_motor_selections()
+        assert report['mode'] == 'incremental' and 0 < report['recomputed'] < report['motors']
+        incremental = _selections()
+
+        assert refresh_motor_selections()['recomputed'] == 0
+        refresh_motor_selections(full=True)
+        assert _selections() == incremental
+
+
+def test_reads_report_staleness_without_writing(make_app):
+    app = make_app()
+    client = app.test_client()
+    schedule_id = _create_schedules(client, count=1)[0]
+
+    def stale():
+        listed = {schedule['id']: schedule['stale'] for schedule in client.get('/api/schedules').get_json()}
+        detail = client.get(f'/api/schedules/{schedule_id}').get_json()
+        assert listed[schedule_id] == detail['stale']
+        return detail
+
+    assert stale()['stale'] is False
+    with app.app_context():
+        edit_catalog(5, edits=3)
+    before = stale()
+    assert before['stale'] is True
+    # Reading did not apply the catalog writes
+    assert stale() == before
+
+    report = client.post('/api/schedules/refresh').get_json()
+    assert report['changes'] > 0
+    assert stale()['stale'] is False
+
+    app.config['ASSEMBLY_SOLVER'] = 'greedy'
+    assert stale()['stale'] is True
+    assert client.post('/api/schedules/refresh').get_json()['recomputed'] == 60
+    assert stale()['stale'] is False
+
+
+def test_refresh_rejects_a_non_boolean_full(make_app):
+    response = make_app().test_client().post('/api/schedules/refresh', json={'full': 'yes'})
+    assert response.status_code == 400
@@ -0,0 +1,92 @@
+"""Every /sweep point equals the /calculate result for the same motor"""
+
+import itertools
+
+import pytest
+
+SWEEPS = [
+    {'starting_method': 'DOL', 'motor_power_kw': [0.37, 0.75, 2.2, 3.7], 'voltage': [230, 400, 690],
+     'power_factor': [0.8, 0.86], 'efficiency': [0.85, 0.9]},
+    {'starting_method': 'Star-Delta', 'motor_power_kw': {'start': 11, 'stop': 160, 'step': 37.25},
+     'voltage': [400, 415, 690], 'power_factor': {'start': 0.8, 'stop': 0.9, 'num': 3}},
+    {'starting_method': 'Soft Starter', 'motor_power_hp': [5, 20, 75, 150, 400], 'voltage': [230, 400, 690],
+     'efficiency': [0.88, 0.93]},
+    {'starting_method': 'VFD', 'motor_power_kw': [0.55, 15, 75, 250, 600], 'voltage': 400},
+]
+
+
+def _points(sweep):
+    """(grid index, /calculate body) of every point of a sweep response"""
+    axes = sweep['axes']
+    power_field = 'motor_power_kw' if sweep['requested_kw'] else 'motor_power_hp'
+    for index in itertools.product(*(range(size) for size in sweep['shape'])):
+        power, voltage, power_factor, efficiency = index
+        yield index, {
+            power_field: axes[power_field][power],
+            'voltage': axes['voltage'][voltage],
+            'power_factor': axes['power_factor'][power_factor],
+            'efficiency': axes['efficiency'][efficiency],
+            'starting_method': sweep['starting_method'],
+        }
+
+
+def _at(matrix, index):
+    for position in index:
+        matrix = matrix[position]
+    return matrix
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+@pytest.mark.parametrize('body', SWEEPS, ids=[body['starting_method'] for body in SWEEPS])
+def test_sweep_points_match_single_calculations(make_app, solver, body):
+    client = make_app(ASSEMBLY_SOLVER=solver).test_client()
+    response = client.post('/api/switchgear/sweep', json=body)
+    assert response.status_code == 200
+    sweep = {**response.get_json(), 'requested_kw': 'motor_power_kw' in body}
+    parts = {
+        'contactors': {part['id']: part for part in sweep['parts']['contactors']},
+        'overload_relays': {part['id']: part for part in sweep['parts']['overload_relays']},
+    }
+
+    statuses = set()
+    for index, motor in _points(sweep):
+        single = client.post('/api/switchgear/calculate', json=motor)
+        status = _at(sweep['status'], index)
+        assert status == single.status_code, motor
+        statuses.add(status)
+        if status != 200:
+            continue
+
+        expected = single.get_json()
+        assert _at(sweep['full_load_current'], index) == expected['motor_specifications']['full_load_current']
+        assert _at(sweep['circuit_breaker_rating'], index) == expected['circuit_breaker_rating']
+        assert _at(sweep['total_cost'], index) == expected['total_cost']
+        for role, ids in sweep['contactors'].items():
+            assert parts['contactors'][_at(ids, index)] == expected['contactors'][role]
+        relay_id = _at(sweep['overload_relay'], index)
+        assert (parts['overload_relays'][relay_id] if relay_id is not None else None) == expected['overload_relay']
+    assert 200 in statuses
+
+
+@pytest.mark.parametrize('axis', [
+    {'start': 0, 'stop': 1e308, 'step': 1e-308},
+    {'start': -1e308, 'stop': 1e308, 'step': 1},
+    {'start': 0, 'stop': 10 ** 400, 'step': 1},
+    [10 ** 400],
+    {'start': 1, 'stop': 0, 'step': 1},
+    {'start': 0, 'stop': 1, 'step': 0},
+    {'start': 0, 'stop': 1, 'num': 0},
+])
+def test_unusable_ranges_are_rejected(make_app, axis):
+    response = make_app().test_client().post('/api/switchgear/sweep', json={
+        'starting_method': 'DOL', 'motor_power_kw': axis
+    })
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_oversized_sweeps_are_rejected(make_app):
+    response = make_app(SWEEP_MAX_POINTS=100).test_client().post('/api/switchgear/sweep', json={
+        'starting_method': 'DOL', 'motor_power_kw': list(range(1, 11)), 'voltage': list(range(400, 411))
+    })
+    assert response.status_code == 400
@@ -0,0 +1,74 @@
+"""The materialized IEC grid answers like a live /calculate and stays exact under incremental refreshes"""
+
+import json
+
+import pytest
+
+from conftest import edit_catalog
+from src.models.user import db
+from src.models.switchgear import CatalogChange, RecommendationGridCell
+from src.services.recommendation_grid import GRID_VOLTAGES, IEC_POWER_KW, refresh_recommendation_grid
+
+
+def _grid_requests():
+    methods = ('DOL', 'Star-Delta', 'Soft Starter', 'VFD', 'Autotransformer')
+    return [
+        {'motor_power_kw': power_kw, 'voltage': voltage, 'starting_method': method}
+        for power_kw in IEC_POWER_KW for voltage in GRID_VOLTAGES for method in methods
+    ]
+
+
+def _responses(app, motors):
+    client = app.test_client()
+    return [(response.status_code, response.get_json())
+            for response in (client.post('/api/switchgear/calculate', json=motor) for motor in motors)]
+
+
+def _cells():
+    return {
+        (cell.power_kw, cell.voltage, cell.starting_method): (cell.status, json.loads(cell.body))
+        for cell in db.session.scalars(db.select(RecommendationGridCell))
+    }
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+def test_grid_answers_match_live_calculation(make_app, solver):
+    app = make_app(ASSEMBLY_SOLVER=solver, RECOMMENDATION_GRID_ENABLED=True)
+    with app.app_context():
+        report = refresh_recommendation_grid()
+    assert report['mode'] == 'full' and report['recomputed'] == report['cells'] > 0
+
+    motors = _grid_requests()
+    from_grid = _responses(app, motors)
+    app.config['RECOMMENDATION_GRID_ENABLED'] = False
+    assert from_grid == _responses(app, motors)
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_incremental_refresh_matches_full_recompute(make_app, solver, seed):
+    app = make_app(ASSEMBLY_SOLVER=solver, RECOMMENDATION_GRID_ENABLED=True)
+    with app.app_context():
+        refresh_recommendation_grid()
+        edit_catalog(seed)
+        assert db.session.query(CatalogChange).filter_by(consumer='recommendation_grid').count() > 0
+
+        report = refresh_recommendation_grid()
+        assert report['mode'] == 'incremental' and 0 < report['recomputed'] < report['cells']
+        assert db.session.query(CatalogChange).filter_by(consumer='recommendation_grid').count() == 0
+        incremental = _cells()
+
+        refresh_recommendation_grid(full=True)
+        assert _cells() == incremental
+
+
+def test_stale_grid_is_not_served(make_app):
+    app = make_app(RECOMMENDATION_GRID_ENABLED=True)
+    with app.app_context():
+        refresh_recommendation_grid()
+        edit_catalog(4)
+
+    motors = _grid_requests()[::7]
+    unrefreshed = _responses(app, motors)
+    app.config['RECOMMENDATION_GRID_ENABLED'] = False
+    assert unrefreshed == _responses(app, motors)
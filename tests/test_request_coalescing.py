@@ -0,0 +1,129 @@
+"""Concurrent identical /calculate requests share one selection"""
+
+import threading
+import time
+
+import pytest
+
+from conftest import random_motors
+from src.routes.switchgear import parse_motor_specification
+from src.services.recommendation_cache import recommendation_cache_key, recommendation_catalog_version
+from src.services.request_coalescing import SingleFlight, get_calculation_flights
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def _in_threads(target, count):
+    results = [None] * count
+
+    def run(position):
+        try:
+            results[position] = ('ok', target())
+        except Exception as e:
+            results[position] = ('error', e)
+
+    threads = [threading.Thread(target=run, args=(position,)) for position in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _join(threads):
+    for thread in threads:
+        thread.join(10)
+        assert not thread.is_alive()
+
+
+def _blocked_leader(flights, key, result=None, error=None):
+    """Start a leader for key that returns result (or raises error) once the returned event is set"""
+    release = threading.Event()
+
+    def compute():
+        release.wait(10)
+        if error is not None:
+            raise error
+        return result
+
+    threads, results = _in_threads(lambda: flights.run(key, compute), 1)
+    _wait_for(lambda: flights.stats()['in_flight'] == 1)
+    return release, threads, results
+
+
+def test_followers_share_the_leaders_result():
+    flights = SingleFlight()
+    release, leader, leader_result = _blocked_leader(flights, 'a', result='body')
+    followers, results = _in_threads(lambda: flights.run('a', lambda: 'recomputed'), 8)
+    _wait_for(lambda: flights.stats()['coalesced'] == 8)
+    # Other keys are not held up by the one in flight
+    assert flights.run('b', lambda: 'other') == 'other'
+
+    release.set()
+    _join(leader + followers)
+    assert leader_result + results == [('ok', 'body')] * 9
+    assert flights.stats() == {'in_flight': 0, 'computed': 2, 'coalesced': 8, 'coalesced_ratio': 0.8}
+    # The finished call is forgotten, so the next one computes afresh
+    assert flights.run('a', lambda: 'recomputed') == 'recomputed'
+
+
+def test_followers_reraise_the_leaders_error():
+    flights = SingleFlight()
+    error = ValueError('catalog unavailable')
+    release, leader, leader_result = _blocked_leader(flights, 'a', error=error)
+    followers, results = _in_threads(lambda: flights.run('a', lambda: 'recomputed'), 4)
+    _wait_for(lambda: flights.stats()['coalesced'] == 4)
+
+    release.set()
+    _join(leader + followers)
+    assert leader_result + results == [('error', error)] * 5
+    assert flights.stats()['in_flight'] == 0
+    assert flights.run('a', lambda: 'recovered') == 'recovered'
+
+
+def test_render_exports_the_counters():
+    flights = SingleFlight()
+    flights.run('a', lambda: None)
+    assert 'switchgear_calculations_computed_total 1\n' in flights.render()
+    assert 'switchgear_calculations_coalesced_total 0\n' in flights.render()
+    assert 'switchgear_calculations_in_flight 0\n' in flights.render()
+
+
+@pytest.mark.parametrize('solver', ['optimal', 'greedy'])
+def test_coalesced_calculate_matches_uncoalesced(make_app, solver):
+    motors = random_motors(60, seed=8)
+    results = []
+    for coalescing in (True, False):
+        client = make_app(ASSEMBLY_SOLVER=solver, CALCULATE_COALESCING=coalescing).test_client()
+        results.append([(response.status_code, response.data)
+                        for response in (client.post('/api/switchgear/calculate', json=motor) for motor in motors)])
+    assert results[0] == results[1]
+
+
+def test_concurrent_calculate_requests_wait_for_the_one_in_flight(make_app):
+    app = make_app()
+    motor = {'motor_power_kw': 30, 'voltage': 400, 'starting_method': 'Star-Delta'}
+    expected = app.test_client().post('/api/switchgear/calculate', json=motor)
+    assert expected.status_code == 200
+
+    with app.app_context():
+        flights = get_calculation_flights()
+        spec, _ = parse_motor_specification(motor)
+        key = (recommendation_cache_key(spec), recommendation_catalog_version())
+    computed = flights.stats()['computed']
+    release, leader, _ = _blocked_leader(flights, key, result=(expected.data[:-1], 200, 'Star-Delta'))
+
+    followers, responses = _in_threads(
+        lambda: app.test_client().post('/api/switchgear/calculate', json=motor), 6
+    )
+    _wait_for(lambda: flights.stats()['coalesced'] == 6)
+    release.set()
+    _join(leader + followers)
+
+    assert [(response.status_code, response.data) for _, response in responses] == [(200, expected.data)] * 6
+    assert flights.stats()['computed'] == computed + 1
+    metrics = app.test_client().get('/api/switchgear/metrics').get_data(as_text=True)
+    assert 'switchgear_calculations_coalesced_total 6\n' in metrics
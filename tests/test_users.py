@@ -0,0 +1,71 @@
+"""Bulk user creation and the user listing"""
+
+import pytest
+
+USERS_URL = '/api/users/users'
+
+
+@pytest.fixture
+def client(make_app):
+    client = make_app(USER_PAGE_SIZE=25).test_client()
+    rows = [{'username': f'user{position:03d}', 'email': f'user{position:03d}@example.com'} for position in range(120)]
+    response = client.post(f'{USERS_URL}/bulk', json=rows)
+    assert response.get_json()['summary'] == {'users': 120, 'created': 120, 'failed': 0}
+    return client
+
+
+def test_bulk_creation_reports_conflicts_per_row(client):
+    response = client.post(f'{USERS_URL}/bulk', json={'users': [
+        {'username': 'new1', 'email': 'new1@example.com'},
+        {'username': 'user007', 'email': 'other@example.com'},
+        {'username': 'other', 'email': 'user008@example.com'},
+        {'username': 'new1', 'email': 'again@example.com'},
+        {'username': '', 'email': 'blank@example.com'},
+        {'username': 'new2', 'email': 'new2@example.com'},
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == [201, 409, 409, 409, 400, 201]
+    assert body['summary'] == {'users': 6, 'created': 2, 'failed': 4}
+    assert len(client.get(USERS_URL).get_json()) == 122
+
+
+def test_listing_without_paging_parameters_is_a_plain_list(client):
+    users = client.get(USERS_URL).get_json()
+    assert isinstance(users, list) and len(users) == 120
+    assert [user['id'] for user in users] == sorted(user['id'] for user in users)
+
+
+@pytest.mark.parametrize('limit', [1, 7, 25, 120, 1000])
+def test_pages_add_up_to_the_plain_list(client, limit):
+    users = []
+    page = client.get(USERS_URL, query_string={'limit': limit}).get_json()
+    while True:
+        assert len(page['items']) <= limit
+        users.extend(page['items'])
+        if page['next_cursor'] is None:
+            break
+        page = client.get(USERS_URL, query_string={'limit': limit, 'cursor': page['next_cursor']}).get_json()
+    assert users == client.get(USERS_URL).get_json()
+
+
+def test_cursor_alone_uses_the_default_page_size(client):
+    first = client.get(USERS_URL, query_string={'limit': 10}).get_json()
+    page = client.get(USERS_URL, query_string={'cursor': first['next_cursor']}).get_json()
+    assert page['limit'] == 25
+    assert [user['id'] for user in page['items']] == list(range(first['next_cursor'] + 1, first['next_cursor'] + 26))
+
+
+@pytest.mark.parametrize('query, error', [
+    ({'cursor': 'abc'}, 'Invalid cursor'),
+    ({'cursor': '0'}, 'Invalid cursor'),
+    ({'cursor': '-5'}, 'Invalid cursor'),
+    ({'cursor': '²'}, 'Invalid cursor'),
+    ({'limit': 'x'}, 'limit must be between 1 and 1000'),
+    ({'limit': '0'}, 'limit must be between 1 and 1000'),
+    ({'limit': '1001'}, 'limit must be between 1 and 1000'),
+])
+def test_malformed_paging_parameters_are_rejected(client, query, error):
+    response = client.get(USERS_URL, query_string=query)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}